@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+import argparse, sys, os, shutil, hashlib, errno, json, bisect
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Tuple, Iterator, Pattern
+
+FICLONE = 0x40049409 # linux ioctl, btrfs/xfs reflink
+LINK_MODES = ('clone', 'hardlink', 'copy')
+LEAF_EXTENSIONS = ('.framework', '.bundle', '.xcassets') # imported as a whole
+
+def walk_tree(base_path:str, tree_path:str, pattern:Pattern = None, workers:int = None, mtimes:Dict[str, int] = None)->Iterator[str]:
+    # yields paths relative to base_path while subdirectories are scanned in parallel
+    def scan(dir_path:str)->Tuple[List[str], List[str]]:
+        files, dirs = [], []
+        if mtimes is not None: mtimes[dir_path] = os.stat(os.path.join(base_path, dir_path)).st_mtime_ns
+        with os.scandir(os.path.join(base_path, dir_path)) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.') or (pattern and pattern.search(name)): continue
+                node_path = '{}/{}'.format(dir_path, name)
+                if entry.is_dir():
+                    (files if name.endswith(LEAF_EXTENSIONS) else dirs).append(node_path)
+                elif entry.is_file():
+                    files.append(node_path)
+        return files, dirs
+    with ThreadPoolExecutor(max_workers=workers if workers else min(32, (os.cpu_count() or 1) * 4)) as executor:
+        pending = {executor.submit(scan, os.path.normpath(tree_path))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, dirs = future.result()
+                for dir_path in dirs: pending.add(executor.submit(scan, dir_path))
+                yield from files
+
+class assetsCopier(object):
+    def __init__(self, exclude_types:Tuple[str] = ('meta',), link:str = 'clone', workers:int = None):
+        assert link in LINK_MODES, 'link[={}] not in {}'.format(link, LINK_MODES)
+        self.exclude_types = tuple('.{}'.format(x) for x in exclude_types) if exclude_types else ()
+        self.link = link
+        self.workers = workers if workers else min(32, (os.cpu_count() or 1) * 4)
+        self.__clone_enabled = link in ('clone', 'hardlink')
+        self.__link_enabled = link == 'hardlink'
+        self.report: dict[str, int] = {}
+
+    def excluded(self, name:str)->bool:
+        return name.startswith('.') or name.endswith(self.exclude_types)
+
+    def walk(self, base_path:str, assets:List[str])->Iterator[Tuple[str, bool]]:
+        visited: set[str] = set()
+        for asset_path in assets:
+            asset_path = os.path.normpath(asset_path)
+            if asset_path in visited or self.excluded(os.path.basename(asset_path)): continue
+            visited.add(asset_path)
+            location = os.path.join(base_path, asset_path)
+            if os.path.islink(location) or os.path.isfile(location):
+                yield asset_path, False
+            elif os.path.isdir(location):
+                yield asset_path, True
+                stack = [asset_path]
+                while stack:
+                    dir_path = stack.pop()
+                    with os.scandir(os.path.join(base_path, dir_path)) as it:
+                        for entry in it:
+                            if self.excluded(entry.name): continue
+                            node_path = os.path.join(dir_path, entry.name)
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(node_path)
+                                yield node_path, True
+                            else:
+                                yield node_path, False
+
+    @staticmethod
+    def digest(file_path:str)->str:
+        md5 = hashlib.md5()
+        with open(file_path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b''): md5.update(chunk)
+        return md5.hexdigest()
+
+    def __clone(self, src:str, dst:str)->bool:
+        if sys.platform == 'darwin': # APFS copy-on-write
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.clonefile(src.encode('utf-8'), dst.encode('utf-8'), 0) == 0: return True
+            raise OSError(ctypes.get_errno(), 'clonefile')
+        if sys.platform.startswith('linux'):
+            import fcntl
+            with open(src, 'rb') as src_fp, open(dst, 'wb') as dst_fp:
+                try:
+                    fcntl.ioctl(dst_fp.fileno(), FICLONE, src_fp.fileno())
+                    return True
+                except OSError:
+                    dst_fp.close()
+                    os.remove(dst)
+                    raise
+        return False
+
+    def __transfer(self, src:str, dst:str)->str:
+        if self.__link_enabled:
+            try:
+                os.link(src, dst)
+                return 'linked'
+            except OSError as error:
+                if error.errno not in (errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EMLINK): raise
+                self.__link_enabled = False # other volume, fall through to clone/copy
+        if self.__clone_enabled:
+            try:
+                if self.__clone(src, dst):
+                    shutil.copystat(src, dst)
+                    return 'cloned'
+            except (OSError, AttributeError):
+                if os.path.lexists(dst): os.remove(dst)
+            self.__clone_enabled = False
+        shutil.copy2(src, dst)
+        return 'copied'
+
+    def __sync_file(self, src:str, dst:str)->Tuple[str, int]:
+        if os.path.islink(src):
+            target = os.readlink(src)
+            if os.path.islink(dst) and os.readlink(dst) == target: return 'skipped', 0
+            if os.path.lexists(dst): os.remove(dst)
+            os.symlink(target, dst)
+            return 'copied', 0
+        src_stat = os.stat(src)
+        try:
+            dst_stat = os.lstat(dst)
+        except FileNotFoundError:
+            dst_stat = None
+        if dst_stat and dst_stat.st_size == src_stat.st_size:
+            if dst_stat.st_mtime_ns == src_stat.st_mtime_ns or os.path.samefile(src, dst): return 'skipped', src_stat.st_size
+            if self.digest(src) == self.digest(dst): # touched but same content
+                os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+                return 'skipped', src_stat.st_size
+        if dst_stat: os.remove(dst) # never write through a hardlink into base_path
+        return self.__transfer(src, dst), src_stat.st_size
+
+    def copy(self, base_path:str, assets:List[str], dst_path:str)->Dict[str, int]:
+        report = self.report = {'files': 0, 'copied': 0, 'cloned': 0, 'linked': 0, 'skipped': 0, 'copied_bytes': 0, 'skipped_bytes': 0}
+        files: list[str] = []
+        for node_path, is_dir in self.walk(base_path, assets):
+            if is_dir:
+                os.makedirs(os.path.join(dst_path, node_path), exist_ok=True)
+            else:
+                os.makedirs(os.path.join(dst_path, os.path.dirname(node_path)), exist_ok=True)
+                files.append(node_path)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(lambda x: self.__sync_file(os.path.join(base_path, x), os.path.join(dst_path, x)), files)
+            for action, size in results:
+                report['files'] += 1
+                report[action] += 1
+                report['skipped_bytes' if action == 'skipped' else 'copied_bytes'] += size
+        return report
+
+class assetsManifest(object):
+    def __init__(self):
+        self.file_path:str = None
+        self.meta: dict[str, str] = {} # xcmod hash, pbxproj stamp, base_path of last import
+        self.assets: dict[str, str] = {} # asset path => target selector json
+        self.files: dict[str, list] = {} # relative file path => [size, mtime_ns, md5]
+        self.outputs: dict[str, str] = {} # plist and class files merged into, relative to xcode project => stamp
+        self.refs: dict[str, list] = {} # asset path => uuids of references and build files the import created
+
+    def load(self, file_path:str):
+        self.file_path = file_path
+        self.meta, self.assets, self.files, self.outputs, self.refs = {}, {}, {}, {}, {}
+        if not os.path.exists(file_path): return
+        with open(file_path, 'r') as fp:
+            data = json.load(fp)
+        self.meta, self.assets, self.files, self.outputs, self.refs = data.get('meta', {}), data.get('assets', {}), data.get('files', {}), data.get('outputs', {}), data.get('refs', {})
+
+    def save(self, file_path:str = None):
+        if file_path: self.file_path = file_path
+        temp_path = '{}.{}'.format(self.file_path, os.getpid())
+        with open(temp_path, 'w') as fp:
+            json.dump({'meta': self.meta, 'assets': self.assets, 'files': self.files, 'outputs': self.outputs, 'refs': self.refs}, fp, indent=1, sort_keys=True)
+        os.replace(temp_path, self.file_path)
+
+    def scan(self, base_path:str, assets:List[str], copier:assetsCopier)->Dict[str, list]:
+        files: dict[str, list] = {}
+        pending: list[str] = []
+        for node_path, is_dir in copier.walk(base_path, assets):
+            if is_dir: continue
+            stat = os.lstat(os.path.join(base_path, node_path))
+            record = self.files.get(node_path)
+            if record and record[0] == stat.st_size and record[1] == stat.st_mtime_ns:
+                files[node_path] = record
+            else:
+                files[node_path] = [stat.st_size, stat.st_mtime_ns, None]
+                pending.append(node_path)
+        def digest(node_path:str)->str:
+            location = os.path.join(base_path, node_path)
+            return os.readlink(location) if os.path.islink(location) else assetsCopier.digest(location)
+        with ThreadPoolExecutor(max_workers=copier.workers) as executor:
+            for node_path, md5 in zip(pending, executor.map(digest, pending)): files[node_path][2] = md5
+        return files
+
+    def diff(self, files:Dict[str, list])->Tuple[List[str], List[str], List[str]]:
+        added, modified = [], []
+        for node_path, record in files.items():
+            previous = self.files.get(node_path)
+            if not previous:
+                added.append(node_path)
+            elif previous[0] != record[0] or previous[2] != record[2]:
+                modified.append(node_path)
+        removed = [x for x in self.files if x not in files]
+        return added, modified, removed
+
+def dedup_assets(assets:List[str], files:Dict[str, list], scopes:List[str] = None)->Tuple[Dict[str, str], Dict[str, list], int]:
+    # same name, same content and same scope (e.g. target selector): keep the first one
+    paths = sorted(files)
+    def select(asset_path:str)->List[str]:
+        if asset_path in files: return [asset_path]
+        start = bisect.bisect_left(paths, asset_path + '/')
+        return paths[start:bisect.bisect_left(paths, asset_path + '0')] # '0' sorts right after '/'
+    duplicates: dict[str, str] = {} # duplicate asset => kept asset
+    kept: dict[tuple, str] = {}
+    saved = 0
+    for n, asset_path in enumerate(assets):
+        nodes = select(asset_path)
+        md5 = hashlib.md5()
+        for node_path in nodes: md5.update('{}\0{}\n'.format(node_path[len(asset_path):], files[node_path][2]).encode('utf-8'))
+        key = (os.path.basename(asset_path), md5.hexdigest(), scopes[n] if scopes else None)
+        if key not in kept:
+            kept[key] = asset_path
+            continue
+        duplicates[asset_path] = kept[key]
+        for node_path in nodes:
+            saved += files[node_path][0]
+    if not duplicates: return duplicates, files, 0
+    excluded = {x for asset_path in duplicates for x in select(asset_path)}
+    return duplicates, {k:v for k, v in files.items() if k not in excluded}, saved
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument('--base-path', '-b', required=True)
+    arguments.add_argument('--output-path', '-o', required=True)
+    arguments.add_argument('--exclude', '-e', nargs='+', default=['meta'], help='file extensions to skip')
+    arguments.add_argument('--link', choices=LINK_MODES, default='clone')
+    arguments.add_argument('--workers', '-w', type=int)
+    arguments.add_argument('assets', nargs='+', help='files or directories relative to base path')
+    options = arguments.parse_args(sys.argv[1:])
+    copier = assetsCopier(exclude_types=options.exclude, link=options.link, workers=options.workers)
+    print(copier.copy(options.base_path, options.assets, options.output_path))
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+
+import argparse, sys, os, re, mmap, time, hashlib, marshal, enum
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# separators, comments and '=' are skipped, so a match is either a bracket or a string token
+TOKEN_PATTERN = re.compile(rb'[\s,;=]*(?:(?:/\*.*?\*/|//[^\n]*)[\s,;=]*)*(?:([{}()])|("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^\s,;=(){}"\']+))', re.S)
+# only brackets matter while skipping an object body, unquoted words never contain them
+BRACKET_PATTERN = re.compile(rb'[^{}()"\'/]*(?:(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|/\*.*?\*/|//[^\n]*|/)[^{}()"\'/]*)*([{}()])', re.S)
+
+# one match per objects entry: closing '}', or key followed by a scalar, an opening bracket or a whole bracket-free dictionary
+ENTRY_PATTERN = re.compile(rb'[\s,;=]*(?:(?:/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*)[\s,;=]*)*(?:(\})|("[^"\\]*(?:\\.[^"\\]*)*"|[^\s,;=(){}"\']+)[\s,;=]*(?:(?:/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*)[\s,;=]*)*(?:(\{[^{}()"\'/]*(?:(?:"[^"\\]*(?:\\.[^"\\]*)*"|\'[^\'\\]*(?:\\.[^\'\\]*)*\'|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*|/)[^{}()"\'/]*)*\})|([{(])|("[^"\\]*(?:\\.[^"\\]*)*"|\'[^\'\\]*(?:\\.[^\'\\]*)*\'|[^\s,;=(){}"\']+)))')
+
+class EventType(enum.Enum):
+    begin_dict, end_dict, begin_array, end_array, key, value = range(6)
+
+class pbxprojParser(object):
+    def __init__(self, buffer:bytes):
+        self.__buffer = buffer
+
+    @property
+    def buffer(self)->bytes: return self.__buffer
+
+    @staticmethod
+    def open(file_path:str, mapping:bool = False):
+        with open(file_path, mode='rb') as fp:
+            if mapping:
+                return pbxprojParser(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+            return pbxprojParser(fp.read())
+
+    def read_object(self, offset:int = 0, end:int = None)->Tuple[any, int]:
+        end = len(self.__buffer) if end is None else end
+        root, container, name, stack = None, None, None, []
+        for match in TOKEN_PATTERN.finditer(self.__buffer, offset, end):
+            token = match.group(1)
+            if token is None:
+                value = match.group(2).decode('utf-8')
+                if container is None: return value, match.end()
+                if isinstance(container, list):
+                    container.append(value)
+                elif name is None:
+                    name = value
+                else:
+                    container[name] = value
+                    name = None
+            elif token == b'{' or token == b'(':
+                item = {} if token == b'{' else []
+                if container is None:
+                    root = item
+                elif isinstance(container, list):
+                    container.append(item)
+                else:
+                    container[name] = item
+                stack.append(container)
+                container, name = item, None
+            else:
+                if not stack: raise SyntaxError('not expect {!r} at {}'.format(token.decode(), match.start()))
+                container, name = stack.pop(), None
+                if not stack: return root, match.end()
+        raise EOFError('expect more data')
+
+    def parse(self)->dict:
+        return self.read_object()[0]
+
+    def __next(self, offset:int):
+        match = TOKEN_PATTERN.match(self.__buffer, offset)
+        if not match: raise EOFError('expect more data')
+        return match
+
+    def __skip_object(self, offset:int)->int:
+        depth = 1
+        for match in BRACKET_PATTERN.finditer(self.__buffer, offset):
+            depth += 1 if match.group(1) in b'{(' else -1
+            if depth == 0: return match.end()
+        raise EOFError('expect more data')
+
+    def __iter_spans(self, offset:int)->Iterator[Tuple[Optional[str], Tuple[int, int, int]]]:
+        match = self.__next(offset)
+        if match.group(1) != b'{': raise SyntaxError('expect \'{{\' at {}'.format(match.start()))
+        offset = match.end()
+        while True:
+            match = ENTRY_PATTERN.match(self.__buffer, offset)
+            if not match:
+                match = self.__next(offset)
+                raise SyntaxError('not expect {!r} at {}'.format(match.group(0).strip().decode(), match.start()))
+            if match.group(1):
+                yield None, (match.start(1),) * 3 # closing '}'
+                return
+            name, start = match.group(2).decode('utf-8'), match.start(2)
+            if match.group(3): # flat dictionary, already matched as a whole
+                offset = match.end()
+                yield name, (start, match.start(3), offset)
+            elif match.group(4):
+                offset = self.__skip_object(match.end())
+                yield name, (start, match.start(4), offset)
+            else:
+                offset = match.end()
+                yield name, (start, match.start(5), offset)
+
+    def __read_spans(self, offset:int)->Tuple[Dict[str, Tuple[int, int, int]], int]:
+        spans = {}
+        for name, span in self.__iter_spans(offset):
+            if name is None: return spans, span[0]
+            spans[name] = span
+
+    def read_index(self, field_name:str = 'objects')->dict:
+        match = self.__next(0)
+        if match.group(1) != b'{': raise SyntaxError('expect \'{{\' at {}'.format(match.start()))
+        data, offset = {}, match.end()
+        while True:
+            match = self.__next(offset)
+            if match.group(1) == b'}':
+                objects = data.get(field_name)
+                if isinstance(objects, pbxprojObjects):
+                    objects.attributes = marshal.loads(marshal.dumps({k:v for k, v in data.items() if k != field_name}))
+                return data
+            if match.group(1): raise SyntaxError('not expect {!r} at {}'.format(match.group(1).decode(), match.start()))
+            name = match.group(2).decode('utf-8')
+            if name == field_name:
+                spans, offset = self.__read_spans(match.end())
+                data[name] = pbxprojObjects(self, spans, offset)
+                offset += 1
+            else:
+                data[name], offset = self.read_object(match.end())
+
+    def load_index(self, data:dict, field_name:str = 'objects')->Optional[dict]:
+        # root of read_index with objects as cached spans, None if spans were taken from other bytes
+        index = data.get(field_name)
+        if not isinstance(index, dict) or index.get('size') != len(self.__buffer): return None
+        data = dict(data)
+        objects = data[field_name] = pbxprojObjects(self, index.get('spans'), index.get('end'))
+        objects.attributes = marshal.loads(marshal.dumps({k:v for k, v in data.items() if k != field_name}))
+        return data
+
+    def iter_objects(self, field_name:str = 'objects')->Iterator[Tuple[str, str, any]]:
+        match = self.__next(0)
+        if match.group(1) != b'{': raise SyntaxError('expect \'{{\' at {}'.format(match.start()))
+        offset = match.end()
+        while True:
+            match = self.__next(offset)
+            if match.group(1): return
+            if match.group(2).decode('utf-8') == field_name: break
+            offset = self.read_object(match.end())[1]
+        for uuid, span in self.__iter_spans(match.end()):
+            if uuid is None: return
+            data = self.read_object(span[1], span[2])[0]
+            yield uuid, data.get('isa') if isinstance(data, dict) else None, data
+
+    def iter_events(self)->Iterator[Tuple[EventType, Optional[str]]]:
+        stack = [] # [is dictionary, expect key]
+        for match in TOKEN_PATTERN.finditer(self.__buffer):
+            token = match.group(1)
+            if token is None:
+                value = match.group(2).decode('utf-8')
+                if stack and stack[-1][0]:
+                    scope = stack[-1]
+                    scope[1] = not scope[1]
+                    yield (EventType.key if scope[1] is False else EventType.value), value
+                else:
+                    yield EventType.value, value
+            elif token == b'{' or token == b'(':
+                if stack and stack[-1][0]: stack[-1][1] = True
+                stack.append([token == b'{', True])
+                yield (EventType.begin_dict if token == b'{' else EventType.begin_array), None
+            else:
+                if not stack: raise SyntaxError('not expect {!r} at {}'.format(token.decode(), match.start()))
+                stack.pop()
+                yield (EventType.end_dict if token == b'}' else EventType.end_array), None
+                if not stack: return
+
+def iter_pbx_events(file_path:str)->Iterator[Tuple[EventType, Optional[str]]]:
+    parser = pbxprojParser.open(file_path, mapping=True)
+    try:
+        yield from parser.iter_events()
+    finally:
+        parser.buffer.close()
+
+def iter_pbx_objects(file_path:str)->Iterator[Tuple[str, str, any]]:
+    parser = pbxprojParser.open(file_path, mapping=True)
+    try:
+        yield from parser.iter_objects()
+    finally:
+        parser.buffer.close()
+
+class pbxprojObjects(dict):
+    def __init__(self, parser:pbxprojParser, spans:Dict[str, Tuple[int, int, int]], end:int):
+        super(pbxprojObjects, self).__init__()
+        self.__parser = parser
+        self.__spans = spans # ordered uuid set, span is None for entries added after loading
+        self.__removed: dict[str, Tuple[int, int, int]] = {}
+        self.end = end # offset of closing '}'
+        self.attributes: dict[str, any] = {} # root fields besides objects as they were loaded
+
+    @property
+    def parser(self)->pbxprojParser: return self.__parser
+
+    def span(self, uuid:str)->Optional[Tuple[int, int, int]]:
+        return self.__spans.get(uuid)
+
+    def raw(self, uuid:str)->Optional[bytes]:
+        span = self.__spans.get(uuid)
+        return self.__parser.buffer[span[1]:span[2]] if span and not dict.__contains__(self, uuid) else None
+
+    def __getitem__(self, uuid:str):
+        if dict.__contains__(self, uuid): return dict.__getitem__(self, uuid)
+        _, offset, end = self.__spans[uuid]
+        item = self.__parser.read_object(offset, end)[0]
+        dict.__setitem__(self, uuid, item)
+        return item
+
+    def get(self, uuid:str, default:any = None):
+        return self[uuid] if uuid in self.__spans else default
+
+    def __contains__(self, uuid:str)->bool:
+        return uuid in self.__spans
+
+    def __setitem__(self, uuid:str, data:any):
+        if uuid not in self.__spans: self.__spans[uuid] = self.__removed.pop(uuid, None)
+        dict.__setitem__(self, uuid, data)
+
+    def __delitem__(self, uuid:str):
+        span = self.__spans.pop(uuid)
+        if span: self.__removed[uuid] = span
+        dict.pop(self, uuid, None)
+
+    def pop(self, uuid:str, *default):
+        if uuid not in self.__spans:
+            if default: return default[0]
+            raise KeyError(uuid)
+        item = self[uuid]
+        del self[uuid]
+        return item
+
+    def __iter__(self): return iter(self.__spans)
+
+    def __len__(self)->int: return len(self.__spans)
+
+    def keys(self): return self.__spans.keys()
+
+    def values(self):
+        for uuid in self.__spans: yield self[uuid]
+
+    def items(self):
+        for uuid in self.__spans: yield uuid, self[uuid]
+
+    def clear(self):
+        for uuid in list(self.__spans): del self[uuid]
+
+    def find(self, isa:str)->Iterator[Tuple[str, dict]]:
+        # entries of one isa, undecoded ones are decoded (and not kept) only when their bytes mention it
+        marker, buffer = isa.encode('utf-8'), self.__parser.buffer
+        for uuid, span in self.__spans.items():
+            if dict.__contains__(self, uuid):
+                data = dict.__getitem__(self, uuid)
+            elif buffer.find(marker, span[1], span[2]) >= 0:
+                data = self.__parser.read_object(span[1], span[2])[0]
+            else:
+                continue
+            if isinstance(data, dict) and data.get('isa') == isa: yield uuid, data
+
+    def decoded(self)->List[str]:
+        # entries handed out since loading, only these can have been edited in place
+        return [x for x in dict.keys(self) if x in self.__spans]
+
+    def origin(self, uuid:str)->Optional[Tuple[int, int, int]]:
+        # span in the loaded bytes, also for removed entries, None for entries added after loading
+        span = self.__spans.get(uuid)
+        return span if span else self.__removed.get(uuid)
+
+    def index(self)->Tuple[Dict[str, Tuple[int, int, int]], int]:
+        return self.__spans, self.end
+
+    def resolve(self)->Dict[str, any]:
+        return {uuid:self[uuid] for uuid in self.__spans}
+
+def diff_value(old:any, new:any)->Dict[str, any]:
+    if isinstance(old, list) and isinstance(new, list):
+        old_set, new_set = set(map(repr, old)), set(map(repr, new))
+        change: dict[str, any] = {}
+        added = [x for x in new if repr(x) not in old_set]
+        removed = [x for x in old if repr(x) not in new_set]
+        if added: change['added'] = added
+        if removed: change['removed'] = removed
+        if not change: change['reordered'] = True
+        return change
+    return {'old': old, 'new': new}
+
+def diff_fields(old:Dict[str, any], new:Dict[str, any])->Dict[str, Dict[str, any]]:
+    fields: dict[str, dict[str, any]] = {}
+    for name, value in old.items():
+        if name not in new:
+            fields[name] = {'old': value, 'new': None}
+        elif new[name] != value:
+            fields[name] = diff_value(value, new[name])
+    for name, value in new.items():
+        if name not in old: fields[name] = {'old': None, 'new': value}
+    return fields
+
+def diff_objects(old:pbxprojObjects, new:pbxprojObjects)->Dict[str, any]:
+    added, removed, changed = {}, {}, {}
+    counter: dict[str, dict[str, int]] = {}
+    def count(kind:str, data:any):
+        isa = data.get('isa') if isinstance(data, dict) else None
+        kinds = counter.setdefault(isa, {})
+        kinds[kind] = kinds.get(kind, 0) + 1
+    for uuid in old.keys():
+        if uuid not in new:
+            removed[uuid] = old[uuid]
+            count('removed', removed[uuid])
+            continue
+        raw = old.raw(uuid)
+        if raw is not None and raw == new.raw(uuid): continue # byte-identical, nothing to decode
+        a, b = old[uuid], new[uuid]
+        if a == b: continue # only notes or layout differ
+        changed[uuid] = {'isa': b.get('isa'), 'fields': diff_fields(a, b)} if isinstance(a, dict) and isinstance(b, dict) else diff_value(a, b)
+        count('changed', b)
+    for uuid in new.keys():
+        if uuid not in old:
+            added[uuid] = new[uuid]
+            count('added', added[uuid])
+    return {'added': added, 'removed': removed, 'changed': changed, 'summary': counter}
+
+def diff_pbxproj(old_path:str, new_path:str)->Dict[str, any]:
+    old = pbxprojParser.open(old_path, mapping=True)
+    new = pbxprojParser.open(new_path, mapping=True)
+    try:
+        old_data, new_data = old.read_index(), new.read_index()
+        result = diff_objects(old_data.get('objects'), new_data.get('objects'))
+        old_attributes = {k:v for k, v in old_data.items() if k != 'objects'}
+        new_attributes = {k:v for k, v in new_data.items() if k != 'objects'}
+        attributes = diff_fields(old_attributes, new_attributes)
+        if attributes: result['attributes'] = attributes
+        return result
+    finally:
+        old.buffer.close()
+        new.buffer.close()
+
+class pbxprojCache(object):
+    def __init__(self, cache_path:str, size_limit:int = 512 << 20):
+        self.__cache_path = os.path.abspath(os.path.expanduser(cache_path))
+        self.__size_limit = size_limit
+        if not os.path.isdir(self.__cache_path): os.makedirs(self.__cache_path)
+
+    @staticmethod
+    def key(file_path:str, lazy:bool = False)->str:
+        # stat identifies the file, content is only hashed while mtime is too recent to tell edits apart
+        stat = os.stat(file_path)
+        key = '{}-{}-{}-{}-{}'.format(os.path.abspath(file_path), stat.st_ino, stat.st_size, stat.st_mtime_ns, 'lazy' if lazy else 'eager')
+        if time.time_ns() - stat.st_mtime_ns < 2_000_000_000:
+            md5 = hashlib.md5()
+            with open(file_path, mode='rb') as fp:
+                while True:
+                    chunk = fp.read(1 << 20)
+                    if not chunk: break
+                    md5.update(chunk)
+            key += '-{}'.format(md5.hexdigest())
+        return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def __location(self, key:str)->str:
+        return os.path.join(self.__cache_path, '{}.pbxcache'.format(key))
+
+    def get(self, key:str)->Optional[dict]:
+        location = self.__location(key)
+        if not os.path.exists(location): return None
+        try:
+            with open(location, mode='rb') as fp:
+                data = marshal.loads(fp.read())
+        except (EOFError, ValueError, TypeError):
+            os.remove(location)
+            return None
+        os.utime(location) # refresh LRU order
+        return data
+
+    def put(self, key:str, data:dict):
+        objects = data.get('objects')
+        if isinstance(objects, pbxprojObjects): # spans only, restored with pbxprojParser.load_index
+            spans, end = objects.index()
+            index = {'spans': spans, 'end': end, 'size': len(objects.parser.buffer)}
+            data = {k:(index if v is objects else v) for k, v in data.items()}
+        location = self.__location(key)
+        temp_location = '{}.{}'.format(location, os.getpid())
+        with open(temp_location, mode='wb') as fp:
+            fp.write(marshal.dumps(data))
+        os.replace(temp_location, location)
+        self.evict()
+
+    def evict(self):
+        entries, total_size = [], 0
+        for node in os.scandir(self.__cache_path):
+            if not node.name.endswith('.pbxcache'): continue
+            stat = node.stat()
+            entries.append((stat.st_mtime, stat.st_size, node.path))
+            total_size += stat.st_size
+        entries.sort()
+        while entries and total_size > self.__size_limit:
+            _, size, location = entries.pop(0)
+            os.remove(location)
+            total_size -= size
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument('--pbxproj-path', '-f', required=True)
+    arguments.add_argument('--lazy', '-l', action='store_true')
+    arguments.add_argument('--stats', '-s', action='store_true', help='count objects by isa in streaming mode')
+    options = arguments.parse_args(sys.argv[1:])
+    timestamp = time.perf_counter()
+    if options.stats:
+        counter: dict[str, int] = {}
+        for _, isa, _ in iter_pbx_objects(options.pbxproj_path):
+            counter[isa] = counter.get(isa, 0) + 1
+        for isa, count in sorted(counter.items(), key=lambda x: -x[1]): print('{:8d} {}'.format(count, isa))
+        print('elapse={:.3f}s'.format(time.perf_counter() - timestamp))
+        sys.exit()
+    if options.lazy:
+        data = pbxprojParser.open(options.pbxproj_path, mapping=True).read_index()
+    else:
+        data = pbxprojParser.open(options.pbxproj_path).parse()
+    print('objects={} elapse={:.3f}s'.format(len(data.get('objects')), time.perf_counter() - timestamp))
@@ -0,0 +1,72 @@
+import os, sys, json, shutil
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+sys.path.insert(0, ROOT_PATH)
+
+def load(file_path:str, parser:str = 'fast', **kwargs):
+    from xcmod import XcodeProject
+    project = XcodeProject()
+    project.load_pbxproj(file_path, parser=parser, **kwargs)
+    return project
+
+@pytest.fixture
+def project_path(tmp_path)->str:
+    # xcode project dir: demo.xcodeproj/project.pbxproj, Info.plist, Classes/UnityAppController.mm
+    project_path = tmp_path / 'project'
+    (project_path / 'demo.xcodeproj').mkdir(parents=True)
+    (project_path / 'Classes').mkdir()
+    shutil.copy(os.path.join(DATA_PATH, 'project.pbxproj'), str(project_path / 'demo.xcodeproj' / 'project.pbxproj'))
+    shutil.copy(os.path.join(DATA_PATH, 'Info.plist'), str(project_path / 'Info.plist'))
+    shutil.copy(os.path.join(DATA_PATH, 'UnityAppController.mm'), str(project_path / 'Classes' / 'UnityAppController.mm'))
+    return str(project_path)
+
+@pytest.fixture
+def pbxproj_path(project_path:str)->str:
+    return os.path.join(project_path, 'demo.xcodeproj', 'project.pbxproj')
+
+@pytest.fixture
+def unity_path(tmp_path)->str:
+    # unity export with native plugins
+    files = {
+        'Assets/Plugins/iOS/A.mm': 'void a() {}\n',
+        'Assets/Plugins/iOS/A.h': 'void a();\n',
+        'Assets/Plugins/iOS/A.mm.meta': 'guid: 0\n',
+        'Assets/Plugins/iOS/Sub/B.m': 'void b() {}\n',
+        'Assets/Plugins/iOS/Sub/lib.a': '!<arch>\n',
+        'Assets/Plugins/iOS/Sub/icon.png': 'png',
+        'Assets/Plugins/MSDK/iOS/WG.bundle/x': 'x',
+        'Assets/Plugins/MSDK/iOS/MSDK.framework/MSDK': 'msdk',
+        'Assets/Mods/app.entitlements': '<plist/>\n',
+    }
+    unity_path = tmp_path / 'unity'
+    for name, content in files.items():
+        location = unity_path / name
+        location.parent.mkdir(parents=True, exist_ok=True)
+        location.write_text(content)
+    return str(unity_path)
+
+@pytest.fixture
+def xcmod_path(tmp_path, unity_path:str)->str:
+    xcmod = {
+        'imports': {
+            'base_path': unity_path,
+            'exclude': ['meta'],
+            'items': [
+                {'path': 'Assets/Plugins/iOS', 'type': 'tree'},
+                {'path': 'Assets/Mods/app.entitlements'},
+                {'path': 'Assets/Plugins/MSDK/iOS/WG.bundle'},
+                {'path': 'CoreTelephony.framework'}
+            ],
+            'embed': ['Assets/Plugins/MSDK/iOS/MSDK.framework']
+        },
+        'settings': {'ENABLE_BITCODE': 'NO', 'ARCHS': 'arm64'},
+        'compiler_flags': ['-DFOO'],
+        'link_flags': ['-ObjC', '-lz'],
+        'class': [{'path': 'Classes/UnityAppController.mm', 'imports': ['X.h'], 'injections': [{'code': 'int a = 1;', 'func': '-(void)start'}]}],
+        'plist': {'UIStatusBarHidden': True, 'CFBundleURLTypes': [{'CFBundleURLSchemes': ['demo']}]}
+    }
+    file_path = tmp_path / 'test.xcmod'
+    file_path.write_text(json.dumps(xcmod, indent=1))
+    return str(file_path)
@@ -0,0 +1,7 @@
+#import "UnityAppController.h"
+@implementation UnityAppController
+-(void)start
+{
+    printf("x");
+}
+@end
@@ -0,0 +1,111 @@
+import os, re, shutil
+import pytest
+from assets import assetsCopier, assetsManifest, walk_tree, dedup_assets
+
+ASSETS = ['Assets/Plugins/iOS', 'Assets/Plugins/MSDK/iOS/WG.bundle']
+
+def read(file_path:str)->str:
+    with open(file_path, 'r') as fp:
+        return fp.read()
+
+def test_copy_and_skip(tmp_path, unity_path:str):
+    dst_path = str(tmp_path / 'out')
+    report = assetsCopier(link='copy').copy(unity_path, ASSETS, dst_path)
+    assert (report['files'], report['copied'], report['skipped']) == (6, 6, 0)
+    assert read(os.path.join(dst_path, 'Assets/Plugins/iOS/Sub/B.m')) == 'void b() {}\n'
+    assert not os.path.exists(os.path.join(dst_path, 'Assets/Plugins/iOS/A.mm.meta'))
+    report = assetsCopier(link='copy').copy(unity_path, ASSETS, dst_path)
+    assert (report['copied'], report['skipped'], report['skipped_bytes']) == (0, 6, report['copied_bytes'] + report['skipped_bytes'])
+
+def test_touched_but_same(tmp_path, unity_path:str):
+    dst_path = str(tmp_path / 'out')
+    assetsCopier(link='copy').copy(unity_path, ASSETS, dst_path)
+    src = os.path.join(unity_path, 'Assets/Plugins/iOS/A.mm')
+    dst = os.path.join(dst_path, 'Assets/Plugins/iOS/A.mm')
+    os.utime(src, ns=(1, 1_000_000_000))
+    report = assetsCopier(link='copy').copy(unity_path, ASSETS, dst_path)
+    assert (report['copied'], report['skipped']) == (0, 6)
+    assert os.stat(dst).st_mtime_ns == 1_000_000_000
+    with open(src, 'w') as fp:
+        fp.write('void a() {1}\n') # same size, new content
+    report = assetsCopier(link='copy').copy(unity_path, ASSETS, dst_path)
+    assert report['copied'] == 1 and read(dst) == 'void a() {1}\n'
+
+def test_hardlink(tmp_path, unity_path:str):
+    dst_path = str(tmp_path / 'out')
+    report = assetsCopier(link='hardlink').copy(unity_path, ASSETS, dst_path)
+    assert report['linked'] == 6
+    src = os.path.join(unity_path, 'Assets/Plugins/iOS/A.h')
+    dst = os.path.join(dst_path, 'Assets/Plugins/iOS/A.h')
+    assert os.path.samefile(src, dst)
+    assert assetsCopier(link='hardlink').copy(unity_path, ASSETS, dst_path)['skipped'] == 6
+    os.remove(src)
+    with open(src, 'w') as fp:
+        fp.write('void a(int);\n')
+    assert assetsCopier(link='copy').copy(unity_path, ASSETS, dst_path)['copied'] == 1
+    assert not os.path.samefile(src, dst) and read(dst) == 'void a(int);\n'
+
+def test_clone_falls_back_to_copy(tmp_path, unity_path:str):
+    dst_path = str(tmp_path / 'out')
+    copier = assetsCopier(link='clone')
+    report = copier.copy(unity_path, ASSETS, dst_path)
+    assert report['cloned'] + report['copied'] == 6 and report['linked'] == 0
+    assert read(os.path.join(dst_path, 'Assets/Plugins/MSDK/iOS/WG.bundle/x')) == 'x'
+    assert not os.path.samefile(os.path.join(unity_path, 'Assets/Plugins/iOS/A.h'), os.path.join(dst_path, 'Assets/Plugins/iOS/A.h'))
+
+def test_symlinks(tmp_path, unity_path:str):
+    os.symlink('A.h', os.path.join(unity_path, 'Assets/Plugins/iOS/B.h'))
+    dst_path = str(tmp_path / 'out')
+    assetsCopier(link='copy').copy(unity_path, ['Assets/Plugins/iOS'], dst_path)
+    assert os.readlink(os.path.join(dst_path, 'Assets/Plugins/iOS/B.h')) == 'A.h'
+    assert assetsCopier(link='copy').copy(unity_path, ['Assets/Plugins/iOS'], dst_path)['copied'] == 0
+
+def test_unknown_mode():
+    with pytest.raises(AssertionError):
+        assetsCopier(link='rsync')
+
+def test_walk_tree(unity_path:str):
+    os.makedirs(os.path.join(unity_path, 'Assets/Plugins/.git'))
+    open(os.path.join(unity_path, 'Assets/Plugins/.DS_Store'), 'w').close()
+    result = sorted(walk_tree(unity_path, 'Assets/Plugins', re.compile(r'\.(meta)$')))
+    assert result == ['Assets/Plugins/MSDK/iOS/MSDK.framework', 'Assets/Plugins/MSDK/iOS/WG.bundle', 'Assets/Plugins/iOS/A.h', 'Assets/Plugins/iOS/A.mm',
+                      'Assets/Plugins/iOS/Sub/B.m', 'Assets/Plugins/iOS/Sub/icon.png', 'Assets/Plugins/iOS/Sub/lib.a']
+    assert sorted(walk_tree(unity_path, './Assets/Plugins/', re.compile(r'\.(meta)$'), workers=1)) == result
+
+def test_walk_tree_records_dirs(unity_path:str):
+    mtimes = {}
+    list(walk_tree(unity_path, 'Assets/Plugins/iOS', mtimes=mtimes))
+    assert sorted(mtimes) == ['Assets/Plugins/iOS', 'Assets/Plugins/iOS/Sub']
+    assert mtimes['Assets/Plugins/iOS/Sub'] == os.stat(os.path.join(unity_path, 'Assets/Plugins/iOS/Sub')).st_mtime_ns
+
+def test_walk_tree_matches_os_walk(tmp_path):
+    for n in range(40):
+        dir_path = tmp_path / 'tree' / 'd{}'.format(n % 7) / 'e{}'.format(n % 3)
+        dir_path.mkdir(parents=True, exist_ok=True)
+        (dir_path / 'f{}.m'.format(n)).write_text('')
+    expected = sorted(os.path.relpath(os.path.join(x, f), str(tmp_path)) for x, _, files in os.walk(str(tmp_path / 'tree')) for f in files)
+    assert sorted(walk_tree(str(tmp_path), 'tree', workers=4)) == expected
+
+def test_dedup_assets():
+    files = {'a/X.bundle/x': [3, 0, 'm1'], 'a/X.bundle/y': [4, 0, 'm2'], 'b/X.bundle/x': [3, 0, 'm1'], 'b/X.bundle/y': [4, 0, 'm2'],
+             'b/X.bundle-old/x': [3, 0, 'm1'], 'c/X.bundle/x': [3, 0, 'm9'], 'a/lib.a': [8, 0, 'm3'], 'b/lib.a': [8, 0, 'm3'], 'b/other.a': [8, 0, 'm3']}
+    assets = ['a/X.bundle', 'b/X.bundle', 'c/X.bundle', 'a/lib.a', 'b/lib.a', 'b/other.a']
+    duplicates, kept, saved = dedup_assets(assets, files)
+    assert duplicates == {'b/X.bundle': 'a/X.bundle', 'b/lib.a': 'a/lib.a'}
+    assert saved == 15
+    assert sorted(kept) == ['a/X.bundle/x', 'a/X.bundle/y', 'a/lib.a', 'b/X.bundle-old/x', 'b/other.a', 'c/X.bundle/x']
+
+def test_dedup_respects_scopes():
+    files = {'a/lib.a': [8, 0, 'm3'], 'b/lib.a': [8, 0, 'm3']}
+    assert dedup_assets(['a/lib.a', 'b/lib.a'], files, ['null', '"Tests"']) == ({}, files, 0)
+    assert dedup_assets(['a/lib.a', 'b/lib.a'], files, ['"Tests"', '"Tests"'])[0] == {'b/lib.a': 'a/lib.a'}
+
+def test_dedup_with_scanned_files(tmp_path, unity_path:str):
+    shutil.copytree(os.path.join(unity_path, 'Assets/Plugins/MSDK/iOS/WG.bundle'), os.path.join(unity_path, 'Assets/Other/WG.bundle'))
+    assets = ['Assets/Plugins/MSDK/iOS/WG.bundle', 'Assets/Other/WG.bundle']
+    files = assetsManifest().scan(unity_path, assets, assetsCopier())
+    assert dedup_assets(assets, files)[0] == {'Assets/Other/WG.bundle': 'Assets/Plugins/MSDK/iOS/WG.bundle'}
+    with open(os.path.join(unity_path, 'Assets/Other/WG.bundle/x'), 'w') as fp:
+        fp.write('y')
+    files = assetsManifest().scan(unity_path, assets, assetsCopier())
+    assert dedup_assets(assets, files)[0] == {}
@@ -0,0 +1,51 @@
+import os, sys, json, shutil, subprocess
+from conftest import ROOT_PATH
+from xcmod import XcodeProject
+from pbxproj import diff_pbxproj, diff_value
+
+def test_same_file(pbxproj_path:str):
+    assert diff_pbxproj(pbxproj_path, pbxproj_path) == {'added': {}, 'removed': {}, 'changed': {}, 'summary': {}}
+
+def test_diff_after_edits(tmp_path, pbxproj_path:str):
+    old_path = str(tmp_path / 'old.pbxproj')
+    shutil.copy(pbxproj_path, old_path)
+    project = XcodeProject()
+    project.load_pbxproj(pbxproj_path)
+    project.pbx_project.add_assets(['Classes/Foo.mm'])
+    project.pbx_project.add_build_setting('ENABLE_BITCODE', 'NO', config_name='Debug')
+    project.pbx_project.remove_file('main.mm')
+    project.save_pbxproj()
+    result = diff_pbxproj(old_path, pbxproj_path)
+    ref = project.get_ref_file('Classes/Foo.mm')
+    assert ref.uuid in result['added'] and result['added'][ref.uuid]['path'] == 'Classes/Foo.mm'
+    assert set(result['removed']) == {'29B97316FDCFA39411CA2CEA', '1D60589B0D05DD56006BFB54'}
+    config = result['changed']['1D6058940D05DD3E006BFB54']
+    assert config['isa'] == 'XCBuildConfiguration' and list(config['fields']) == ['buildSettings']
+    assert (config['fields']['buildSettings']['old']['ENABLE_BITCODE'], config['fields']['buildSettings']['new']['ENABLE_BITCODE']) == ('YES', 'NO')
+    sources = result['changed']['1D60588E0D05DD3D006BFB54']['fields']['files']
+    assert sources['removed'] == ['1D60589B0D05DD56006BFB54'] and len(sources['added']) == 1
+    assert result['summary']['PBXFileReference'] == {'added': 1, 'removed': 1}
+
+def test_notes_and_layout_are_ignored(tmp_path, pbxproj_path:str):
+    new_path = str(tmp_path / 'new.pbxproj')
+    with open(pbxproj_path, 'r') as fp:
+        content = fp.read()
+    with open(new_path, 'w') as fp:
+        fp.write(content.replace('/* main.mm */', '/* renamed */').replace('\t\t\tisa = PBXBuildFile;', '\t\t\tisa  =  PBXBuildFile;'))
+    result = diff_pbxproj(pbxproj_path, new_path)
+    assert result['changed'] == {} and result['summary'] == {}
+
+def test_diff_value():
+    assert diff_value(['a', 'b'], ['b', 'c']) == {'added': ['c'], 'removed': ['a']}
+    assert diff_value(['a', 'b'], ['b', 'a']) == {'reordered': True}
+    assert diff_value('a', ['a']) == {'old': 'a', 'new': ['a']}
+
+def test_cli(tmp_path, pbxproj_path:str):
+    old_path = str(tmp_path / 'old.pbxproj')
+    with open(pbxproj_path, 'r') as fp:
+        content = fp.read()
+    with open(old_path, 'w') as fp:
+        fp.write(content.replace('objectVersion = 50;', 'objectVersion = 46;'))
+    result = subprocess.run([sys.executable, os.path.join(ROOT_PATH, 'xcmod.py'), 'diff', old_path, pbxproj_path], stdout=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0
+    assert json.loads(result.stdout)['attributes'] == {'objectVersion': {'old': '46', 'new': '50'}}
@@ -0,0 +1,57 @@
+import os, sys, json, subprocess
+from conftest import ROOT_PATH
+from xcmod import XcodeProject
+from xcconfig import xcconfigObject
+
+def write_layers(tmp_path, *layers)->list:
+    file_paths = []
+    for n, xcmod in enumerate(layers):
+        file_path = tmp_path / 'layer{}.xcmod'.format(n)
+        file_path.write_text(json.dumps(xcmod))
+        file_paths.append(str(file_path))
+    return file_paths
+
+def apply(pbxproj_path:str, file_paths:list, **kwargs)->XcodeProject:
+    project = XcodeProject()
+    project.load_pbxproj(pbxproj_path)
+    project.import_xcmods(file_paths, **kwargs)
+    return project
+
+def test_later_layers_win_per_target(tmp_path, pbxproj_path:str):
+    file_paths = write_layers(tmp_path, {'settings': {'ARCHS': 'armv7'}}, {'target': '*', 'settings': {'ARCHS': 'arm64'}}, {'settings': {'ARCHS': 'arm64e'}})
+    project = apply(pbxproj_path, file_paths, settings_only=True)
+    values = project.pbx_project.settings.query('ARCHS')
+    assert values[('Unity-iPhone', 'Debug', 'ARCHS')] == 'arm64e' and values[('Tests', 'Release', 'ARCHS')] == 'arm64'
+
+def test_selectors_share_xcconfig(tmp_path, project_path:str, pbxproj_path:str):
+    file_paths = write_layers(tmp_path, {'xcconfig': 'Configs', 'settings': {'ARCHS': 'arm64'}},
+                              {'xcconfig': 'Configs', 'target': 'Unity-iPhone', 'settings': {'ENABLE_BITCODE': 'NO'}},
+                              {'xcconfig': 'Configs', 'target': 'Unity*', 'settings': {'OTHER_LDFLAGS': ['-ObjC']}})
+    apply(pbxproj_path, file_paths, settings_only=True)
+    xcconfig = xcconfigObject()
+    xcconfig.load(os.path.join(project_path, 'Configs', 'Unity-iPhone.Debug.xcconfig'))
+    assert xcconfig.settings == {'ARCHS': 'arm64', 'ENABLE_BITCODE': 'NO', 'OTHER_LDFLAGS': '-ObjC'}
+    assert xcconfig.meta['keys'] == 'ARCHS ENABLE_BITCODE OTHER_LDFLAGS'
+    assert not os.path.exists(os.path.join(project_path, 'Configs', 'Tests.Debug.xcconfig'))
+
+def test_conflicts_are_reported(tmp_path, pbxproj_path:str, capsys):
+    file_paths = write_layers(tmp_path, {'settings': {'ENABLE_BITCODE': 'NO'}}, {'target': 'Unity-iPhone', 'settings': {'ENABLE_BITCODE': 'YES'}})
+    project = apply(pbxproj_path, file_paths, settings_only=True)
+    lines = [x for x in capsys.readouterr().err.split('\n') if x.startswith('CONFLICT ')]
+    assert len(lines) == 1
+    conflict = json.loads(lines[0][len('CONFLICT '):])
+    assert (conflict['kind'], conflict['key'], conflict['target']) == ('settings', 'ENABLE_BITCODE', 'Unity-iPhone')
+    assert [x['value'] for x in conflict['layers']] == ['NO', 'YES']
+    assert set(project.pbx_project.settings.query('ENABLE_BITCODE', target='Unity-iPhone').values()) == {'YES'}
+
+def test_cli_strict(tmp_path, pbxproj_path:str, xcmod_path:str, unity_path:str):
+    file_paths = write_layers(tmp_path, {'imports': {'base_path': unity_path, 'items': []}, 'settings': {'ENABLE_BITCODE': 'YES'}})
+    command = [sys.executable, os.path.join(ROOT_PATH, 'xcmod.py'), '-f', pbxproj_path, '-x', xcmod_path] + file_paths
+    with open(pbxproj_path, 'rb') as fp:
+        content = fp.read()
+    result = subprocess.run(command + ['--strict'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 1 and result.stderr.count('CONFLICT ') == 1
+    with open(pbxproj_path, 'rb') as fp:
+        assert fp.read() == content
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0 and result.stderr.count('CONFLICT ') == 1
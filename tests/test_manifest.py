@@ -0,0 +1,107 @@
+import os, json, shutil
+from conftest import DATA_PATH
+from xcmod import XcodeProject
+
+def apply(pbxproj_path:str, xcmod_path:str)->XcodeProject:
+    project = XcodeProject()
+    project.load_pbxproj(pbxproj_path)
+    project.import_xcmods([xcmod_path])
+    return project
+
+def applied(pbxproj_path:str, xcmod_path:str)->bool:
+    return XcodeProject().is_xcmod_applied(xcmod_path, pbxproj_path)
+
+def edit_xcmod(xcmod_path:str, edit):
+    with open(xcmod_path, 'r') as fp:
+        xcmod = json.load(fp)
+    edit(xcmod)
+    with open(xcmod_path, 'w') as fp:
+        json.dump(xcmod, fp)
+
+def test_applied_until_something_changes(pbxproj_path:str, xcmod_path:str, unity_path:str):
+    assert not applied(pbxproj_path, xcmod_path)
+    apply(pbxproj_path, xcmod_path)
+    assert applied(pbxproj_path, xcmod_path)
+    with open(os.path.join(unity_path, 'Assets/Plugins/iOS/A.mm'), 'a') as fp:
+        fp.write('// edited\n')
+    assert not applied(pbxproj_path, xcmod_path)
+    apply(pbxproj_path, xcmod_path)
+    assert applied(pbxproj_path, xcmod_path)
+    edit_xcmod(xcmod_path, lambda x: x['settings'].update({'ARCHS': 'arm64e'}))
+    assert not applied(pbxproj_path, xcmod_path)
+
+def test_regenerated_outputs_are_merged_again(project_path:str, pbxproj_path:str, xcmod_path:str):
+    apply(pbxproj_path, xcmod_path)
+    plist_path = os.path.join(project_path, 'Info.plist')
+    with open(plist_path, 'r') as fp:
+        assert 'UIStatusBarHidden' in fp.read()
+    shutil.copy(os.path.join(DATA_PATH, 'Info.plist'), plist_path) # e.g. unity export replaced it
+    assert not applied(pbxproj_path, xcmod_path)
+    apply(pbxproj_path, xcmod_path)
+    with open(plist_path, 'r') as fp:
+        assert 'UIStatusBarHidden' in fp.read()
+    assert applied(pbxproj_path, xcmod_path)
+    shutil.copy(os.path.join(DATA_PATH, 'UnityAppController.mm'), os.path.join(project_path, 'Classes', 'UnityAppController.mm'))
+    assert not applied(pbxproj_path, xcmod_path)
+
+def test_incremental_copy(pbxproj_path:str, xcmod_path:str, unity_path:str, capsys):
+    apply(pbxproj_path, xcmod_path)
+    assert 'copy files=8 copied=8' in capsys.readouterr().out
+    with open(os.path.join(unity_path, 'Assets/Plugins/iOS/Sub/B.m'), 'a') as fp:
+        fp.write('// edited\n')
+    apply(pbxproj_path, xcmod_path)
+    assert 'copy files=1 copied=1' in capsys.readouterr().out
+
+def test_stale_assets_are_removed(project_path:str, pbxproj_path:str, xcmod_path:str, unity_path:str):
+    apply(pbxproj_path, xcmod_path)
+    project = XcodeProject()
+    project.load_pbxproj(pbxproj_path)
+    assert project.has_ref_file('System/Library/Frameworks/CoreTelephony.framework')
+    assert project.has_ref_file('Assets/Plugins/iOS/Sub/B.m')
+    shutil.rmtree(os.path.join(unity_path, 'Assets/Plugins/iOS/Sub'))
+    edit_xcmod(xcmod_path, lambda x: x['imports']['items'].remove({'path': 'CoreTelephony.framework'}))
+    project = apply(pbxproj_path, xcmod_path)
+    assert not project.has_ref_file('System/Library/Frameworks/CoreTelephony.framework')
+    assert project.query_files('Assets/Plugins/iOS/Sub') == []
+    assert not os.path.exists(os.path.join(project_path, 'Assets/Plugins/iOS/Sub'))
+    assert project.has_ref_file('Assets/Plugins/iOS/A.mm')
+    with open(pbxproj_path, 'r') as fp:
+        content = fp.read()
+    assert 'CoreTelephony' not in content and 'B.m' not in content
+
+def test_dedup_imports(project_path:str, pbxproj_path:str, xcmod_path:str, unity_path:str, capsys):
+    shutil.copytree(os.path.join(unity_path, 'Assets/Plugins/MSDK/iOS/WG.bundle'), os.path.join(unity_path, 'Assets/Other/WG.bundle'))
+    def enable(xcmod):
+        xcmod['imports']['dedup'] = True
+        xcmod['imports']['items'].append({'path': 'Assets/Other/WG.bundle'})
+    edit_xcmod(xcmod_path, enable)
+    project = apply(pbxproj_path, xcmod_path)
+    assert '>>> dedup Assets/Other/WG.bundle => Assets/Plugins/MSDK/iOS/WG.bundle' in capsys.readouterr().out
+    assert [x.path for x in project.query_files('*/WG.bundle')] == ['Assets/Plugins/MSDK/iOS/WG.bundle']
+    assert not os.path.exists(os.path.join(project_path, 'Assets/Other'))
+    assert applied(pbxproj_path, xcmod_path)
+
+def test_stale_removal_keeps_project_references(pbxproj_path:str, xcmod_path:str):
+    edit_xcmod(xcmod_path, lambda x: x['imports']['items'].append({'path': 'Foundation.framework'}))
+    project = apply(pbxproj_path, xcmod_path)
+    foundation = project.get_ref_file('System/Library/Frameworks/Foundation.framework').uuid
+    count = len(project.get_pbx_referrers(foundation))
+    edit_xcmod(xcmod_path, lambda x: x['imports']['items'].remove({'path': 'Foundation.framework'}))
+    project = apply(pbxproj_path, xcmod_path)
+    assert project.has_pbx_object(foundation) and len(project.get_pbx_referrers(foundation)) == count
+    assert 'Foundation.framework in Frameworks' in project.dump_pbxproj(True)
+
+def test_layers_with_same_name(tmp_path, pbxproj_path:str, xcmod_path:str, unity_path:str):
+    file_paths = []
+    for name in ('base', 'sdk'):
+        (tmp_path / name).mkdir()
+        file_paths.append(str(tmp_path / name / 'ios.xcmod'))
+    shutil.copy(xcmod_path, file_paths[0])
+    with open(file_paths[1], 'w') as fp:
+        json.dump({'imports': {'base_path': unity_path, 'items': [{'path': 'Assets/Plugins/MSDK/iOS/WG.bundle'}]}, 'settings': {'ARCHS': 'arm64'}}, fp)
+    project = XcodeProject()
+    project.load_pbxproj(pbxproj_path)
+    project.import_xcmods(file_paths)
+    manifests = [x for x in os.listdir(os.path.dirname(pbxproj_path)) if x.endswith('.manifest')]
+    assert len(manifests) == 2 and all(x.startswith('ios.xcmod.') for x in manifests)
+    assert all(applied(pbxproj_path, x) for x in file_paths)
@@ -0,0 +1,81 @@
+import os, sys, shutil, subprocess
+from conftest import ROOT_PATH
+from xcmod import XcodeProject
+from pbxproj import pbxprojParser
+
+def branch(pbxproj_path:str, file_path:str, edit):
+    shutil.copy(pbxproj_path, file_path)
+    project = XcodeProject()
+    project.load_pbxproj(file_path)
+    edit(project.pbx_project)
+    project.save_pbxproj(backup=False)
+    return project
+
+def fork(tmp_path, pbxproj_path:str, ours_edit, theirs_edit):
+    base_path, ours_path, theirs_path = [str(tmp_path / x) for x in ('base.pbxproj', 'ours.pbxproj', 'theirs.pbxproj')]
+    shutil.copy(pbxproj_path, base_path)
+    branch(pbxproj_path, ours_path, ours_edit)
+    branch(pbxproj_path, theirs_path, theirs_edit)
+    return base_path, ours_path, theirs_path
+
+def merge(base_path:str, ours_path:str, theirs_path:str):
+    project = XcodeProject()
+    project.load_pbxproj(ours_path, parser='lazy', generate_project=False)
+    conflicts = project.merge_pbxproj(base_path, theirs_path)
+    project.save_pbxproj(backup=False)
+    return conflicts
+
+def test_merge_both_sides(tmp_path, pbxproj_path:str):
+    base_path, ours_path, theirs_path = fork(tmp_path, pbxproj_path,
+        lambda x: x.add_assets(['Classes/Foo.mm']),
+        lambda x: (x.add_assets(['Classes/Bar.m', 'libz.tbd']), x.add_build_setting('ARCHS', 'arm64')))
+    assert merge(base_path, ours_path, theirs_path) == []
+    project = XcodeProject()
+    project.load_pbxproj(ours_path)
+    assert project.has_ref_file('Classes/Foo.mm') and project.has_ref_file('Classes/Bar.m')
+    names = [project.get_pbx_object(x.data.get('fileRef')).get('path') for x in project.pbx_project.sources_phase.files]
+    assert sorted(names[-2:]) == ['Classes/Bar.m', 'Classes/Foo.mm']
+    assert set(project.pbx_project.settings.query('ARCHS').values()) == {'arm64'}
+    with open(ours_path, 'r') as fp:
+        content = fp.read()
+    assert '/* Bar.m in Sources */ = {isa = PBXBuildFile;' in content and '/* libz.tbd in Frameworks */' in content
+    assert 'EXPECT_PHASE' not in content
+
+def test_merge_removals(tmp_path, pbxproj_path:str):
+    base_path, ours_path, theirs_path = fork(tmp_path, pbxproj_path,
+        lambda x: x.add_assets(['Classes/Foo.mm']),
+        lambda x: x.remove_file('main.mm'))
+    assert merge(base_path, ours_path, theirs_path) == []
+    objects = pbxprojParser.open(ours_path).parse().get('objects')
+    assert '29B97316FDCFA39411CA2CEA' not in objects and '1D60589B0D05DD56006BFB54' not in objects
+    assert '1D60589B0D05DD56006BFB54' not in objects['1D60588E0D05DD3D006BFB54']['files']
+
+def test_merge_conflicts_keep_ours(tmp_path, pbxproj_path:str):
+    base_path, ours_path, theirs_path = fork(tmp_path, pbxproj_path,
+        lambda x: x.add_build_setting('ENABLE_BITCODE', 'NO', config_name='Debug'),
+        lambda x: x.add_build_setting('ENABLE_BITCODE', 'MAYBE', config_name='Debug'))
+    conflicts = merge(base_path, ours_path, theirs_path)
+    assert conflicts == [{'path': ['1D6058940D05DD3E006BFB54', 'buildSettings', 'ENABLE_BITCODE'], 'base': 'YES', 'ours': 'NO', 'theirs': 'MAYBE'}]
+    assert pbxprojParser.open(ours_path).parse()['objects']['1D6058940D05DD3E006BFB54']['buildSettings']['ENABLE_BITCODE'] == 'NO'
+
+def test_merge_driver(tmp_path, pbxproj_path:str):
+    base_path, ours_path, theirs_path = fork(tmp_path, pbxproj_path,
+        lambda x: x.add_assets(['Classes/Foo.mm']),
+        lambda x: x.add_assets(['Classes/Bar.m']))
+    command = [sys.executable, os.path.join(ROOT_PATH, 'xcmod.py'), 'merge-driver', base_path, ours_path, theirs_path, 'demo.xcodeproj/project.pbxproj']
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == '' and '>>> {}'.format(ours_path) in result.stderr
+    objects = pbxprojParser.open(ours_path).parse().get('objects')
+    assert {x.get('path') for x in objects.values() if x.get('isa') == 'PBXFileReference'} >= {'Classes/Foo.mm', 'Classes/Bar.m'}
+    with open(theirs_path, 'r') as fp:
+        content = fp.read().replace('ENABLE_BITCODE = YES;', 'ENABLE_BITCODE = MAYBE;')
+    with open(theirs_path, 'w') as fp:
+        fp.write(content)
+    shutil.copy(base_path, ours_path)
+    with open(ours_path, 'r') as fp:
+        content = fp.read().replace('ENABLE_BITCODE = YES;', 'ENABLE_BITCODE = NO;', 1)
+    with open(ours_path, 'w') as fp:
+        fp.write(content)
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 1 and 'CONFLICT demo.xcodeproj/project.pbxproj' in result.stderr
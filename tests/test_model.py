@@ -0,0 +1,246 @@
+import os
+import pytest
+from conftest import load
+from xcmod import UUID_PATTERN, PBXObject, PBXObjectUnresolved, PBXGroup, PBXFileReference, PBXNativeTarget, PBXBuildFile, PBXSourcesBuildPhase, PBXCopyFilesBuildPhase
+
+def test_registry_dispatch(pbxproj_path:str):
+    project = load(pbxproj_path)
+    library = project.get_pbx_library()
+    assert PBXObject.registry.get('PBXGroup') is PBXGroup
+    assert isinstance(library.load('29B97316FDCFA39411CA2CEA'), PBXFileReference)
+    assert isinstance(library.load('1D6058900D05DD3D006BFB54'), PBXNativeTarget)
+    item = library.load('AA0000000000000000000020') # PBXContainerItemProxy has no class
+    assert isinstance(item, PBXObjectUnresolved) and item.isa == 'PBXContainerItemProxy'
+    assert item.note() == '/* PBXContainerItemProxy */'
+
+def test_objects_are_slotted(pbxproj_path:str):
+    project = load(pbxproj_path)
+    item = project.get_pbx_library().load('29B97316FDCFA39411CA2CEA')
+    assert not hasattr(item, '__dict__')
+    with pytest.raises(AttributeError):
+        item.anything = 1
+
+def test_build_file_note(pbxproj_path:str):
+    project = load(pbxproj_path)
+    item = project.get_pbx_library().load('1D60589B0D05DD56006BFB54')
+    assert isinstance(item, PBXBuildFile)
+    assert item.note() == '/* main.mm in Sources */'
+
+def test_find_decodes_only_matching_entries(pbxproj_path:str):
+    from pbxproj import pbxprojParser
+    objects = pbxprojParser.open(pbxproj_path, mapping=True).read_index().get('objects')
+    refs = dict(objects.find('PBXFileReference'))
+    assert len(refs) == 9 and all(x.get('isa') == 'PBXFileReference' for x in refs.values())
+    assert dict.__len__(objects) == 0 # found entries are not kept
+    objects['29B97316FDCFA39411CA2CEA']['path'] = 'changed.mm'
+    assert dict(objects.find('PBXFileReference')).get('29B97316FDCFA39411CA2CEA').get('path') == 'changed.mm'
+
+@pytest.mark.parametrize('parser', ['fast', 'lazy'])
+def test_ref_files(pbxproj_path:str, parser:str):
+    project = load(pbxproj_path, parser, generate_project=False)
+    assert project.has_ref_file('main.mm')
+    assert project.get_ref_file('main.mm').uuid == '29B97316FDCFA39411CA2CEA'
+    assert project.get_ref_file('System/Library/Frameworks/Foundation.framework').note() == '/* Foundation.framework */'
+    assert not project.has_ref_file('missing.mm')
+
+def test_build_file_without_phase(pbxproj_path:str, monkeypatch):
+    project = load(pbxproj_path)
+    ref = PBXFileReference.create(project, 'Classes/Foo.mm')
+    item = PBXBuildFile.create(project, 'Classes/Foo.mm', ref)
+    calls = []
+    files = PBXSourcesBuildPhase.files
+    monkeypatch.setattr(PBXSourcesBuildPhase, 'files', property(lambda self: calls.append(self.uuid) or files.fget(self)))
+    assert item.note() == '/* EXPECT_PHASE Foo.mm */'
+    count = len(calls)
+    assert count > 0
+    assert item.note() == '/* EXPECT_PHASE Foo.mm */'
+    assert len(calls) == count # phases are scanned once
+
+@pytest.mark.parametrize('parser', ['fast', 'lazy'])
+def test_referrers(pbxproj_path:str, parser:str):
+    project = load(pbxproj_path, parser, generate_project=False)
+    # main.mm is referenced by its build file and its group
+    assert set(project.get_pbx_referrers('29B97316FDCFA39411CA2CEA')) == {'1D60589B0D05DD56006BFB54', 'D82DCFB50E8000A5005D6AD8'}
+
+@pytest.mark.parametrize('parser', ['fast', 'lazy'])
+def test_remove_cascades_to_build_files(pbxproj_path:str, parser:str):
+    project = load(pbxproj_path, parser)
+    removed = project.remove_pbx_object('29B97316FDCFA39411CA2CEA')
+    assert set(removed) == {'29B97316FDCFA39411CA2CEA', '1D60589B0D05DD56006BFB54'}
+    assert not project.has_pbx_object('1D60589B0D05DD56006BFB54')
+    assert '1D60589B0D05DD56006BFB54' not in project.get_pbx_object('1D60588E0D05DD3D006BFB54').get('files')
+    assert '29B97316FDCFA39411CA2CEA' not in project.get_pbx_object('D82DCFB50E8000A5005D6AD8').get('children')
+    assert not project.has_ref_file('main.mm')
+
+def test_remove_tree(pbxproj_path:str):
+    project = load(pbxproj_path, 'lazy')
+    assets = ['Assets/iOS/A.mm', 'Assets/iOS/Sub/B.m', 'Assets/iOS/Sub/icon.png', 'Assets/Other/C.mm']
+    project.pbx_project.add_assets(assets)
+    removed = project.pbx_project.remove_tree('Assets/iOS')
+    assert len(removed) == 2 + 3 * 2 # groups, files and their build files
+    assert not any(project.has_ref_file(x) for x in assets[:3])
+    assert project.has_ref_file('Assets/Other/C.mm')
+    paths = [x.path for x in project.query_files('Assets/*')]
+    assert paths == ['Assets/Other/C.mm']
+    assert project.pbx_project.remove_tree('Assets/Missing') == []
+
+def test_group_sync(pbxproj_path:str):
+    project = load(pbxproj_path)
+    main_group = project.pbx_project.mainGroup
+    first = PBXFileReference.create(project, 'Assets/a/b/c/X.mm')
+    second = PBXFileReference.create(project, 'Assets/a/b/c/Y.mm')
+    main_group.sync(first)
+    main_group.sync(second)
+    main_group.sync(first)
+    group = main_group
+    for name in ('Assets', 'a', 'b', 'c'):
+        children = [x for x in group.children if isinstance(x, PBXGroup) and x.name == name]
+        assert len(children) == 1
+        group = children[0]
+    assert [x.uuid for x in group.children] == [first.uuid, second.uuid]
+    assert group.data.get('children') == [first.uuid, second.uuid]
+    assert main_group.fdir('Assets') is main_group.fdir('Assets')
+
+def test_setting_array_stays_unique():
+    from xcmod import PBXSettingArray
+    flags = PBXSettingArray(['-ObjC', '-lz', '-ObjC'])
+    assert flags == ['-ObjC', '-lz']
+    flags.append('-lz')
+    flags.insert(0, '-lc++')
+    flags.insert(0, '-ObjC')
+    flags += ['-lz', '-lsqlite3']
+    assert flags == ['-lc++', '-ObjC', '-lz', '-lsqlite3'] and isinstance(flags, PBXSettingArray)
+    flags[0] = '-lz'
+    assert flags == ['-lz', '-ObjC', '-lsqlite3'] and '-lc++' not in flags
+    flags[1:] = ['-a', '-a', '-b']
+    assert flags == ['-lz', '-a', '-b'] and '-ObjC' not in flags and '-b' in flags
+    flags.remove('-a')
+    assert '-a' not in flags
+    assert flags.pop() == '-b' and '-b' not in flags
+    del flags[0]
+    assert flags == [] and '-lz' not in flags
+    flags.extend(['-x', '-y'])
+    flags.clear()
+    assert '-x' not in flags
+    flags.append('-x')
+    assert flags == ['-x']
+
+def test_phase_skips_repeated_file_refs(pbxproj_path:str):
+    project = load(pbxproj_path)
+    phase = project.pbx_project.sources_phase
+    count = len(phase.files)
+    main = project.get_ref_file('main.mm')
+    item = PBXBuildFile.create(project, 'main.mm', main)
+    phase.append(item)
+    assert len(phase.files) == count and not project.has_pbx_object(item.uuid)
+
+def test_add_assets_skips_present_files(pbxproj_path:str):
+    project = load(pbxproj_path)
+    assert project.pbx_project.add_assets(['main.mm', 'Classes/Foo.mm', 'libz.tbd'], target='*') == {'sources_phase': 3, 'frameworks_phase_build': 2}
+    count = len(project.get_pbx_objects())
+    assert project.pbx_project.add_assets(['Classes/Foo.mm', 'libz.tbd'], target='*') == {}
+    project.pbx_project.add_framework('libz.tbd')
+    assert len(project.get_pbx_objects()) == count
+
+def test_add_assets_reuses_folder_refs(pbxproj_path:str):
+    project = load(pbxproj_path)
+    project.pbx_project.add_assets(['Data/Raw'], file_types={'Data/Raw': 'folder'})
+    count = len(project.get_pbx_objects())
+    project.pbx_project.add_assets(['Data/Raw'], file_types={'Data/Raw': 'folder'})
+    assert len(project.get_pbx_objects()) == count
+
+def test_add_assets_keeps_first_entitlements(pbxproj_path:str, capsys):
+    project = load(pbxproj_path)
+    project.pbx_project.add_assets(['a.entitlements', 'b.entitlements'])
+    assert 'skip b.entitlements, CODE_SIGN_ENTITLEMENTS is taken by a.entitlements' in capsys.readouterr().err
+    assert set(project.pbx_project.settings.query('CODE_SIGN_ENTITLEMENTS').values()) == {'$PROJECT_DIR/a.entitlements'}
+
+def test_hash_uuids_are_reproducible(pbxproj_path:str):
+    uuids = []
+    for _ in range(2):
+        project = load(pbxproj_path)
+        project.pbx_project.add_assets(['Classes/Foo.mm', 'Classes/Bar.m', 'libz.tbd'])
+        uuids.append(sorted(x for x, _ in project.get_pbx_objects()))
+    assert uuids[0] == uuids[1]
+
+def test_hash_sequences_restart_per_load(pbxproj_path:str):
+    from xcmod import PBXCopyFilesBuildPhase
+    project = load(pbxproj_path, generate_project=False)
+    first = PBXCopyFilesBuildPhase.create(project).uuid
+    assert PBXCopyFilesBuildPhase.create(project).uuid != first
+    project.load_pbxproj(pbxproj_path, generate_project=False)
+    assert PBXCopyFilesBuildPhase.create(project).uuid == first
+
+def test_reserved_uuids_match_allocated(pbxproj_path:str):
+    from xcmod import PBXHashAllocator
+    project = load(pbxproj_path, generate_project=False)
+    allocator = PBXHashAllocator(project)
+    expected = [allocator.allocate('PBXFileReference', x) for x in ('a.mm', 'b.mm')]
+    allocator.reserve('PBXFileReference', ['a.mm', 'b.mm', 'a.mm'])
+    assert [allocator.allocate('PBXFileReference', x) for x in ('a.mm', 'b.mm')] == expected
+    project.add_pbx_object(expected[0], {'isa': 'PBXFileReference'})
+    allocator.reserve('PBXFileReference', ['a.mm'])
+    assert allocator.allocate('PBXFileReference', 'a.mm') not in expected # taken, next attempt
+
+def test_random_uuids_in_batches(pbxproj_path:str):
+    from xcmod import PBXAllocator
+    project = load(pbxproj_path, generate_project=False)
+    allocator = PBXAllocator(project, batch_size=4)
+    allocator.reserve('PBXFileReference', ['x'] * 10)
+    uuids = {allocator.allocate('PBXFileReference') for _ in range(10)}
+    assert len(uuids) == 10 and all(UUID_PATTERN.fullmatch(x) for x in uuids)
+
+def test_group_seed_without_parent(pbxproj_path:str):
+    import hashlib
+    project = load(pbxproj_path)
+    group = PBXGroup.create(project, 'Extra')
+    seed = 'PBXGroup:{}/Extra'.format(project.get_pbx_root())
+    assert group.uuid == hashlib.md5(seed.encode('utf-8')).hexdigest()[:24].upper()
+
+def test_load_does_not_create_phases(tmp_path, pbxproj_path:str):
+    project = load(pbxproj_path)
+    output_path = str(tmp_path / 'output.pbxproj')
+    project.save_pbxproj(output_path, backup=False)
+    with open(output_path, 'rb') as a, open(pbxproj_path, 'rb') as b:
+        assert a.read() == b.read()
+    assert 'Embeded Frameworks' not in load(pbxproj_path, generate_project=False).dump_pbxproj(True) # notes load the root object too
+
+def test_select_targets(pbxproj_path:str):
+    project = load(pbxproj_path).pbx_project
+    names = lambda x: [project.trim(t.name) for t in project.select_targets(x)]
+    assert names(None) == ['Unity-iPhone']
+    assert names('*') == ['Unity-iPhone', 'Tests']
+    assert names('Unity*') == ['Unity-iPhone']
+    assert names(['Tests', 'Unity-iPhone', 'Tests']) == ['Tests', 'Unity-iPhone']
+    with pytest.raises(KeyError):
+        project.select_targets('Missing')
+
+def test_phase_created_when_first_used(pbxproj_path:str):
+    project = load(pbxproj_path)
+    target = project.pbx_project.get_target('Tests')
+    assert [x.isa for x in target.buildPhases] == ['PBXSourcesBuildPhase', 'PBXFrameworksBuildPhase']
+    counts = project.pbx_project.add_assets(['Tests/icon.png'], target='Tests')
+    assert counts == {'resources_phase': 1}
+    assert [x.isa for x in target.buildPhases] == ['PBXSourcesBuildPhase', 'PBXFrameworksBuildPhase', 'PBXResourcesBuildPhase']
+    main = project.pbx_project.get_target('Unity-iPhone')
+    assert 'PBXCopyFilesBuildPhase' not in [x.isa for x in main.buildPhases]
+
+def test_embed_skips_other_copy_phases(pbxproj_path:str):
+    project = load(pbxproj_path)
+    main = project.pbx_project.get_target('Unity-iPhone')
+    plugins = PBXCopyFilesBuildPhase.create(project, '"Embed App Extensions"')
+    plugins.data['dstSubfolderSpec'] = '13'
+    plugins.load(plugins.uuid)
+    main.append_build_phase(plugins)
+    project.pbx_project.embed_framework('Frameworks/Extra.framework')
+    phase = main.frameworks_phase_embed
+    assert phase is not plugins and phase.data['dstSubfolderSpec'] == '10'
+    assert not plugins.files and len(phase.files) == 1
+    assert main.get_phase('PBXCopyFilesBuildPhase', dst=13) is plugins
+
+def test_merge_plist_warns_on_missing_file(project_path:str, pbxproj_path:str, capsys):
+    project = load(pbxproj_path)
+    project.merge_plist({'UIStatusBarHidden': True}, target='*')
+    assert 'Tests/Info.plist of target Tests' in capsys.readouterr().err
+    with open(os.path.join(project_path, 'Info.plist')) as fp:
+        assert '<key>UIStatusBarHidden</key>' in fp.read()
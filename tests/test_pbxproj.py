@@ -0,0 +1,122 @@
+import os, sys, subprocess
+import pytest
+from conftest import DATA_PATH, ROOT_PATH, load
+from pbxproj import pbxprojParser
+
+SAMPLE_PATH = os.path.join(DATA_PATH, 'project.pbxproj')
+
+@pytest.mark.parametrize('parser', ['fast', 'lazy'])
+def test_parser_matches_legacy(tmp_path, parser:str):
+    file_path = str(tmp_path / 'project.pbxproj')
+    with open(SAMPLE_PATH, 'r') as fp: # legacy reader takes '/' of unquoted values as a comment
+        content = fp.read().replace('shellPath = /bin/sh;', 'shellPath = "/bin/sh";')
+    with open(file_path, 'w') as fp:
+        fp.write(content)
+    legacy = load(file_path, 'legacy')
+    project = load(file_path, parser)
+    assert dict(project.get_pbx_objects()) == dict(legacy.get_pbx_objects())
+    assert project.dump_pbxproj(True) == legacy.dump_pbxproj(True)
+    assert project.dump_pbxproj(False) == legacy.dump_pbxproj(False)
+
+def test_parse_quoted_and_nested_values():
+    data = pbxprojParser(b'// !$*UTF8*$!\n{a = "x \\" y"; /* note */ b = (1, "2", {c = d;}); e = {};}').parse()
+    assert data == {'a': '"x \\" y"', 'b': ['1', '"2"', {'c': 'd'}], 'e': {}}
+
+def test_fast_keeps_unquoted_paths():
+    project = load(SAMPLE_PATH, 'fast', generate_project=False)
+    assert project.get_pbx_object('AA0000000000000000000030').get('shellPath') == '/bin/sh'
+
+def test_lazy_objects_resolve_to_fast_objects():
+    fast = pbxprojParser.open(SAMPLE_PATH).parse()
+    lazy = pbxprojParser.open(SAMPLE_PATH, mapping=True).read_index()
+    assert dict(lazy['objects'].resolve()) == fast['objects']
+    assert {k:v for k, v in lazy.items() if k != 'objects'} == {k:v for k, v in fast.items() if k != 'objects'}
+
+def test_unknown_parser():
+    with pytest.raises(AttributeError):
+        load(SAMPLE_PATH, 'magic')
+
+def test_lazy_decodes_on_access():
+    objects = pbxprojParser.open(SAMPLE_PATH, mapping=True).read_index().get('objects')
+    assert dict.__len__(objects) == 0 and len(objects) == 41
+    assert 'AA0000000000000000000030' in objects
+    assert dict.__len__(objects) == 0
+    assert objects.get('AA0000000000000000000030').get('isa') == 'PBXShellScriptBuildPhase'
+    assert dict.__len__(objects) == 1
+    assert objects.get('AA00000000000000000000FF') is None
+
+def test_lazy_json_dump():
+    lazy = load(SAMPLE_PATH, 'lazy', generate_project=False)
+    fast = load(SAMPLE_PATH, 'fast', generate_project=False)
+    assert lazy.dump_pbxproj(json_format_enabled=True) == fast.dump_pbxproj(json_format_enabled=True)
+
+def test_cli_dump(pbxproj_path:str, xcmod_path:str):
+    command = [sys.executable, os.path.join(ROOT_PATH, 'xcmod.py'), '-f', pbxproj_path, '-x', xcmod_path, '--parser', 'lazy']
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ''
+    assert '>>> parser=lazy' in result.stderr
+    result = subprocess.run(command + ['--no-manifest', '--dump'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith('{') and 'rootObject = ' in result.stdout
+
+def test_cache_hit_skips_parser(tmp_path, pbxproj_path:str, capsys):
+    cache_path = str(tmp_path / 'cache')
+    fast = load(pbxproj_path, 'fast', cache_path=cache_path, generate_project=False)
+    cached = load(pbxproj_path, 'fast', cache_path=cache_path, generate_project=False)
+    assert '>>> parser=fast' in capsys.readouterr().out.split('\n')[1]
+    assert dict(cached.get_pbx_objects()) == dict(fast.get_pbx_objects())
+    load(pbxproj_path, 'fast', cache_path=cache_path, generate_project=False)
+    assert '>>> parser=cache' in capsys.readouterr().out
+
+def test_cache_keeps_lazy_objects(tmp_path, pbxproj_path:str):
+    from pbxproj import pbxprojCache, pbxprojObjects
+    cache = pbxprojCache(str(tmp_path / 'cache'))
+    key = cache.key(pbxproj_path, lazy=True)
+    assert key != cache.key(pbxproj_path)
+    cache.put(key, pbxprojParser.open(pbxproj_path, mapping=True).read_index())
+    data = pbxprojParser.open(pbxproj_path, mapping=True).load_index(cache.get(key))
+    objects = data.get('objects')
+    assert isinstance(objects, pbxprojObjects) and dict.__len__(objects) == 0
+    fast = pbxprojParser.open(pbxproj_path).parse()
+    assert list(data.keys()) == list(fast.keys())
+    assert objects.resolve() == fast.get('objects')
+    assert objects.attributes == {k:v for k, v in fast.items() if k != 'objects'}
+
+def test_cache_key_follows_content(pbxproj_path:str):
+    from pbxproj import pbxprojCache
+    key = pbxprojCache.key(pbxproj_path)
+    assert pbxprojCache.key(pbxproj_path) == key
+    with open(pbxproj_path, 'a') as fp:
+        fp.write('\n')
+    assert pbxprojCache.key(pbxproj_path) != key
+
+def test_cache_eviction(tmp_path, pbxproj_path:str):
+    from pbxproj import pbxprojCache
+    cache = pbxprojCache(str(tmp_path / 'cache'), size_limit=1)
+    cache.put('a', {'objects': {}})
+    cache.put('b', {'objects': {}})
+    assert cache.get('a') is None and cache.get('b') is None
+    cache = pbxprojCache(str(tmp_path / 'cache'))
+    cache.put('a', {'objects': {'x': 'y'}})
+    assert cache.get('a') == {'objects': {'x': 'y'}}
+
+def test_iter_events():
+    from pbxproj import EventType
+    parser = pbxprojParser(b'{a = (b, {c = d;}); /* x */ e = f;}')
+    assert list(parser.iter_events()) == [
+        (EventType.begin_dict, None), (EventType.key, 'a'), (EventType.begin_array, None), (EventType.value, 'b'),
+        (EventType.begin_dict, None), (EventType.key, 'c'), (EventType.value, 'd'), (EventType.end_dict, None),
+        (EventType.end_array, None), (EventType.key, 'e'), (EventType.value, 'f'), (EventType.end_dict, None)]
+
+def test_iter_objects_matches_parse():
+    from pbxproj import iter_pbx_objects
+    objects = pbxprojParser.open(SAMPLE_PATH).parse().get('objects')
+    items = list(iter_pbx_objects(SAMPLE_PATH))
+    assert [x[0] for x in items] == list(objects.keys())
+    assert all(isa == objects[uuid].get('isa') and data == objects[uuid] for uuid, isa, data in items)
+
+def test_stats_cli():
+    result = subprocess.run([sys.executable, os.path.join(ROOT_PATH, 'pbxproj.py'), '-f', SAMPLE_PATH, '--stats'], stdout=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0
+    assert '       5 PBXGroup' in result.stdout.split('\n')
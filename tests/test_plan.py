@@ -0,0 +1,63 @@
+import os, sys, json, shutil, subprocess
+from conftest import ROOT_PATH
+from xcmod import XcodeProject
+
+def test_plan_lives_next_to_manifest(pbxproj_path:str, xcmod_path:str, capsys):
+    project = XcodeProject()
+    plan = project.get_plan(xcmod_path, pbxproj_path=pbxproj_path)
+    assert '>>> compile' in capsys.readouterr().out
+    assert os.path.exists(project.get_plan_path(xcmod_path, pbxproj_path))
+    assert os.path.dirname(project.get_plan_path(xcmod_path, pbxproj_path)) == os.path.dirname(pbxproj_path)
+    assert not os.path.exists(xcmod_path + '.plan')
+    assert project.get_plan(xcmod_path, pbxproj_path=pbxproj_path) == plan
+    assert capsys.readouterr().out == ''
+    assert plan['items'] == {'Assets/Mods/app.entitlements': 'file', 'Assets/Plugins/MSDK/iOS/WG.bundle': 'dir',
+                             'CoreTelephony.framework': '', 'Assets/Plugins/MSDK/iOS/MSDK.framework': 'dir'}
+
+def test_plan_follows_listed_items(pbxproj_path:str, xcmod_path:str, unity_path:str):
+    project = XcodeProject()
+    project.get_plan(xcmod_path, pbxproj_path=pbxproj_path)
+    assert project.load_plan(xcmod_path, pbxproj_path=pbxproj_path)
+    os.makedirs(os.path.join(unity_path, 'CoreTelephony.framework')) # now a vendored framework
+    assert project.load_plan(xcmod_path, pbxproj_path=pbxproj_path) is None
+    plan = project.get_plan(xcmod_path, pbxproj_path=pbxproj_path)
+    assert plan['items']['CoreTelephony.framework'] == 'dir'
+    os.remove(os.path.join(unity_path, 'Assets/Mods/app.entitlements'))
+    assert project.load_plan(xcmod_path, pbxproj_path=pbxproj_path) is None
+
+def test_plan_follows_working_dir(tmp_path, pbxproj_path:str, unity_path:str, monkeypatch):
+    mods_path = tmp_path / 'mods'
+    mods_path.mkdir()
+    shutil.copytree(unity_path, str(mods_path / 'unity'))
+    xcmod_path = str(mods_path / 'test.xcmod')
+    with open(xcmod_path, 'w') as fp:
+        json.dump({'imports': {'base_path': 'unity', 'items': [{'path': 'Assets/Plugins/iOS', 'type': 'tree'}]}}, fp)
+    project = XcodeProject()
+    monkeypatch.chdir(str(tmp_path))
+    assert project.get_plan(xcmod_path, pbxproj_path=pbxproj_path)['base_path'] == unity_path
+    monkeypatch.chdir(ROOT_PATH)
+    assert project.load_plan(xcmod_path, pbxproj_path=pbxproj_path) is None
+    assert project.get_plan(xcmod_path, pbxproj_path=pbxproj_path)['base_path'] == str(mods_path / 'unity')
+
+def test_compile_cli(pbxproj_path:str, xcmod_path:str):
+    command = [sys.executable, os.path.join(ROOT_PATH, 'xcmod.py'), 'compile', xcmod_path]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 2 and 'one of --pbxproj-path or --plan-path is required' in result.stderr
+    result = subprocess.run(command + ['-f', pbxproj_path], stdout=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0
+    summary = json.loads(result.stdout)
+    assert (summary['assets'], summary['dirs'], summary['unsupported']) == (9, 2, [])
+    assert summary['phases'] == {'None': 2, 'sources_phase': 2, 'resources_phase': 2, 'frameworks_phase_build': 3}
+    assert XcodeProject().load_plan(xcmod_path, pbxproj_path=pbxproj_path) is not None
+
+def test_layers_with_same_name(tmp_path, pbxproj_path:str, xcmod_path:str, capsys):
+    file_paths = []
+    for name in ('base', 'sdk'):
+        (tmp_path / name).mkdir()
+        file_paths.append(str(tmp_path / name / 'ios.xcmod'))
+        shutil.copy(xcmod_path, file_paths[-1])
+    project = XcodeProject()
+    for file_path in file_paths: project.get_plan(file_path, pbxproj_path=pbxproj_path)
+    assert capsys.readouterr().out.count('>>> compile') == 2
+    assert project.get_plan_path(file_paths[0], pbxproj_path) != project.get_plan_path(file_paths[1], pbxproj_path)
+    assert all(project.load_plan(x, pbxproj_path=pbxproj_path) for x in file_paths)
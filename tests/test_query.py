@@ -0,0 +1,48 @@
+import os, sys, json, subprocess
+from conftest import DATA_PATH, ROOT_PATH, load
+
+SAMPLE_PATH = os.path.join(DATA_PATH, 'project.pbxproj')
+
+def paths(entries)->list:
+    return [x.path for x in entries]
+
+def test_paths_are_normalised():
+    index = load(SAMPLE_PATH, 'lazy', generate_project=False).get_path_index()
+    assert len(index) == 9
+    assert index.find('./Classes//main.mm').uuid == '29B97316FDCFA39411CA2CEA'
+    assert index.find('Classes/main.mm').groups == ['29B97314FDCFA39411CA2CEA', 'D82DCFB50E8000A5005D6AD8']
+    assert index.find('$(SDKROOT)/System/Library/Frameworks/Foundation.framework') is not None
+    assert index.find('main.mm') is None
+
+def test_glob_and_prefix():
+    project = load(SAMPLE_PATH, 'lazy', generate_project=False)
+    assert paths(project.query_files('Classes')) == ['Classes/LaunchScreen.xib', 'Classes/UnityAppController.mm', 'Classes/main.mm']
+    assert paths(project.query_files('Classes/*.mm')) == ['Classes/UnityAppController.mm', 'Classes/main.mm']
+    assert paths(project.query_files('*.m*')) == ['Classes/UnityAppController.mm', 'Classes/main.mm', 'Tests/Tests.m']
+    assert paths(project.query_files('Class')) == []
+    assert len(project.query_files()) == len(project.query_files('.')) == 9
+
+def test_phases():
+    project = load(SAMPLE_PATH, 'lazy', generate_project=False)
+    entry = project.get_path_index().find('Classes/main.mm')
+    assert entry.build_files == ['1D60589B0D05DD56006BFB54']
+    assert entry.phases == [('Unity-iPhone', 'Sources', '1D60588E0D05DD3D006BFB54')]
+    assert paths(project.query_files('*.m*', phase='Sources', target='Tests')) == ['Tests/Tests.m']
+    assert paths(project.query_files(missing_phase='*')) == ['$(BUILT_PRODUCTS_DIR)/Tests.xctest', '$(BUILT_PRODUCTS_DIR)/demo.app', 'Info.plist']
+    assert paths(project.query_files('en.lproj', phase='Resources')) == ['en.lproj/InfoPlist.strings'] # built through its variant group
+
+def test_index_follows_changes(pbxproj_path:str):
+    project = load(pbxproj_path)
+    assert paths(project.query_files('Classes/*.m', missing_phase='Sources')) == []
+    project.pbx_project.add_assets(['Classes/Foo.m', 'Classes/Foo.h'])
+    assert paths(project.query_files('Classes/Foo.*', missing_phase='Sources')) == ['Classes/Foo.h']
+    project.pbx_project.remove_file('Classes/Foo.h')
+    assert paths(project.query_files('Classes/Foo.*')) == ['Classes/Foo.m']
+
+def test_cli():
+    command = [sys.executable, os.path.join(ROOT_PATH, 'xcmod.py'), 'query', SAMPLE_PATH, 'Classes/*.mm', '--phase', 'Sources']
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0 and result.stdout.split() == ['Classes/UnityAppController.mm', 'Classes/main.mm']
+    result = subprocess.run(command + ['--json'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert json.loads(result.stdout)[1] == {'uuid': '29B97316FDCFA39411CA2CEA', 'path': 'Classes/main.mm', 'groups': ['29B97314FDCFA39411CA2CEA', 'D82DCFB50E8000A5005D6AD8'],
+                                            'build_files': ['1D60589B0D05DD56006BFB54'], 'phases': [{'target': 'Unity-iPhone', 'phase': 'Sources', 'uuid': '1D60588E0D05DD3D006BFB54'}]}
@@ -0,0 +1,100 @@
+import pytest
+from conftest import load
+from xcmod import PBXFileReference
+from pbxproj import pbxprojParser
+
+PARSERS = ['legacy', 'fast', 'lazy']
+
+def read(file_path:str)->bytes:
+    with open(file_path, 'rb') as fp:
+        return fp.read()
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_save_untouched_is_byte_identical(tmp_path, pbxproj_path:str, parser:str):
+    output_path = str(tmp_path / 'output.pbxproj')
+    load(pbxproj_path, parser, generate_project=False).save_pbxproj(output_path, backup=False)
+    assert read(output_path) == read(pbxproj_path)
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_save_splices_changes(tmp_path, pbxproj_path:str, parser:str):
+    original = read(pbxproj_path)
+    project = load(pbxproj_path, parser)
+    project.pbx_project.add_build_setting('ENABLE_BITCODE', 'NO')
+    project.pbx_project.add_assets(['Classes/Foo.mm'])
+    project.remove_pbx_object('AA0000000000000000000030') # shell script phase
+    output_path = str(tmp_path / 'output.pbxproj')
+    project.save_pbxproj(output_path, backup=False)
+    content = read(output_path)
+    full = pbxprojParser(b'// !$*UTF8*$!\n' + project.dump_pbxproj(False).encode('utf-8')).parse()
+    assert pbxprojParser(content).parse() == full
+    assert b'AA0000000000000000000030' not in content
+    assert b'/* Foo.mm in Sources */ = {isa = PBXBuildFile; ' in content
+    for line in original.split(b'\n'): # untouched entries keep their bytes
+        if b'PBXFileReference' in line or b'LaunchScreen.xib in Resources' in line: assert line in content
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_save_keeps_in_place_edits(tmp_path, pbxproj_path:str, parser:str):
+    project = load(pbxproj_path, parser)
+    config = project.pbx_project.buildConfigurationList.buildConfigurations[0]
+    config.buildSettings['SWIFT_VERSION'] = '5.0' # no update_pbx_object
+    output_path = str(tmp_path / 'output.pbxproj')
+    project.save_pbxproj(output_path, backup=False)
+    objects = pbxprojParser.open(output_path).parse().get('objects')
+    assert objects[config.uuid]['buildSettings']['SWIFT_VERSION'] == '5.0'
+    assert read(output_path).count(b'SWIFT_VERSION') == 1
+
+def test_save_splice_matches_across_parsers(tmp_path, pbxproj_path:str):
+    outputs = []
+    for parser in PARSERS:
+        project = load(pbxproj_path, parser)
+        project.pbx_project.add_assets(['Classes/Foo.mm', 'Classes/Bar.m'])
+        output_path = str(tmp_path / '{}.pbxproj'.format(parser))
+        project.save_pbxproj(output_path, backup=False)
+        outputs.append(read(output_path))
+    assert outputs[0] == outputs[1] == outputs[2]
+
+def test_save_added_entry_without_note(tmp_path, pbxproj_path:str):
+    project = load(pbxproj_path, 'fast', generate_project=False)
+    uuid = 'ABABABABABABABABABABABAB'
+    project.add_pbx_object(uuid, {'isa': 'PBXGroup', 'children': [], 'sourceTree': '"<group>"'})
+    output_path = str(tmp_path / 'output.pbxproj')
+    project.save_pbxproj(output_path, backup=False)
+    assert b'\t\tABABABABABABABABABABABAB = {\n' in read(output_path)
+
+def test_save_twice(pbxproj_path:str):
+    project = load(pbxproj_path, 'lazy')
+    project.pbx_project.add_assets(['Classes/Foo.mm'])
+    project.save_pbxproj(backup=False)
+    project.pbx_project.add_assets(['Classes/Bar.m'])
+    project.save_pbxproj(backup=False)
+    paths = {x.get('path') for _, x in load(pbxproj_path, 'fast', generate_project=False).get_pbx_objects() if x.get('isa') == PBXFileReference.__name__}
+    assert {'Classes/Foo.mm', 'Classes/Bar.m'} <= paths
+
+def test_save_after_external_edit(pbxproj_path:str):
+    project = load(pbxproj_path, 'fast')
+    project.pbx_project.add_assets(['Classes/Foo.mm'])
+    with open(pbxproj_path, 'ab') as fp:
+        fp.write(b'\n\n') # stale spans, whole file is written again
+    project.save_pbxproj(backup=False)
+    data = pbxprojParser.open(pbxproj_path).parse()
+    assert data == pbxprojParser(b'// !$*UTF8*$!\n' + project.dump_pbxproj(False).encode('utf-8')).parse()
+
+def test_full_write_round_trip(pbxproj_path:str):
+    project = load(pbxproj_path, 'fast')
+    content = project.dump_pbxproj(True)
+    assert '1D60589B0D05DD56006BFB54 /* main.mm in Sources */ = {isa = PBXBuildFile; fileRef = 29B97316FDCFA39411CA2CEA /* main.mm */; };' in content
+    assert 'AA0000000000000000000002 /* InfoPlist.strings */' in content
+    data = pbxprojParser(b'// !$*UTF8*$!\n' + content.encode('utf-8')).parse()
+    assert data.get('objects') == dict(project.get_pbx_objects())
+
+def test_full_write_flushes_large_values(tmp_path, pbxproj_path:str):
+    project = load(pbxproj_path, 'fast')
+    flags = ['-DFLAG_{}'.format(n) for n in range(0x5000)]
+    project.pbx_project.add_build_setting('OTHER_CFLAGS', flags)
+    output_path = str(tmp_path / 'output.pbxproj')
+    with open(pbxproj_path, 'ab') as fp:
+        fp.write(b'\n') # force a full write
+    project.save_pbxproj(output_path, backup=False)
+    objects = pbxprojParser.open(output_path).parse().get('objects')
+    settings = [x.get('buildSettings') for x in objects.values() if x.get('isa') == 'XCBuildConfiguration']
+    assert any(x.get('OTHER_CFLAGS') == flags for x in settings)
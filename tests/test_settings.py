@@ -0,0 +1,60 @@
+import os, pytest
+from conftest import load
+from xcmod import FlagsType
+
+def test_query(pbxproj_path:str):
+    view = load(pbxproj_path).pbx_project.settings
+    assert view.query('ENABLE_BITCODE') == {('Unity-iPhone', 'Debug', 'ENABLE_BITCODE'): 'YES', ('Unity-iPhone', 'Release', 'ENABLE_BITCODE'): 'NO'}
+    assert set(view.query('PRODUCT_NAME', target='Tests')) == {('Tests', 'Debug', 'PRODUCT_NAME'), ('Tests', 'Release', 'PRODUCT_NAME')}
+    assert list(view.query('*_FILE', config='Rel*').values()) == ['Info.plist', 'Tests/Info.plist']
+    assert view.query('MISSING') == {}
+
+def test_update_and_diff(pbxproj_path:str):
+    project = load(pbxproj_path)
+    view = project.pbx_project.settings
+    assert view.update({'ENABLE_BITCODE': 'NO', 'PRODUCT_NAME': None}, target='*', config='Debug') == 2
+    assert view.query('PRODUCT_NAME', config='Debug') == {}
+    assert view.query('ENABLE_BITCODE', target='Tests') == {('Tests', 'Debug', 'ENABLE_BITCODE'): 'NO'}
+    assert view.diff('Debug', 'Release', target='Unity-iPhone', key='OTHER_*') == {'Unity-iPhone': {'OTHER_LDFLAGS': ('"-ObjC"', ['"-ObjC"', '"-weak_framework"', 'CoreMotion'])}}
+
+def test_view_follows_outside_changes(pbxproj_path:str):
+    project = load(pbxproj_path)
+    view = project.pbx_project.settings
+    assert view.query('SWIFT_VERSION') == {}
+    config = project.pbx_project.get_target('Tests').buildConfigurationList.buildConfigurations[0]
+    config.buildSettings['SWIFT_VERSION'] = '5.0'
+    project.update_pbx_object(config.uuid)
+    assert project.pbx_project.settings.query('SWIFT_VERSION') == {('Tests', 'Debug', 'SWIFT_VERSION'): '5.0'}
+    view = project.pbx_project.settings
+    project.pbx_project.add_build_setting('SWIFT_VERSION', '5.1', target='Tests')
+    assert project.pbx_project.settings is view # own updates keep the view
+
+def test_add_build_setting_replaces_scalars(pbxproj_path:str):
+    project = load(pbxproj_path).pbx_project
+    project.add_build_setting('OTHER_LDFLAGS', ['-lz'], config_name='Debug')
+    assert project.settings.query('OTHER_LDFLAGS', config='Debug') == {('Unity-iPhone', 'Debug', 'OTHER_LDFLAGS'): ['-lz']}
+    project.add_build_setting('OTHER_LDFLAGS', '-lc++', config_name='Release')
+    assert project.settings.query('OTHER_LDFLAGS', config='Release').popitem()[1] == ['"-ObjC"', '"-weak_framework"', 'CoreMotion', '-lc++']
+    project.add_build_setting('ENABLE_BITCODE', 'YES')
+    assert set(project.settings.query('ENABLE_BITCODE').values()) == {'YES'}
+
+def test_add_flags_promotes_scalars(pbxproj_path:str):
+    project = load(pbxproj_path).pbx_project
+    project.add_flags(['-ObjC', '-lz'], FlagsType.link)
+    values = project.settings.query('OTHER_LDFLAGS')
+    assert values[('Unity-iPhone', 'Debug', 'OTHER_LDFLAGS')] == ['"-ObjC"', '-ObjC', '-lz']
+    assert values[('Unity-iPhone', 'Release', 'OTHER_LDFLAGS')] == ['"-ObjC"', '"-weak_framework"', 'CoreMotion', '-ObjC', '-lz']
+    with pytest.raises(AttributeError):
+        project.add_flags(['-x'], 'unknown')
+
+def test_update_without_changes_keeps_file(pbxproj_path:str):
+    os.utime(pbxproj_path, ns=(0, 0))
+    project = load(pbxproj_path)
+    view = project.pbx_project.settings
+    assert view.update({'ENABLE_BITCODE': 'YES', 'MISSING': None}, target='Unity-iPhone', config='Debug') == 1
+    view.update({'OTHER_LDFLAGS': ['"-ObjC"', 'CoreMotion']}, target='Unity-iPhone', config='Release', merge=True)
+    project.save_pbxproj(backup=False)
+    assert os.stat(pbxproj_path).st_mtime_ns == 0
+    view.update({'ENABLE_BITCODE': 'NO'}, config='Debug')
+    project.save_pbxproj(backup=False)
+    assert os.stat(pbxproj_path).st_mtime_ns != 0
@@ -0,0 +1,83 @@
+import os, json
+from xcmod import XcodeProject
+from xcconfig import xcconfigObject
+
+def write_xcmod(tmp_path, name:str, **xcmod)->str:
+    file_path = tmp_path / name
+    file_path.write_text(json.dumps(xcmod))
+    return str(file_path)
+
+def apply(pbxproj_path:str, xcmod_path:str, settings_only:bool = True):
+    project = XcodeProject()
+    project.load_pbxproj(pbxproj_path)
+    project.import_xcmods([xcmod_path], settings_only=settings_only)
+    return project
+
+def read(project_path:str, file_name:str)->xcconfigObject:
+    xcconfig = xcconfigObject()
+    xcconfig.load(os.path.join(project_path, 'Configs', file_name))
+    return xcconfig
+
+def test_replace_keeps_foreign_keys():
+    xcconfig = xcconfigObject()
+    xcconfig.settings = {'MANUAL': 'x', 'A': '1', 'B': '2'}
+    xcconfig.meta['keys'] = 'A B'
+    xcconfig.replace({'A': '3', 'C': ['-x', '"-y"']})
+    assert xcconfig.settings == {'MANUAL': 'x', 'A': '3', 'C': '-x -y'}
+    assert xcconfig.meta['keys'] == 'A C'
+
+def test_selected():
+    xcconfig = xcconfigObject()
+    xcconfig.meta.update({'target': 'Tests', 'main': 'NO'})
+    assert xcconfig.selected('Tests') and xcconfig.selected('"Tests"') and xcconfig.selected('T*') and xcconfig.selected(['Foo', 'Tests'])
+    assert not xcconfig.selected(None) and not xcconfig.selected('Unity-iPhone')
+
+def test_link_xcconfig(project_path:str, pbxproj_path:str, tmp_path):
+    xcmod_path = write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', target='*', settings={'ENABLE_BITCODE': 'NO'})
+    project = apply(pbxproj_path, xcmod_path)
+    assert sorted(os.listdir(os.path.join(project_path, 'Configs'))) == ['Tests.Debug.xcconfig', 'Tests.Release.xcconfig', 'Unity-iPhone.Debug.xcconfig', 'Unity-iPhone.Release.xcconfig']
+    xcconfig = read(project_path, 'Unity-iPhone.Debug.xcconfig')
+    assert xcconfig.settings == {'ENABLE_BITCODE': 'NO'}
+    assert (xcconfig.meta['target'], xcconfig.meta['main'], xcconfig.meta['keys']) == ('Unity-iPhone', 'YES', 'ENABLE_BITCODE')
+    assert read(project_path, 'Tests.Release.xcconfig').meta['main'] == 'NO'
+    assert project.pbx_project.settings.query('ENABLE_BITCODE') == {} # inline values stripped
+
+def test_update_xcconfig_follows_target(project_path:str, pbxproj_path:str, tmp_path, capsys):
+    apply(pbxproj_path, write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', target='*', settings={'ENABLE_BITCODE': 'NO', 'ARCHS': 'arm64'}))
+    xcconfig = read(project_path, 'Tests.Debug.xcconfig')
+    xcconfig.settings['MANUAL'] = 'YES'
+    xcconfig.save()
+    with open(pbxproj_path, 'rb') as fp:
+        content = fp.read()
+    capsys.readouterr()
+    xcmod_path = write_xcmod(tmp_path, 'b.xcmod', xcconfig='Configs', target='Tests', settings={'ENABLE_BITCODE': 'YES'})
+    assert XcodeProject().update_xcconfig(xcmod_path, pbxproj_path)
+    assert read(project_path, 'Tests.Debug.xcconfig').settings == {'ENABLE_BITCODE': 'YES', 'MANUAL': 'YES'}
+    assert read(project_path, 'Tests.Release.xcconfig').settings == {'ENABLE_BITCODE': 'YES'}
+    assert read(project_path, 'Unity-iPhone.Debug.xcconfig').settings == {'ENABLE_BITCODE': 'NO', 'ARCHS': 'arm64'}
+    with open(pbxproj_path, 'rb') as fp:
+        assert fp.read() == content
+    # keys never stripped from the pbxproj take the full path
+    assert not XcodeProject().update_xcconfig(write_xcmod(tmp_path, 'c.xcmod', xcconfig='Configs', target='Tests', settings={'SWIFT_VERSION': '5'}), pbxproj_path)
+
+def test_merge_xcconfig_keeps_foreign_keys(project_path:str, pbxproj_path:str, tmp_path):
+    apply(pbxproj_path, write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', settings={'ENABLE_BITCODE': 'NO', 'ARCHS': 'arm64'}))
+    xcconfig = read(project_path, 'Unity-iPhone.Release.xcconfig')
+    xcconfig.settings['MANUAL'] = 'YES'
+    xcconfig.save()
+    apply(pbxproj_path, write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', settings={'ARCHS': 'arm64e'}))
+    xcconfig = read(project_path, 'Unity-iPhone.Release.xcconfig')
+    assert xcconfig.settings == {'ARCHS': 'arm64e', 'MANUAL': 'YES'}
+    assert xcconfig.meta['keys'] == 'ARCHS'
+
+def test_merge_xcconfig_carries_inline_lists(project_path:str, pbxproj_path:str, tmp_path):
+    apply(pbxproj_path, write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', settings={'OTHER_LDFLAGS': ['-lz']}))
+    assert read(project_path, 'Unity-iPhone.Release.xcconfig').settings == {'OTHER_LDFLAGS': '-ObjC -weak_framework CoreMotion -lz'}
+    assert read(project_path, 'Unity-iPhone.Debug.xcconfig').settings == {'OTHER_LDFLAGS': '-lz'} # scalars are replaced, as with merge
+    xcmod_path = write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', settings={'OTHER_LDFLAGS': ['-lz', '-lc++']})
+    assert XcodeProject().update_xcconfig(xcmod_path, pbxproj_path)
+    assert read(project_path, 'Unity-iPhone.Release.xcconfig').settings == {'OTHER_LDFLAGS': '-ObjC -weak_framework CoreMotion -lz -lc++'}
+    # dropping the key gives the carried flags back to the target
+    project = apply(pbxproj_path, write_xcmod(tmp_path, 'a.xcmod', xcconfig='Configs', settings={'ENABLE_BITCODE': 'NO'}))
+    assert project.pbx_project.settings.query('OTHER_LDFLAGS') == {('Unity-iPhone', 'Release', 'OTHER_LDFLAGS'): ['"-ObjC"', '"-weak_framework"', 'CoreMotion']}
+    assert 'inline' not in read(project_path, 'Unity-iPhone.Release.xcconfig').meta
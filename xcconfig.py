@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import argparse, sys, os, re, fnmatch, json
+from typing import Dict, List
+
+HEADER_PREFIX = '// xcmod:'
+SETTING_PATTERN = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*(?:\[[^\]]*\])*)\s*=\s*(.*?)\s*;?\s*$')
+INCLUDE_PATTERN = re.compile(r'^\s*#include\??\s+"([^"]+)"')
+
+class xcconfigObject(object):
+    def __init__(self):
+        self.__file_path:str = None
+        self.__content:str = None
+        self.meta: dict[str, str] = {} # '// xcmod: name = value' header lines
+        self.includes: list[str] = []
+        self.settings: dict[str, str] = {}
+
+    @property
+    def file_path(self)->str: return self.__file_path
+
+    @staticmethod
+    def format(value:any)->str:
+        if isinstance(value, list):
+            return ' '.join(xcconfigObject.format(x) for x in value)
+        value = str(value)
+        if len(value) >= 2 and value[0] == value[-1] == '"': # pbxproj quoting
+            value = value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+            if ' ' in value and not value.startswith('"'): value = '"{}"'.format(value)
+        return value
+
+    def load(self, file_path:str):
+        self.__file_path = file_path
+        self.__content = None
+        self.meta, self.includes, self.settings = {}, [], {}
+        if not os.path.exists(file_path): return
+        with open(file_path, 'r') as fp:
+            self.__content = fp.read()
+        for line in self.__content.splitlines():
+            if line.startswith(HEADER_PREFIX):
+                name, _, value = line[len(HEADER_PREFIX):].partition('=')
+                self.meta[name.strip()] = value.strip()
+                continue
+            match = INCLUDE_PATTERN.match(line)
+            if match:
+                self.includes.append(match.group(1))
+                continue
+            match = SETTING_PATTERN.match(line)
+            if match and not line.lstrip().startswith('//'): self.settings[match.group(1)] = match.group(2)
+
+    def merge(self, data:Dict[str, any]):
+        for name, value in data.items():
+            if value is None:
+                self.settings.pop(name, None)
+            else:
+                self.settings[name] = self.format(value)
+
+    def replace(self, data:Dict[str, any]):
+        # only keys written by xcmod are replaced, hand-written ones are kept
+        for name in set(self.meta.get('keys', '').split()) - set(data.keys()): self.settings.pop(name, None)
+        inline = self.inline
+        self.merge({x:self.inherit(inline.get(x), v) for x, v in data.items()})
+        self.meta['keys'] = ' '.join(sorted(x for x, v in data.items() if v is not None))
+
+    @property
+    def inline(self)->Dict[str, list]:
+        # list values stripped from the target's buildSettings, the xcconfig merges into them
+        return json.loads(self.meta.get('inline', '{}'))
+
+    @inline.setter
+    def inline(self, data:Dict[str, list]):
+        if data: self.meta['inline'] = json.dumps(data, sort_keys=True)
+        else: self.meta.pop('inline', None)
+
+    @staticmethod
+    def inherit(current:any, value:any)->any:
+        # same as PBXSettingsView.update(merge=True) on the inline value
+        if value is None or not isinstance(current, list): return value
+        items = value if isinstance(value, list) else [value]
+        return list(dict.fromkeys(current + items))
+
+    def selected(self, target:any = None)->bool:
+        # same selector rules as PBXProject.select_targets, resolved from the header of a linked xcconfig
+        name = self.meta.get('target')
+        if not target: return self.meta.get('main') == 'YES'
+        if isinstance(target, (list, tuple)): return any(self.selected(x) for x in target)
+        target = re.sub(r'[\'"]', '', target)
+        return name == target or (('*' in target or '?' in target) and fnmatch.fnmatchcase(name, target))
+
+    def include(self, file_path:str):
+        if file_path not in self.includes: self.includes.append(file_path)
+
+    def dump(self)->str:
+        lines: list[str] = ['// generated by xcmod, edit the settings block of *.xcmod instead']
+        for name, value in sorted(self.meta.items()):
+            lines.append('{} {} = {}'.format(HEADER_PREFIX, name, value))
+        for file_path in self.includes:
+            lines.append('#include "{}"'.format(file_path))
+        if self.includes or self.meta: lines.append('')
+        for name, value in self.settings.items():
+            lines.append('{} = {}'.format(name, value))
+        return '\n'.join(lines) + '\n'
+
+    def save(self, file_path:str = None)->bool:
+        if file_path: self.__file_path = file_path
+        content = self.dump()
+        if content == self.__content: return False
+        dir_path = os.path.dirname(self.__file_path)
+        if dir_path and not os.path.exists(dir_path): os.makedirs(dir_path)
+        with open(self.__file_path, 'w') as fp:
+            fp.write(content)
+        self.__content = content
+        return True
+
+def find_xcconfigs(dir_path:str)->List[str]:
+    if not os.path.isdir(dir_path): return []
+    return sorted(os.path.join(dir_path, x) for x in os.listdir(dir_path) if x.endswith('.xcconfig'))
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument('--xcconfig-file', '-f', required=True)
+    options = arguments.parse_args(sys.argv[1:])
+    xcconfig = xcconfigObject()
+    xcconfig.load(file_path=options.xcconfig_file)
+    print(xcconfig.meta)
+    print(xcconfig.includes)
+    print(xcconfig.settings)
+    print(xcconfig.dump())
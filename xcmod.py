@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
-import argparse, sys, os, io, json, enum, hashlib, time, random, re, tempfile
-from typing import List, Dict, Tuple, Pattern
+import argparse, sys, os, io, json, enum, hashlib, time, re, fnmatch, bisect, marshal
+from typing import List, Dict, Optional, Tuple, Pattern
 
 TERMINATOR_CHARSET = b' \t\n,;'
+UUID_PATTERN = re.compile(r'[0-9A-F]{24}')
+NOTE_PATTERN = re.compile(rb'([0-9A-F]{24}) (/\*[^*]*\*/)')
+REFERENCE_PATTERN = re.compile(rb'(?<![0-9A-Za-z_])[0-9A-F]{24}(?![0-9A-Za-z_])')
 
 class XcodeProject(object):
     def __init__(self):
@@ -13,7 +16,17 @@ class XcodeProject(object):
         self.__pbx_project_path: str = None
         self.__library = self.__pbx_data['objects'] = {} # type: dict[str:any]
         self.__pbx_library = PBXObjectLibrary(self)
-        self.__ref_library: dict[str, PBXFileReference] = {}
+        self.__ref_library: dict[str, any] = {} # path => PBXFileReference or its uuid
+        self.__ref_indexed = False
+        self.__referrers: dict[str, set[str]] = None # uuid => uuids that reference it, built on demand
+        self.__references: dict[str, set[str]] = {} # uuid => uuids it references
+        self.__group_library: dict[str, any] = {} # 'group uuid:dir path' => PBXGroup
+        self.__path_index: PBXPathIndex = None
+        self.__dirty: dict[str, None] = {} # uuids added, changed or removed since loading, in order
+        self.__notes: dict[str, str] = {} # uuid => note taken from merged files, the objects may not resolve here
+        self.__pbx_stamp: str = None # size and mtime of the loaded file, saved changes are spliced into it
+        self.__pbx_snapshot: bytes = None # objects as eager parsers loaded them, in-place edits are found against it
+        self.__uuid_allocator = PBXHashAllocator(self) # type: PBXAllocator
         self.__xcode_project_path:str = None
 
     def append_pbx_object(self, item): # type: (PBXObject)->None
@@ -22,26 +35,134 @@ class XcodeProject(object):
     @property
     def pbx_project(self): return self.__pbx_project
 
+    def get_pbx_library(self): # type: ()->PBXObjectLibrary
+        return self.__pbx_library
+
+    def get_group_library(self): # type: ()->dict[str, PBXGroup]
+        return self.__group_library
+
+    def set_uuid_allocator(self, allocator): # type: (PBXAllocator)->None
+        self.__uuid_allocator = allocator
+
+    def allocate_uuid(self, isa:str, seed:str = None)->str:
+        return self.__uuid_allocator.allocate(isa, seed)
+
+    def reserve_uuids(self, isa:str, seeds:List[str]):
+        self.__uuid_allocator.reserve(isa, seeds)
+
     def get_pbx_object(self, uuid:str)->Dict:
         return self.__library.get(uuid)
 
+    def get_pbx_objects(self):
+        return self.__library.items()
+
+    def get_pbx_root(self)->str:
+        return self.__pbx_data.get('rootObject')
+
+    def get_path_index(self): # type: ()->PBXPathIndex
+        if self.__path_index is None: self.__path_index = PBXPathIndex(self)
+        return self.__path_index
+
+    def query_files(self, pattern:str = '*', phase:str = None, missing_phase:str = None, target:str = None): # type: (str, str, str, str)->list[PBXPathEntry]
+        return self.get_path_index().query(pattern, phase=phase, missing_phase=missing_phase, target=target)
+
     def has_pbx_object(self, uuid:str)->bool:
         return uuid in self.__library
 
     def add_pbx_object(self, uuid:str, data:any):
         self.__library[uuid] = data
+        self.update_pbx_object(uuid)
 
     def del_pbx_object(self, uuid:str):
         del self.__library[uuid]
+        self.update_pbx_object(uuid)
+
+    def update_pbx_object(self, uuid:str):
+        self.__dirty[uuid] = None
+        self.__path_index = None
+        if self.__pbx_project is not None: self.__pbx_project.invalidate(uuid)
+        if self.__referrers is not None: self.__update_references(uuid, self.__library.get(uuid))
+
+    def __collect_references(self, data:any, result:set):
+        if isinstance(data, str):
+            if len(data) == 24 and UUID_PATTERN.fullmatch(data): result.add(data)
+        elif isinstance(data, dict):
+            for name, value in data.items():
+                if len(name) == 24: self.__collect_references(name, result)
+                self.__collect_references(value, result)
+        elif isinstance(data, list):
+            for value in data: self.__collect_references(value, result)
+
+    def __update_references(self, uuid:str, data:any, references:set = None):
+        if references is None:
+            references = set()
+            if data is not None: self.__collect_references(data, references)
+        references.discard(uuid)
+        previous = self.__references.pop(uuid, set())
+        for item in previous - references: self.__referrers.get(item, set()).discard(uuid)
+        for item in references - previous: self.__referrers.setdefault(item, set()).add(uuid)
+        if references: self.__references[uuid] = references
+
+    def get_pbx_referrers(self, uuid:str)->List[str]:
+        if self.__referrers is None:
+            from pbxproj import pbxprojObjects
+            self.__referrers, self.__references = {}, {}
+            objects = self.__library
+            for item_uuid in list(objects.keys()):
+                raw = objects.raw(item_uuid) if isinstance(objects, pbxprojObjects) else None
+                if raw is not None: # undecoded entries are scanned for uuids as bytes
+                    self.__update_references(item_uuid, None, {x.decode('utf-8') for x in REFERENCE_PATTERN.findall(raw)})
+                else:
+                    self.__update_references(item_uuid, objects.get(item_uuid))
+        return list(self.__referrers.get(uuid, ()))
+
+    def remove_pbx_object(self, uuid:str)->List[str]:
+        removed: list[str] = []
+        queue = [uuid]
+        while queue:
+            item_uuid = queue.pop()
+            data = self.__library.get(item_uuid)
+            if data is None: continue
+            for owner in self.get_pbx_referrers(item_uuid):
+                if not self.has_pbx_object(owner): continue
+                if self.__library.get(owner).get('isa') == PBXBuildFile.__name__:
+                    queue.append(owner) # build file is meaningless without its file
+                else:
+                    self.__pbx_library.load(owner).unlink(item_uuid)
+            if data.get('isa') in (PBXGroup.__name__, PBXVariantGroup.__name__):
+                queue.extend(data.get('children'))
+                self.__group_library.clear()
+            self.del_pbx_object(item_uuid)
+            self.__referrers.pop(item_uuid, None)
+            item = self.__pbx_library.pop(item_uuid, None)
+            path = data.get('path')
+            file = self.__ref_library.get(path) if path else None
+            if file is not None and file in (item_uuid, item): del self.__ref_library[path]
+            removed.append(item_uuid)
+        return removed
 
     def add_ref_file(self, file): # type: (PBXFileReference)->()
         self.__ref_library[file.path] = file
 
+    def __index_ref_files(self):
+        if self.__ref_indexed: return
+        self.__ref_indexed = True
+        from pbxproj import pbxprojObjects
+        if isinstance(self.__library, pbxprojObjects): # only file references are decoded
+            items = self.__library.find(PBXFileReference.__name__)
+        else:
+            items = ((x, data) for x, data in self.__library.items() if data.get('isa') == PBXFileReference.__name__)
+        for uuid, data in items: self.__ref_library.setdefault(data.get('path'), uuid)
+
     def has_ref_file(self, file_path:str):
+        self.__index_ref_files()
         return file_path in self.__ref_library
 
     def get_ref_file(self, file_path:str):
-        return self.__ref_library.get(file_path)
+        self.__index_ref_files()
+        file = self.__ref_library.get(file_path)
+        if isinstance(file, str): file = self.__ref_library[file_path] = self.__pbx_library.load(file)
+        return file
 
     def __read(self, size = 0):
         char = self.__buffer.read(size)
@@ -156,80 +277,246 @@ class XcodeProject(object):
         self.__pbx_project = PBXProject(project=self)
         self.__pbx_project.load(uuid=self.__pbx_data.get('rootObject'))
 
-    def load_pbxproj(self, file_path:str):
+    def load_pbxproj(self, file_path:str, parser:str = 'fast', cache_path:str = None, generate_project:bool = True):
         print('>>> {}'.format(file_path))
+        self.__pbx_project = None
         self.__pbx_library.clear()
+        self.__ref_library.clear()
+        self.__ref_indexed = False
+        self.__referrers, self.__references = None, {}
+        self.__group_library.clear()
+        self.__path_index = None
+        self.__dirty.clear()
+        self.__notes.clear()
+        self.__uuid_allocator.reset() # sequences count from the loaded project
         self.__pbx_project_path = file_path
+        self.__pbx_stamp = self.__get_file_stamp(file_path)
         xcproj_path = os.path.join(os.path.dirname(self.__pbx_project_path), os.pardir)
         xcproj_path = os.path.abspath(xcproj_path)
         self.__xcode_project_path = xcproj_path
-        self.__buffer = open(file_path, mode='rb')
-        self.__pbx_data = self.__read_object()
+        timestamp = time.perf_counter()
+        cache, cache_key, cache_data = None, None, None
+        if cache_path:
+            from pbxproj import pbxprojCache
+            cache = pbxprojCache(cache_path)
+            cache_key = cache.key(file_path, lazy=parser == 'lazy')
+            cache_data = cache.get(cache_key)
+            if cache_data and parser == 'lazy': # cached spans, objects are still decoded on first access
+                from pbxproj import pbxprojParser
+                cache_data = pbxprojParser.open(file_path, mapping=True).load_index(cache_data)
+        if cache_data:
+            parser = 'cache'
+            self.__pbx_data = cache_data
+        elif parser == 'legacy':
+            self.__buffer = open(file_path, mode='rb')
+            self.__pbx_data = self.__read_object()
+            self.__buffer.close()
+        elif parser == 'fast':
+            from pbxproj import pbxprojParser
+            self.__pbx_data = pbxprojParser.open(file_path).parse()
+        elif parser == 'lazy': # objects are decoded on first access
+            from pbxproj import pbxprojParser
+            self.__pbx_data = pbxprojParser.open(file_path, mapping=True).read_index()
+        else:
+            raise AttributeError('not expect parser={!r} here'.format(parser))
+        if cache and not cache_data: cache.put(cache_key, self.__pbx_data)
+        print('>>> parser={} elapse={:.3f}s'.format(parser, time.perf_counter() - timestamp))
         self.__library = self.__pbx_data.get('objects')  # type: dict
-        self.__generate_pbx_project()
+        from pbxproj import pbxprojObjects
+        self.__pbx_snapshot = None if isinstance(self.__library, pbxprojObjects) else marshal.dumps(self.__library)
+        if generate_project: self.__generate_pbx_project()
         return self.__pbx_project
 
-    def save_pbxproj(self):
+    def save_pbxproj(self, file_path:str = None, backup:bool = True):
         import utils
-        utils.backup(file_path=self.__pbx_project_path)
-        with open(self.__pbx_project_path, mode='w') as fp:
-            fp.write('// !$*UTF8*$!\n')
-            fp.write(self.dump_pbxproj(note_enabled=True, json_format_enabled=False))
-            fp.write('\n')
+        if not file_path: file_path = self.__pbx_project_path
+        if backup: utils.backup(file_path=self.__pbx_project_path)
+        saved = self.__save_changes(file_path)
+        if not saved:
+            temp_path = '{}.{}'.format(file_path, os.getpid())
+            with open(temp_path, mode='w', encoding='utf-8') as fp:
+                fp.write('// !$*UTF8*$!\n')
+                self.__write_pbx_json(self.__pbx_data, fp, note_enabled=True)
+                fp.write('\n')
+            os.replace(temp_path, file_path)
+        if file_path == self.__pbx_project_path: self.__pbx_stamp = None # spans no longer match the file
+
+    def __save_changes(self, file_path:str)->bool:
+        # splice objects touched since loading into the loaded bytes, False if a full write is needed
+        from pbxproj import pbxprojParser, pbxprojObjects
+        if not self.__pbx_stamp or not os.path.exists(self.__pbx_project_path): return False
+        if self.__get_file_stamp(self.__pbx_project_path) != self.__pbx_stamp: return False
+        objects = self.__library
+        origin = objects if isinstance(objects, pbxprojObjects) else pbxprojParser.open(self.__pbx_project_path, mapping=True).read_index().get('objects')
+        if not isinstance(origin, pbxprojObjects): return False
+        if origin.attributes != {k:v for k, v in self.__pbx_data.items() if k != 'objects'}: return False
+        source = origin.parser.buffer
+        buffer = memoryview(source)
+        changed, added, removed = [], [], []
+        dirty = dict(self.__dirty) # PBXObject.data edited in place never reached update_pbx_object
+        if objects is origin:
+            for uuid in objects.decoded():
+                span = origin.span(uuid)
+                if span and uuid not in dirty and objects[uuid] != origin.parser.read_object(span[1], span[2])[0]: dirty[uuid] = None
+        else:
+            snapshot = marshal.loads(self.__pbx_snapshot) if self.__pbx_snapshot else {}
+            dirty.update((x, None) for x, data in snapshot.items() if x not in dirty and objects.get(x, data) != data)
+        for uuid in dirty:
+            span, exists = origin.origin(uuid), uuid in objects
+            if span and exists:
+                changed.append(uuid)
+            elif span:
+                removed.append(span)
+            elif exists:
+                added.append(uuid)
+        patches, notes = [], PBXNoteTable(self, self.__notes) # type: list[tuple[int, int, bytes]], PBXNoteTable
+        changed_set = set(changed)
+        for uuid in changed: # reuse notes of unchanged references instead of decoding them
+            _, offset, end = origin.origin(uuid)
+            for item_uuid, note in NOTE_PATTERN.findall(buffer[offset:end]):
+                item_uuid = item_uuid.decode('utf-8')
+                if item_uuid not in changed_set: notes[item_uuid] = note.decode('utf-8')
+        for uuid in changed: # the original key and note are kept, only the value is re-emitted
+            _, offset, end = origin.origin(uuid)
+            value = io.StringIO()
+            self.__write_pbx_json(objects.get(uuid), value, notes, indent='\t', padding='\t\t')
+            patches.append((offset, end, value.getvalue().encode('utf-8')))
+        for offset, _, end in removed:
+            line_offset = source.rfind(b'\n', 0, offset) + 1
+            if buffer[line_offset:offset].tobytes().strip(): line_offset = offset
+            end = source.find(b';', end) + 1
+            if buffer[end:end + 1] == b'\n': end += 1
+            patches.append((line_offset, end, b''))
+        sections = {} # type: dict[str, list[str]]
+        for uuid in added:
+            data = objects.get(uuid)
+            value = io.StringIO()
+            self.__write_pbx_json(data, value, notes, indent='\t', padding='\t\t')
+            note = notes[uuid]
+            sections.setdefault(data.get('isa'), []).append('\t\t{}{} = {};\n'.format(uuid, ' ' + note if note else '', value.getvalue()))
+        for isa, entries in sections.items():
+            offset = source.find('/* End {} section */'.format(isa).encode('utf-8'), 0, origin.end)
+            if offset >= 0:
+                patches.append((offset, offset, ''.join(entries).encode('utf-8')))
+            else:
+                offset = source.rfind(b'\n', 0, origin.end) + 1
+                section = '\n/* Begin {} section */\n{}/* End {} section */\n'.format(isa, ''.join(entries), isa)
+                patches.append((offset, offset, section.encode('utf-8')))
+        if not patches and file_path == self.__pbx_project_path: return True
+        patches.sort(key=lambda x: x[0])
+        temp_path = '{}.{}'.format(file_path, os.getpid())
+        with open(temp_path, mode='wb') as fp:
+            cursor = 0
+            for offset, end, data in patches:
+                fp.write(buffer[cursor:offset])
+                fp.write(data)
+                cursor = end
+            fp.write(buffer[cursor:])
+        os.replace(temp_path, file_path) # file may still be mapped, never write in place
+        return True
+
+    def merge_pbxproj(self, base_path:str, theirs_path:str, parser:str = 'lazy')->List[Dict[str, any]]:
+        # three-way merge of THEIRS into the loaded project, returns conflicts that kept our side
+        from pbxproj import pbxprojObjects
+        base, theirs = XcodeProject(), XcodeProject()
+        base.load_pbxproj(base_path, parser=parser, generate_project=False)
+        theirs.load_pbxproj(theirs_path, parser=parser, generate_project=False)
+        ours_objects, base_objects, theirs_objects = self.__library, base.__library, theirs.__library
+        def unchanged(a, b, uuid:str)->bool:
+            if isinstance(a, pbxprojObjects) and isinstance(b, pbxprojObjects):
+                raw = a.raw(uuid)
+                if raw is not None and raw == b.raw(uuid): return True # same bytes, skip decoding
+            return a[uuid] == b[uuid]
+        conflicts: list[dict[str, any]] = []
+        merged: list[str] = [] # taken from theirs, notes are copied since build files need a loaded project
+        for uuid in list(theirs_objects.keys()):
+            if uuid in base_objects:
+                if unchanged(base_objects, theirs_objects, uuid): continue
+                if uuid not in ours_objects:
+                    conflicts.append({'path': [uuid], 'base': base_objects[uuid], 'ours': None, 'theirs': theirs_objects[uuid]})
+                    continue
+                base_data = base_objects[uuid]
+            elif uuid not in ours_objects:
+                self.add_pbx_object(uuid, theirs_objects[uuid])
+                merged.append(uuid)
+                continue
+            else:
+                base_data = None
+            ours_data = ours_objects[uuid]
+            data = self.__merge_value(base_data, ours_data, theirs_objects[uuid], [uuid], conflicts)
+            if data != ours_data:
+                self.add_pbx_object(uuid, data)
+                merged.append(uuid)
+        if merged:
+            with open(theirs_path, mode='rb') as fp:
+                notes = {x.decode('utf-8'):y.decode('utf-8') for x, y in NOTE_PATTERN.findall(fp.read())}
+            self.__notes.update((x, notes[x]) for x in merged if x in notes)
+        for uuid in list(base_objects.keys()):
+            if uuid in theirs_objects or uuid not in ours_objects: continue
+            if unchanged(base_objects, ours_objects, uuid):
+                self.del_pbx_object(uuid)
+            else:
+                conflicts.append({'path': [uuid], 'base': base_objects[uuid], 'ours': ours_objects[uuid], 'theirs': None})
+        for name, value in theirs.__pbx_data.items():
+            if name == 'objects': continue
+            self.__pbx_data[name] = self.__merge_value(base.__pbx_data.get(name), self.__pbx_data.get(name), value, [name], conflicts)
+        return conflicts
+
+    def __merge_value(self, base:any, ours:any, theirs:any, path:List[str], conflicts:List[Dict[str, any]])->any:
+        if ours == theirs or theirs == base: return ours
+        if ours == base: return theirs
+        if isinstance(ours, dict) and isinstance(theirs, dict):
+            if not isinstance(base, dict): base = {}
+            result = {}
+            for name in list(ours.keys()) + [x for x in theirs.keys() if x not in ours]:
+                value = self.__merge_value(base.get(name), ours.get(name), theirs.get(name), path + [name], conflicts)
+                if value is not None: result[name] = value
+            return result
+        if isinstance(ours, list) and isinstance(theirs, list):
+            return self.__merge_list(base if isinstance(base, list) else [], ours, theirs)
+        conflicts.append({'path': path, 'base': base, 'ours': ours, 'theirs': theirs})
+        return ours
+
+    def __merge_list(self, base:List[any], ours:List[any], theirs:List[any])->List[any]:
+        base_keys, ours_keys, theirs_keys = set(map(repr, base)), set(map(repr, ours)), set(map(repr, theirs))
+        followers: dict[str, list[any]] = {} # anchor => items added by theirs right after it
+        anchor = None
+        for item in theirs:
+            key = repr(item)
+            if key in ours_keys:
+                anchor = key
+            elif key not in base_keys:
+                followers.setdefault(anchor, []).append(item)
+        result = list(followers.get(None, ()))
+        for item in ours:
+            key = repr(item)
+            if key in theirs_keys or key not in base_keys: result.append(item) # dropped if removed by theirs
+            result.extend(followers.get(key, ()))
+        return result
 
     def dump_pbxproj(self, note_enabled=True, json_format_enabled:bool = False):
         if json_format_enabled:
             return json.dumps(self.__pbx_data, indent=4)
         else:
-            buffer = self.__to_pbx_json(self.__pbx_data, note_enabled=note_enabled)
-            buffer.seek(0)
-            return buffer.read()
+            buffer = io.StringIO()
+            self.__write_pbx_json(self.__pbx_data, buffer, note_enabled=note_enabled)
+            return buffer.getvalue()
 
-    def import_assets(self, base_path:str, assets:[str], exclude_types:Tuple[str] = ('meta',)):
+    def import_assets(self, base_path:str, assets:[str], exclude_types:Tuple[str] = ('meta',), target:any = None, link:str = 'clone'):
         if not assets: return
-        xcproj_path = self.__xcode_project_path
-        script = open(tempfile.mktemp('_import_xcode_assets.sh'), mode='w+')
-        script.write('#!/usr/bin/env bash\n')
-        exclude_rules = open(os.path.abspath('exclude_rules.txt'), 'w')
-        exclude_rules.write('.*\n')
-        include_files = open(os.path.abspath('include_files.txt'), 'w')
-        for item_type in exclude_types: exclude_rules.write('*.{}\n'.format(item_type))
-        exclude_rules.close()
-        for file_path in assets:
-            location = os.path.join(base_path, file_path)
-            if os.path.isdir(location) or os.path.isfile(location):
-                include_files.write(file_path)
-                include_files.write('\n')
-        include_files.close()
-        script.write('cat {}\n'.format(include_files.name))
-        script.write('cat {}\n'.format(exclude_rules.name))
-        script.write('rsync -rvR --exclude-from="{}" --files-from="{}" "{}" "{}"\n'.format(exclude_rules.name, include_files.name, base_path, xcproj_path))
-        script.write('rm -f {}\n'.format(exclude_rules.name))
-        script.write('rm -f {}\n'.format(include_files.name))
-        script.write('rm -f {}\n'.format(script.name))
-        script.close()
-        assert os.system('bash -x "{}"'.format(script.name)) == 0
-        for file_path in assets:
-            self.__pbx_project.add_asset(file_path)
-
-    def __find_tree(self, location:str, pattern:Pattern)->List[str]:
-        result: list[str] = []
-        for node_name in os.listdir(location):
-            if pattern and pattern.search(node_name): continue
-            if node_name.startswith('.'): continue
-            node_path = os.path.join(location, node_name)
-            if os.path.isfile(node_path):
-                result.append(node_path)
-            elif os.path.isdir(node_path):
-                extension = node_name.split('.')[-1]
-                if extension in ('framework', 'bundle', 'xcassets'):
-                    result.append(node_path)
-                else:
-                    result.extend(self.__find_tree(node_path, pattern))
-        return result
-
-    def import_xcmod(self, file_path:str):
-        xcmod: dict[str, any] = json.load(open(file_path, 'r'))
+        self.copy_assets(base_path, assets, exclude_types, link=link)
+        print('>>> {}'.format(self.__pbx_project.add_assets(assets, target)))
+
+    def copy_assets(self, base_path:str, assets:[str], exclude_types:Tuple[str] = ('meta',), link:str = 'clone')->Dict[str, int]:
+        if not assets: return {}
+        from assets import assetsCopier
+        timestamp = time.perf_counter()
+        report = assetsCopier(exclude_types=exclude_types, link=link).copy(base_path, assets, self.__xcode_project_path)
+        print('>>> copy files={files} copied={copied} cloned={cloned} linked={linked} skipped={skipped} copied_bytes={copied_bytes} skipped_bytes={skipped_bytes}'.format(**report),
+              'elapse={:.3f}s'.format(time.perf_counter() - timestamp))
+        return report
+
+    def __resolve_base_path(self, xcmod:Dict[str, any], file_path:str)->str:
         import_settings: dict[str, any] = xcmod.get('imports')
         if not import_settings: import_settings = {}
         base_path: str = import_settings.get('base_path')
@@ -237,50 +524,409 @@ class XcodeProject(object):
         if not os.path.exists(base_path):
             base_path = os.path.join(os.path.dirname(file_path), base_path) # relative to *.xcmod path
         if not os.path.exists(base_path): raise AssertionError('base_path[={}] not exists'.format(import_settings.get('base_path')))
-        base_path = os.path.abspath(base_path)
+        return os.path.abspath(base_path)
+
+    def __get_path_kind(self, location:str)->str:
+        return 'dir' if os.path.isdir(location) else 'file' if os.path.lexists(location) else ''
+
+    def __load_imports(self, xcmod:Dict[str, any], file_path:str, mtimes:Dict[str, int] = None, kinds:Dict[str, str] = None)->Tuple[str, List[str], List[str], List[str], List[any]]:
+        target = xcmod.get('target')
+        import_settings: dict[str, any] = xcmod.get('imports')
+        if not import_settings: import_settings = {}
+        base_path = self.__resolve_base_path(xcmod, file_path)
+        from assets import walk_tree
         exclude_list: list[str] = import_settings.get('exclude')
+        if not exclude_list: exclude_list = []
         pattern:Pattern = re.compile(r'\.({})$'.format('|'.join(exclude_list))) if exclude_list else None
-        # embed frameworks
-        embed_frameworks: list[str] = import_settings.get('embed')
-        if embed_frameworks:
-            for framework_path in embed_frameworks:
-                self.__pbx_project.embed_framework(framework_path)
-        else:
-            embed_frameworks = []
+        embed_frameworks: list[str] = list(dict.fromkeys(import_settings.get('embed', []))) # repeated entries collapse
         # merge all kinds of assets
         assets: list[str] = []
+        asset_targets: list[any] = []
+        visited: set[str] = set(embed_frameworks) # same framework is imported only once
         for item_cfg in import_settings.get('items'): # type:dict[str, str]
             item_path = item_cfg.get('path')
-            if item_path in embed_frameworks: continue # same framework is imported only once
+            item_target = item_cfg.get('target', target)
             if item_cfg.get('type') == 'tree':
-                tree_assets = self.__find_tree(os.path.join(base_path, item_path), pattern)
-                for node_path in tree_assets:
-                    node_path = re.sub(r'^{}/'.format(base_path), '', node_path)
-                    assets.append(node_path)
+                tree_assets = sorted(walk_tree(base_path, item_path, pattern, mtimes=mtimes)) # stable order for reproducible output
+            else:
+                tree_assets = [item_path]
+                if kinds is not None: kinds[item_path] = self.__get_path_kind(os.path.join(base_path, item_path))
+            for asset_path in tree_assets:
+                if asset_path in visited: continue
+                visited.add(asset_path)
+                assets.append(asset_path)
+                asset_targets.append(item_target)
+        assets.extend(embed_frameworks)
+        asset_targets.extend([target] * len(embed_frameworks))
+        if kinds is not None: kinds.update((x, self.__get_path_kind(os.path.join(base_path, x))) for x in embed_frameworks)
+        return base_path, exclude_list, embed_frameworks, assets, asset_targets
+
+    def compile_xcmod(self, file_path:str)->Dict[str, any]:
+        xcmod: dict[str, any] = json.load(open(file_path, 'r'))
+        mtimes: dict[str, int] = {} # walked directory => mtime, any entry added or removed invalidates the plan
+        kinds: dict[str, str] = {} # listed item => 'dir', 'file' or '' if missing, a change invalidates the plan
+        base_path, exclude_list, embed_frameworks, assets, asset_targets = self.__load_imports(xcmod, file_path, mtimes, kinds)
+        items: list[list[any]] = []
+        for asset_path, asset_target in zip(assets, asset_targets):
+            file_type = PBXFileReference.classify(os.path.join(base_path, asset_path))
+            items.append([asset_path, asset_target, file_type, PBXProject.get_asset_phase(asset_path, file_type)])
+        return {'hash': self.__get_content_hash(file_path), 'key': self.__get_plan_key(file_path, xcmod), 'base_path': base_path, 'exclude': exclude_list,
+                'embed': embed_frameworks, 'assets': items, 'dirs': mtimes, 'items': kinds, 'xcmod': xcmod}
+
+    def __get_plan_key(self, file_path:str, xcmod:Dict[str, any])->str:
+        # relative paths of xcmod and base_path resolve against the working dir
+        return json.dumps([os.path.abspath(file_path), os.getcwd(), self.__resolve_base_path(xcmod, file_path)])
+
+    def get_plan_path(self, xcmod_path:str, pbxproj_path:str = None)->str:
+        if not pbxproj_path: pbxproj_path = self.__pbx_project_path
+        if not pbxproj_path: raise AssertionError('plan of {} needs a pbxproj path'.format(xcmod_path))
+        return os.path.join(os.path.dirname(pbxproj_path), '{}.plan'.format(self.__get_layer_name(xcmod_path)))
+
+    def load_plan(self, file_path:str, plan_path:str = None, pbxproj_path:str = None)->Optional[Dict[str, any]]:
+        if not plan_path: plan_path = self.get_plan_path(file_path, pbxproj_path)
+        if not os.path.exists(plan_path): return None
+        with open(plan_path, 'r') as fp:
+            plan: dict[str, any] = json.load(fp)
+        if plan.get('hash') != self.__get_content_hash(file_path): return None
+        base_path: str = plan.get('base_path')
+        if not os.path.isdir(base_path): return None
+        try:
+            if plan.get('key') != self.__get_plan_key(file_path, plan.get('xcmod')): return None
+        except AssertionError: return None
+        for dir_path, mtime in plan.get('dirs').items():
+            location = os.path.join(base_path, dir_path)
+            if not os.path.isdir(location) or os.stat(location).st_mtime_ns != mtime: return None
+        for item_path, kind in plan.get('items', {}).items():
+            if self.__get_path_kind(os.path.join(base_path, item_path)) != kind: return None
+        return plan
+
+    def save_plan(self, plan:Dict[str, any], plan_path:str):
+        dir_path = os.path.dirname(plan_path)
+        if dir_path and not os.path.exists(dir_path): os.makedirs(dir_path)
+        temp_path = '{}.{}'.format(plan_path, os.getpid())
+        with open(temp_path, 'w') as fp:
+            json.dump(plan, fp, ensure_ascii=False)
+        os.replace(temp_path, plan_path)
+
+    def get_plan(self, file_path:str, plan_path:str = None, pbxproj_path:str = None)->Dict[str, any]:
+        if not plan_path: plan_path = self.get_plan_path(file_path, pbxproj_path)
+        plan = self.load_plan(file_path, plan_path)
+        if plan: return plan
+        timestamp = time.perf_counter()
+        plan = self.compile_xcmod(file_path)
+        self.save_plan(plan, plan_path)
+        print('>>> compile {} assets={} elapse={:.3f}s'.format(file_path, len(plan.get('assets')), time.perf_counter() - timestamp))
+        return plan
+
+    def get_manifest_path(self, xcmod_path:str, pbxproj_path:str = None)->str:
+        if not pbxproj_path: pbxproj_path = self.__pbx_project_path
+        return os.path.join(os.path.dirname(pbxproj_path), '{}.manifest'.format(self.__get_layer_name(xcmod_path)))
+
+    def __get_layer_name(self, xcmod_path:str)->str:
+        # layers may share a file name, e.g. base/ios.xcmod and sdk/ios.xcmod
+        return '{}.{}'.format(os.path.basename(xcmod_path), hashlib.md5(os.path.abspath(xcmod_path).encode('utf-8')).hexdigest()[:8])
+
+    def __get_content_hash(self, file_path:str)->str:
+        with open(file_path, 'rb') as fp:
+            return hashlib.md5(fp.read()).hexdigest()
+
+    def __scan_imports(self, manifest, import_settings:Dict[str, any], base_path:str, exclude_list:List[str], assets:List[str], asset_targets:List[any]): # type: (assetsManifest, dict, str, list, list, list)->tuple[list, list, dict]
+        from assets import assetsCopier, dedup_assets
+        files = manifest.scan(base_path, assets, assetsCopier(exclude_types=tuple(exclude_list), link=import_settings.get('link', 'clone')))
+        if not import_settings.get('dedup'): return assets, asset_targets, files
+        duplicates, files, saved = dedup_assets(assets, files, [json.dumps(x) for x in asset_targets])
+        if duplicates:
+            for asset_path, kept_path in duplicates.items(): print('>>> dedup {} => {}'.format(asset_path, kept_path))
+            print('>>> dedup assets={} saved_bytes={}'.format(len(duplicates), saved))
+            asset_targets = [x for n, x in enumerate(asset_targets) if assets[n] not in duplicates]
+            assets = [x for x in assets if x not in duplicates]
+        return assets, asset_targets, files
+
+    def is_xcmod_applied(self, file_path:str, pbxproj_path:str)->bool:
+        # nothing changed since last import: same xcmod, untouched pbxproj, same files under base_path
+        from assets import assetsManifest
+        manifest = assetsManifest()
+        manifest.load(self.get_manifest_path(file_path, pbxproj_path))
+        if manifest.meta.get('xcmod') != self.__get_content_hash(file_path): return False
+        if manifest.meta.get('pbxproj') != self.__get_file_stamp(pbxproj_path): return False
+        plan = self.get_plan(file_path, pbxproj_path=pbxproj_path)
+        base_path, exclude_list, xcmod = plan.get('base_path'), plan.get('exclude'), plan.get('xcmod')
+        if manifest.meta.get('base_path') != base_path: return False
+        xcode_project_path = os.path.dirname(os.path.dirname(os.path.abspath(pbxproj_path)))
+        if any(self.__get_output_stamp(os.path.join(xcode_project_path, x)) != stamp for x, stamp in manifest.outputs.items()): return False # e.g. Info.plist regenerated
+        assets, asset_targets = [x[0] for x in plan.get('assets')], [x[1] for x in plan.get('assets')]
+        _, _, files = self.__scan_imports(manifest, xcmod.get('imports', {}), base_path, exclude_list, assets, asset_targets)
+        added, modified, removed = manifest.diff(files)
+        return not (added or modified or removed)
+
+    def __remove_assets(self, base_path:str, assets:List[str], refs:Dict[str, List[str]])->List[str]:
+        # only references and build files the import created, the project's own ones stay
+        removed: list[str] = []
+        tops: set[str] = set() # top-most directories gone from base_path
+        for asset_path in assets:
+            for uuid in refs.get(asset_path, ()): removed.extend(self.remove_pbx_object(uuid))
+            dir_path, top = os.path.dirname(asset_path), None
+            while dir_path and not os.path.isdir(os.path.join(base_path, dir_path)):
+                top, dir_path = dir_path, os.path.dirname(dir_path)
+            if top: tops.add(top)
+        for top in sorted(tops):
+            if any(top.startswith(x + '/') for x in tops): continue
+            removed.extend(self.__pbx_project.remove_tree(top, owned=set())) # groups left empty
+        return removed
+
+    def __remove_copies(self, files:List[str]):
+        for node_path in files:
+            location = os.path.join(self.__xcode_project_path, node_path)
+            if os.path.lexists(location): os.remove(location)
+            dir_path = os.path.dirname(location)
+            while dir_path != self.__xcode_project_path and os.path.isdir(dir_path) and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+                dir_path = os.path.dirname(dir_path)
+
+    def __flatten_layer(self, data:any, path:str, result:Dict[str, any]):
+        if isinstance(data, dict):
+            if path: result[path] = '<dict>'
+            for name, value in data.items(): self.__flatten_layer(value, '{}.{}'.format(path, name) if path else name, result)
+        elif isinstance(data, list):
+            if path: result[path] = '<list>' # items are unioned, never conflict
+        else:
+            result[path] = data
+
+    def find_conflicts(self, file_paths:List[str], plans:List[Dict[str, any]])->List[Dict[str, any]]:
+        # values a later layer silently overrides: settings, plist leaves, assets from another base_path
+        conflicts: list[dict[str, any]] = []
+        seen: dict[tuple, tuple[str, any]] = {}
+        def record(key:tuple, value:any, file_path:str):
+            previous = seen.get(key)
+            if previous and previous[0] != file_path and previous[1] != value:
+                conflicts.append({'kind': key[0], 'key': key[-1], 'target': json.loads(key[1]) if key[0] != 'asset' else None,
+                                  'layers': [{'xcmod': previous[0], 'value': previous[1]}, {'xcmod': file_path, 'value': value}]})
+            seen[key] = (file_path, value)
+        for file_path, plan in zip(file_paths, plans):
+            xcmod: dict[str, any] = plan.get('xcmod')
+            if self.__pbx_project: # selectors resolving to the same target meet
+                scopes = [json.dumps(self.__pbx_project.trim(x.name)) for x in self.__pbx_project.select_targets(xcmod.get('target'))]
             else:
-                assets.append(item_path)
-        self.import_assets(base_path, assets + embed_frameworks, exclude_types=tuple(exclude_list))
+                scopes = [json.dumps(xcmod.get('target'))]
+            values: dict[str, any] = {}
+            self.__flatten_layer(xcmod.get('plist') or {}, '', values)
+            for scope in scopes:
+                for name, value in (xcmod.get('settings') or {}).items():
+                    if not isinstance(value, list): record(('settings', scope, name), value, file_path)
+                for name, value in values.items(): record(('plist', scope, name), value, file_path)
+            for item in plan.get('assets'): record(('asset', item[0]), os.path.join(plan.get('base_path'), item[0]), file_path)
+        return conflicts
+
+    def __scan_layer(self, file_path:str, plan:Dict[str, any], incremental:bool)->Dict[str, any]:
+        from assets import assetsManifest
+        xcmod: dict[str, any] = plan.get('xcmod')
+        import_settings: dict[str, any] = xcmod.get('imports')
+        if not import_settings: import_settings = {}
+        base_path, exclude_list = plan.get('base_path'), plan.get('exclude')
+        assets, asset_targets = [x[0] for x in plan.get('assets')], [x[1] for x in plan.get('assets')]
+        # only apply what changed since the last import recorded in manifest
+        manifest = assetsManifest()
+        manifest.load(self.get_manifest_path(file_path))
+        incremental = incremental and manifest.meta.get('pbxproj') == self.__get_file_stamp(self.__pbx_project_path) and manifest.meta.get('base_path') == base_path
+        assets, asset_targets, files = self.__scan_imports(manifest, import_settings, base_path, exclude_list, assets, asset_targets)
+        selectors: dict[str, str] = {}
+        for asset_path, asset_target in zip(assets, asset_targets): selectors.setdefault(asset_path, json.dumps(asset_target))
+        return {'file_path': file_path, 'plan': plan, 'manifest': manifest, 'incremental': incremental, 'assets': assets, 'selectors': selectors, 'files': files}
+
+    def __import_layer(self, layer:Dict[str, any], current:set, current_files:set): # type: (dict, set[str], set[str])->assetsManifest
+        plan, manifest, incremental = layer.get('plan'), layer.get('manifest'), layer.get('incremental') # type: dict, assetsManifest, bool
+        assets, selectors, files = layer.get('assets'), layer.get('selectors'), layer.get('files')
+        xcmod: dict[str, any] = plan.get('xcmod')
+        target = xcmod.get('target') # name, name pattern or list of them, main target if absent
+        import_settings: dict[str, any] = xcmod.get('imports')
+        if not import_settings: import_settings = {}
+        base_path, exclude_list, embed_frameworks = plan.get('base_path'), plan.get('exclude'), plan.get('embed')
+        file_types: dict[str, str] = {x[0]:x[2] for x in plan.get('assets')}
+        added, modified, removed = manifest.diff(files)
+        stale = [x for x, selector in manifest.assets.items() if x not in current or (x in selectors and selectors.get(x) != selector)] # moved to another layer is not stale
+        if stale: print('>>> remove {} stale assets, {} objects'.format(len(stale), len(self.__remove_assets(base_path, stale, manifest.refs))))
+        created: dict[str, list[str]] = {x:[y for y in manifest.refs.get(x, []) if self.has_pbx_object(y)] for x in selectors if x not in stale}
+        # embed frameworks
+        for framework_path in embed_frameworks:
+            if framework_path not in selectors: continue # dropped as duplicate
+            self.__pbx_project.embed_framework(framework_path, target, created.setdefault(framework_path, []))
+        removed = [x for x in removed if x not in current_files]
+        if removed: self.__remove_copies(removed)
+        self.copy_assets(base_path, added + modified if incremental else assets, exclude_types=tuple(exclude_list), link=import_settings.get('link', 'clone'))
+        asset_groups: dict[str, list[str]] = {} # selector => assets
+        for asset_path, selector in selectors.items():
+            if incremental and manifest.assets.get(asset_path) == selector: continue
+            asset_groups.setdefault(selector, []).append(asset_path)
+        for asset_target, asset_paths in asset_groups.items():
+            print('>>> {}'.format(self.__pbx_project.add_assets(asset_paths, json.loads(asset_target), file_types, created)))
+        manifest.meta = {'xcmod': self.__get_content_hash(layer.get('file_path')), 'base_path': base_path}
+        manifest.assets, manifest.files = selectors, files
+        manifest.refs = {x:list(dict.fromkeys(y)) for x, y in created.items() if y}
+        return manifest
+
+    def __merge_settings_layers(self, xcmods:List[Dict[str, any]])->List[Dict[str, any]]:
+        # one settings block per output, i.e. target and xcconfig dir, selectors resolving to the same target share it, later layers win
+        groups: dict[tuple, dict[str, any]] = {}
+        for xcmod in xcmods:
+            for target_item in self.__pbx_project.select_targets(xcmod.get('target')):
+                target_name = self.__pbx_project.trim(target_item.name)
+                key = (target_name, xcmod.get('xcconfig'))
+                group = groups.setdefault(key, {'target': target_name, 'xcconfig': xcmod.get('xcconfig'), 'settings': {}})
+                for name, value in (xcmod.get('settings') or {}).items():
+                    previous = group['settings'].get(name)
+                    if isinstance(value, list) and isinstance(previous, list):
+                        value = previous + [x for x in value if x not in previous]
+                    group['settings'][name] = value
+        return list(groups.values())
+
+    def __warn_conflicts(self, file_paths:List[str], plans:List[Dict[str, any]]):
+        for conflict in self.find_conflicts(file_paths, plans):
+            print('CONFLICT {}'.format(json.dumps(conflict, ensure_ascii=False)), file=sys.stderr)
+
+    def import_xcmod(self, file_path:str, settings_only:bool = False, incremental:bool = True):
+        self.import_xcmods([file_path], settings_only=settings_only, incremental=incremental)
+
+    def import_xcmods(self, file_paths:List[str], settings_only:bool = False, incremental:bool = True, plans:List[Dict[str, any]] = None):
+        if settings_only:
+            xcmods = [json.load(open(x, 'r')) for x in file_paths]
+            self.__warn_conflicts(file_paths, [{'xcmod': x, 'assets': []} for x in xcmods])
+            xcconfigs: list = []
+            for group in self.__merge_settings_layers(xcmods): xcconfigs.extend(self.merge_settings(group, group.get('target')))
+            self.save_xcconfig(xcconfigs)
+            return
+        if not plans: plans = [self.get_plan(x) for x in file_paths] # resolved file lists and types, reused while base_path is unchanged
+        xcmods: list[dict[str, any]] = [x.get('xcmod') for x in plans]
+        self.__warn_conflicts(file_paths, plans) # later layers win, --strict aborts before loading instead
+        layers = [self.__scan_layer(file_path, plan, incremental) for file_path, plan in zip(file_paths, plans)]
+        current = {x for layer in layers for x in layer.get('selectors')}
+        current_files = {x for layer in layers for x in layer.get('files')}
+        manifests = [self.__import_layer(layer, current, current_files) for layer in layers]
         # merge build settings
-        build_settings: dict[str, str] = xcmod.get('settings')
-        if build_settings:
-            for name, value in build_settings.items(): # type: str, str
-                self.__pbx_project.add_build_setting(name, value)
+        xcconfigs: list = []
+        for group in self.__merge_settings_layers(xcmods): xcconfigs.extend(self.merge_settings(group, group.get('target')))
         # merge flags
-        self.__pbx_project.add_flags(xcmod.get('compiler_flags'), FlagsType.compiler)
-        self.__pbx_project.add_flags(xcmod.get('link_flags'), FlagsType.link)
-        self.save_pbxproj()
+        for xcmod in xcmods:
+            self.__pbx_project.add_flags(xcmod.get('compiler_flags'), FlagsType.compiler, target=xcmod.get('target'))
+            self.__pbx_project.add_flags(xcmod.get('link_flags'), FlagsType.link, target=xcmod.get('target'))
+        self.save_xcconfig(xcconfigs)
         # merge plist settings
-        self.merge_plist(xcmod.get('plist'))
+        outputs = self.merge_plists([(x.get('plist'), x.get('target')) for x in xcmods])
         # merge class injections
-        self.merge_class(xcmod.get('class'))
-
-    def merge_class(self, data:List[Dict[str, any]]):
-        if not data: return
+        outputs.extend(self.merge_class([item for x in xcmods for item in x.get('class') or []]))
+        stamp = self.__get_file_stamp(self.__pbx_project_path)
+        outputs = {os.path.relpath(x, self.__xcode_project_path):self.__get_output_stamp(x) for x in outputs}
+        for manifest in manifests:
+            manifest.meta['pbxproj'] = stamp
+            manifest.outputs = outputs
+            manifest.save()
+
+    def merge_settings(self, xcmod:Dict[str, any], target:any = None)->list:
+        build_settings: dict[str, any] = xcmod.get('settings')
+        if xcmod.get('xcconfig'): # settings live in generated *.xcconfig files
+            return self.merge_xcconfig(build_settings, xcmod.get('xcconfig'), target)
+        self.__pbx_project.add_build_settings(build_settings, target=target)
+        return []
+
+    def merge_xcconfig(self, settings:Dict[str, any], xcconfig_path:str, target:any = None)->list:
+        from xcconfig import xcconfigObject
+        if not settings: settings = {}
+        project = self.__pbx_project
+        dir_path = os.path.join(self.__xcode_project_path, xcconfig_path)
+        xcconfigs: list[xcconfigObject] = []
+        for target_item in project.select_targets(target):
+            target_name = project.trim(target_item.name)
+            for config in target_item.buildConfigurationList.buildConfigurations:
+                config_name = project.trim(config.name)
+                file_name = '{}.{}.xcconfig'.format(target_name, config_name)
+                xcconfig = xcconfigObject()
+                xcconfig.load(os.path.join(dir_path, file_name))
+                ref = PBXFileReference.create(self, os.path.normpath(os.path.join(xcconfig_path, file_name)))
+                base_uuid = config.data.get('baseConfigurationReference')
+                if base_uuid != ref.uuid:
+                    location = self.get_ref_location(base_uuid) if base_uuid else None
+                    if location: xcconfig.include(os.path.relpath(location, dir_path)) # e.g. CocoaPods
+                    data = list(config.data.items())
+                    config.data.clear()
+                    config.data.update(data[:1])
+                    config.data['baseConfigurationReference'] = ref.uuid
+                    config.data.update(x for x in data[1:] if x[0] != 'baseConfigurationReference')
+                    self.update_pbx_object(config.uuid)
+                    project.mainGroup.sync(ref)
+                # inline values would override the xcconfig, list values are carried over so they can be merged into
+                inline = xcconfig.inline
+                inline.update((x, list(v)) for x, v in config.buildSettings.items() if x in settings and isinstance(v, list))
+                restore = {x:v for x, v in inline.items() if x not in settings} # key left the settings block
+                xcconfig.inline = {x:v for x, v in inline.items() if settings.get(x) is not None}
+                project.settings.update({name:None for name in settings}, target=target_item.name, where=lambda t, c, s: c == config_name)
+                if restore: project.settings.update(restore, target=target_item.name, where=lambda t, c, s: c == config_name)
+                xcconfig.replace(settings)
+                xcconfig.meta['target'] = target_name
+                xcconfig.meta['main'] = 'YES' if target_item is project.targets[0] else 'NO'
+                xcconfigs.append(xcconfig)
+        return xcconfigs
+
+    def save_xcconfig(self, xcconfigs:list):
+        self.save_pbxproj()
+        stamp = self.__get_file_stamp(self.__pbx_project_path)
+        for xcconfig in xcconfigs:
+            xcconfig.meta['pbxproj'] = stamp
+            if xcconfig.save(): print('>>> {}'.format(xcconfig.file_path))
+
+    def update_xcconfig(self, file_path:str, pbxproj_path:str)->bool:
+        # settings-only change: regenerate linked *.xcconfig files without parsing pbxproj
+        from xcconfig import xcconfigObject, find_xcconfigs
+        xcmod: dict[str, any] = json.load(open(file_path, 'r'))
+        settings: dict[str, any] = xcmod.get('settings')
+        if not xcmod.get('xcconfig') or not settings: return False
+        xcode_project_path = os.path.abspath(os.path.join(os.path.dirname(pbxproj_path), os.pardir))
+        stamp = self.__get_file_stamp(pbxproj_path)
+        xcconfigs: list[xcconfigObject] = []
+        for xcconfig_path in find_xcconfigs(os.path.join(xcode_project_path, xcmod.get('xcconfig'))):
+            xcconfig = xcconfigObject()
+            xcconfig.load(xcconfig_path)
+            if 'target' not in xcconfig.meta: return False # linked by an older version
+            if not xcconfig.selected(xcmod.get('target')): continue
+            if xcconfig.meta.get('pbxproj') != stamp: return False # pbxproj changed since linked
+            if not {k for k, v in settings.items() if v is not None} <= set(xcconfig.meta.get('keys', '').split()): return False # inline values not stripped yet
+            if not set(xcconfig.inline) <= set(settings): return False # carried values go back inline
+            xcconfigs.append(xcconfig)
+        if not xcconfigs: return False
+        for xcconfig in xcconfigs:
+            xcconfig.replace(settings)
+            if xcconfig.save(): print('>>> {}'.format(xcconfig.file_path))
+        return True
+
+    def __get_output_stamp(self, file_path:str)->str:
+        return self.__get_file_stamp(file_path) if os.path.exists(file_path) else ''
+
+    def __get_file_stamp(self, file_path:str)->str:
+        stat = os.stat(file_path)
+        return '{}-{}'.format(stat.st_size, stat.st_mtime_ns)
+
+    def get_ref_location(self, uuid:str)->Optional[str]:
+        data = self.__library.get(uuid)
+        if not data: return None
+        trim = self.__pbx_project.trim
+        path, source_tree = trim(data.get('path')), trim(data.get('sourceTree'))
+        if source_tree == '<absolute>': return path
+        if source_tree == 'SOURCE_ROOT': return os.path.join(self.__xcode_project_path, path)
+        if source_tree != '<group>': return None # SDKROOT, BUILT_PRODUCTS_DIR, ...
+        parent = next((x for x in self.get_pbx_referrers(uuid) if self.__library.get(x).get('isa') in (PBXGroup.__name__, PBXVariantGroup.__name__)), None)
+        location = self.get_ref_location(parent) if parent else self.__xcode_project_path
+        return os.path.join(location, path) if location and path else location
+
+    def merge_class(self, data:List[Dict[str, any]])->List[str]:
+        # returns locations of the class files, missing ones included
+        if not data: return []
         from objc import objcClass
+        classes: dict[str, objcClass] = {} # each file is loaded and saved once
+        locations: list[str] = []
         for item in data:
             location = os.path.join(self.__xcode_project_path, item.get('path'))
+            if location not in locations: locations.append(location)
             if not os.path.exists(location): continue
-            objc = objcClass(file_path=location)
+            objc = classes.get(location)
+            if not objc: objc = classes[location] = objcClass(file_path=location)
             import_headers = item.get('imports') # type: list[str]
             if import_headers:
                 for header in import_headers: objc.import_header(header)
@@ -294,56 +940,80 @@ class XcodeProject(object):
                         objc.replace(code=code.get('code'), replacement=code.get('replace'))
                     else:
                         objc.insert_within_method(method=code.get('func'), code=code.get('code'))
-            objc.save()
-
-    def merge_plist(self, data:Dict[str, any]):
-        if not data: return
-        plist_path = self.__pbx_project.get_info_plist()
-        from plist import plistObject
-        plist = plistObject()
-        plist.load(file_path=os.path.join(self.__xcode_project_path, plist_path))
-        plist.merge(data)
-        plist.save()
+        for objc in classes.values(): objc.save()
+        return locations
 
-    def __is_pbx_key(self, value:str)->bool:
-        return len(value) == 24 and self.has_pbx_object(value)
+    def merge_plist(self, data:Dict[str, any], target:any = None):
+        self.merge_plists([(data, target)])
 
-    def __to_pbx_json(self, data:any, note_enabled:bool, indent:str = '    ', padding:str = '', buffer:io.StringIO = None)->io.StringIO:
-        if not buffer: buffer = io.StringIO()
-        library = self.__pbx_library
+    def merge_plists(self, layers:List[Tuple[Dict[str, any], any]])->List[str]:
+        # returns locations of the Info.plist files, missing ones included
+        from plist import plistObject
+        plists: dict[str, plistObject] = {} # each Info.plist is loaded and saved once
+        locations: list[str] = []
+        for data, target in layers:
+            if not data: continue
+            plist_paths: list[str] = []
+            for target_item in self.__pbx_project.select_targets(target):
+                plist_path = self.__pbx_project.get_info_plist(target_item.name)
+                if not plist_path or plist_path in plist_paths: continue
+                plist_paths.append(plist_path)
+                location = os.path.join(self.__xcode_project_path, self.__pbx_project.trim(plist_path))
+                if location not in locations: locations.append(location)
+                if not os.path.exists(location):
+                    print('>>> skip missing {} of target {}'.format(location, self.__pbx_project.trim(target_item.name)), file=sys.stderr)
+                    continue
+                plist = plists.get(location)
+                if not plist:
+                    plist = plists[location] = plistObject()
+                    plist.load(file_path=location)
+                plist.merge(data)
+        for plist in plists.values(): plist.save()
+        return locations
+
+    def __write_pbx_json(self, data:any, fp:io.TextIOBase, notes = None, note_enabled:bool = True, indent:str = '    ', padding:str = ''): # type: (any, io.TextIOBase, PBXNoteTable, bool, str, str)->None
+        chunks: list[str] = []
+        self.__write_pbx_value(data, fp, chunks, notes if notes is not None else PBXNoteTable(self, self.__notes), note_enabled, indent, padding)
+        fp.write(''.join(chunks))
+
+    def __write_pbx_value(self, data:any, fp:io.TextIOBase, chunks:List[str], notes, note_enabled:bool, indent:str, padding:str): # type: (any, io.TextIOBase, list[str], PBXNoteTable, bool, str, str)->None
+        write = chunks.append
         compact = True if not indent else False
         if isinstance(data, dict):
             if data.get('isa') in ('PBXFileReference', 'PBXBuildFile'):
                 indent, padding, compact = '', '', True
-            buffer.write('{')
-            if not compact: buffer.write('\n')
+            write('{' if compact else '{\n')
+            separator = '; ' if compact else ';\n'
             for name, value in data.items():
-                buffer.write('{}{}{}'.format(padding, indent, name))
-                if note_enabled and self.__is_pbx_key(name): buffer.write(' {}'.format(library.get(name).note()))
-                buffer.write(' = ')
+                write(padding + indent + name)
+                if note_enabled:
+                    note = notes[name]
+                    if note is not None: write(' ' + note)
+                write(' = ')
                 if isinstance(value, str):
-                    if not value: value = '\"\"'
-                    buffer.write(value)
-                    if note_enabled and self.__is_pbx_key(value): buffer.write(' {}'.format(library.get(value).note()))
-                    buffer.write('; ')
-                    if not compact: buffer.write('\n')
+                    write(value if value else '\"\"')
+                    if note_enabled:
+                        note = notes[value]
+                        if note is not None: write(' ' + note)
                 else:
-                    self.__to_pbx_json(value, buffer=buffer, padding=padding + indent, indent=indent, note_enabled=note_enabled)
-                    buffer.write('; ')
-                    if not compact: buffer.write('\n')
-            buffer.write('{}}}'.format(padding))
+                    self.__write_pbx_value(value, fp, chunks, notes, note_enabled, indent, padding + indent)
+                write(separator)
+                if len(chunks) >= 0x4000: # flush
+                    fp.write(''.join(chunks))
+                    chunks.clear()
+            write(padding + '}')
         elif isinstance(data, list):
-            buffer.write('(')
-            if not compact: buffer.write('\n')
+            write('(' if compact else '(\n')
+            separator = ', ' if compact else ',\n'
             for value in data:
-                self.__to_pbx_json(value, buffer=buffer, padding=padding + indent, indent=indent, note_enabled=note_enabled)
-                buffer.write(', ')
-                if not compact: buffer.write('\n')
-            buffer.write('{})'.format(padding))
+                self.__write_pbx_value(value, fp, chunks, notes, note_enabled, indent, padding + indent)
+                write(separator)
+            write(padding + ')')
         else:
-            buffer.write('{}{}'.format(padding, data))
-            if note_enabled and self.__is_pbx_key(data):buffer.write(' {}'.format(library.get(data).note()))
-        return buffer
+            write('{}{}'.format(padding, data))
+            if note_enabled and isinstance(data, str):
+                note = notes[data]
+                if note is not None: write(' ' + note)
 
 class PBXObjectLibrary(dict):
     def __init__(self, project:XcodeProject):
@@ -352,12 +1022,16 @@ class PBXObjectLibrary(dict):
 
     def get(self, name):
         item = dict.get(self, name)
-        if not item:
-            unknown = PBXObjectUnresolved(self.__project)
-            unknown.load(name)
-            return unknown
-        else:
-            return item
+        return item if item else self.load(name)
+
+    def load(self, uuid:str): # type: (str)->PBXObject
+        item = dict.get(self, uuid)
+        if item is None:
+            data = self.__project.get_pbx_object(uuid)
+            item_type = PBXObject.registry.get(data.get('isa')) if isinstance(data, dict) else None
+            item = (item_type if item_type else PBXObjectUnresolved)(self.__project)
+            item.load(uuid)
+        return item
 
     def __getattribute__(self, item):
         try:
@@ -365,7 +1039,146 @@ class PBXObjectLibrary(dict):
         except AttributeError:
             return self.get(item)
 
+class PBXNoteTable(dict):
+    def __init__(self, project:XcodeProject, notes:Dict[str, str] = None):
+        super().__init__(notes if notes else ())
+        self.__project = project
+
+    def __missing__(self, value:str)->Optional[str]:
+        note = None # not a reference
+        if len(value) == 24 and self.__project.has_pbx_object(value):
+            note = self.__project.get_pbx_library().get(value).note()
+        self[value] = note
+        return note
+
+class PBXSettingArray(list):
+    # list without repeated items, every mutator keeps the member set in sync
+    def __init__(self, items:List[any] = ()):
+        super().__init__()
+        self.__members = set() # type:set[any]
+        self.extend(items)
+
+    def __contains__(self, item:any)->bool:
+        return item in self.__members
+
+    def append(self, item:any):
+        if item not in self.__members:
+            self.__members.add(item)
+            super().append(item)
+
+    def extend(self, items:List[any]):
+        for item in items: self.append(item)
+
+    def insert(self, index:int, item:any):
+        if item not in self.__members:
+            self.__members.add(item)
+            super().insert(index, item)
+
+    def __iadd__(self, items:List[any]):
+        self.extend(items)
+        return self
+
+    def __imul__(self, count:int):
+        if count <= 0: self.clear()
+        return self
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.__reindex()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.__reindex()
+
+    def remove(self, item:any):
+        super().remove(item)
+        self.__members.discard(item)
+
+    def pop(self, index:int = -1)->any:
+        item = super().pop(index)
+        self.__members.discard(item)
+        return item
+
+    def clear(self):
+        super().clear()
+        self.__members.clear()
+
+    def __reindex(self): # assigned items may repeat, the first one is kept
+        items = list(self)
+        self.clear()
+        self.extend(items)
+
+class PBXAllocator(object):
+    def __init__(self, project:XcodeProject, batch_size:int = 1024):
+        self.project = project
+        self.batch_size = batch_size
+        self.__pool: list[str] = []
+
+    def reset(self):
+        self.__pool = []
+
+    def reserve(self, isa:str, seeds:List[str]):
+        # bulk imports draw the random bytes for all of their objects at once
+        count = len(seeds) - len(self.__pool)
+        if count > 0: self.__pool = self.__draw(max(count, self.batch_size)) + self.__pool
+
+    def __draw(self, count:int)->List[str]:
+        chunk = os.urandom(12 * count).hex().upper()
+        return [chunk[n:n+24] for n in range(0, len(chunk), 24)]
+
+    def next(self, isa:str, seed:Optional[str], attempt:int)->str:
+        if not self.__pool: self.__pool = self.__draw(self.batch_size) # a whole batch of random bytes at once
+        return self.__pool.pop()
+
+    def allocate(self, isa:str, seed:str = None)->str:
+        attempt = 0
+        while True:
+            uuid = self.next(isa, seed, attempt)
+            if not self.project.has_pbx_object(uuid): return uuid
+            attempt += 1
+
+class PBXHashAllocator(PBXAllocator):
+    def __init__(self, project:XcodeProject, batch_size:int = 1024):
+        super(PBXHashAllocator, self).__init__(project, batch_size)
+        self.__sequences: dict[str, int] = {} # isa => count of objects created without seed
+        self.__reserved: dict[tuple[str, str], str] = {} # (isa, seed) => first candidate
+
+    def reset(self):
+        super(PBXHashAllocator, self).reset()
+        self.__sequences.clear()
+        self.__reserved.clear()
+
+    def reserve(self, isa:str, seeds:List[str]):
+        # candidates of a bulk import are hashed in one pass, collisions are still resolved on allocation
+        if len(self.__reserved) + len(seeds) > self.batch_size * 16: self.__reserved.clear()
+        for seed in seeds:
+            key = (isa, seed)
+            if key not in self.__reserved: self.__reserved[key] = self.__hash('{}:{}'.format(isa, seed))
+
+    def allocate(self, isa:str, seed:str = None)->str:
+        if seed is None:
+            sequence = self.__sequences[isa] = self.__sequences.get(isa, 0) + 1
+            seed = '#{}'.format(sequence)
+        return super(PBXHashAllocator, self).allocate(isa, seed)
+
+    @staticmethod
+    def __hash(content:str)->str:
+        return hashlib.md5(content.encode('utf-8')).hexdigest()[:24].upper()
+
+    def next(self, isa:str, seed:Optional[str], attempt:int)->str:
+        if not attempt:
+            uuid = self.__reserved.pop((isa, seed), None)
+            return uuid if uuid else self.__hash('{}:{}'.format(isa, seed))
+        return self.__hash('{}:{}:{}'.format(isa, seed, attempt))
+
 class PBXObject(object):
+    __slots__ = ('project', 'data', 'uuid', 'isa')
+    registry: Dict[str, type] = {} # isa => class
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        PBXObject.registry[cls.__name__] = cls
+
     def __init__(self, project:XcodeProject):
         self.project = project
         self.data: dict[str,any] = None
@@ -375,7 +1188,7 @@ class PBXObject(object):
     def load(self, uuid:str):
         self.uuid = uuid
         self.data = self.project.get_pbx_object(uuid)
-        self.isa = self.data.get('isa') # type: str
+        if self.data: self.isa = self.data.get('isa') # type: str
         self.project.append_pbx_object(self)
 
     def note(self)->str:
@@ -392,59 +1205,73 @@ class PBXObject(object):
         self.project.append_pbx_object(self)
         return self
 
-    def generate_uuid(self) -> str:
-        md5 = hashlib.md5()
-        timestamp = time.mktime(time.localtime()) + time.process_time()
-        md5.update('{}-{}'.format(timestamp, random.random()).encode('utf-8'))
-        return md5.hexdigest()[:24].upper()
-
-    def attach(self):
+    def attach(self, seed:str = None):
         if not self.data: self.data = {}
         self.data.update({'isa': self.__class__.__name__})
         if self.uuid:
             self.project.add_pbx_object(self.uuid, self.data)
         else:
-            while True:
-                uuid = self.generate_uuid()
-                if not self.project.has_pbx_object(uuid):
-                    self.project.add_pbx_object(uuid, self.data)
-                    self.uuid = uuid
-                    self.project.append_pbx_object(self)
-                    break
+            self.uuid = self.project.allocate_uuid(self.__class__.__name__, seed)
+            self.project.add_pbx_object(self.uuid, self.data)
+            self.project.append_pbx_object(self)
         return self
 
     def detach(self):
         if self.uuid: self.project.del_pbx_object(self.uuid)
 
+    def __unlink_data(self, data:any, uuid:str):
+        if isinstance(data, dict):
+            for name in list(data.keys()):
+                value = data[name]
+                if name == uuid or value == uuid:
+                    del data[name]
+                else:
+                    self.__unlink_data(value, uuid)
+        elif isinstance(data, list):
+            data[:] = [x for x in data if x != uuid]
+            for value in data: self.__unlink_data(value, uuid)
+
+    def unlink(self, uuid:str):
+        self.__unlink_data(self.data, uuid)
+        self.project.update_pbx_object(self.uuid)
+
 class PBXObjectUnresolved(PBXObject):
+    __slots__ = ()
+
     def note(self):
-        return '/* {} */'.format(self.__class__.__name__)
+        return '/* {} */'.format(self.isa)
 
 class PBXBuildFile(PBXObject):
+    __slots__ = ('fileRef', 'phase')
+
     def __init__(self, project:XcodeProject):
         super(PBXBuildFile, self).__init__(project)
-        self.fileRef = PBXFileReference(self.project)
+        self.fileRef: PBXFileReference = None
         self.phase: PBXBuildPhase = None
 
     def load(self, uuid:str):
         super(PBXBuildFile, self).load(uuid)
-        self.fileRef.load(self.data.get('fileRef'))
+        self.fileRef = self.project.get_pbx_library().load(self.data.get('fileRef'))
 
     def note(self)->str:
+        if not self.phase and self.project.pbx_project: self.project.pbx_project.load_build_files()
         ref = self.fileRef
+        name = getattr(ref, 'name', None)
+        file_name = name if name else getattr(ref, 'path', None)
         if self.phase:
-            return '/* {} in {} */'.format(self.trim(ref.name if ref.name else ref.path), self.trim(self.phase.name))
-        elif not ref.name.endswith('.h'):
-            return '/* EXPECT_PHASE {} */'.format(self.trim(ref.name if ref.name else ref.path))
+            return '/* {} in {} */'.format(self.trim(file_name), self.trim(self.phase.name))
+        elif not name or not name.endswith('.h'):
+            return '/* EXPECT_PHASE {} */'.format(self.trim(file_name))
         else:
-            return '/* {} */'.format(self.trim(ref.name if ref.name else ref.path))
+            return '/* {} */'.format(self.trim(file_name))
 
     @staticmethod
-    def create(project:XcodeProject, file_path:str):
-        file = PBXFileReference.create(project, file_path)
-        item = PBXBuildFile(project).attach()
+    def create(project:XcodeProject, file_path:str, file = None): # type: (XcodeProject, str, PBXFileReference)->PBXBuildFile
+        if not file: file = PBXFileReference.create(project, file_path)
+        item = PBXBuildFile(project).attach(seed=file.uuid)
         item.data['fileRef'] = file.uuid
         item.fileRef = file
+        project.update_pbx_object(item.uuid)
         return item
 
     def add_attributes(self, attributes:Tuple[str] = ('CodeSignOnCopy', 'RemoveHeadersOnCopy')):
@@ -457,11 +1284,16 @@ class PBXBuildFile(PBXObject):
         attr_list = settings[field_name] # type: list[str]
         for item in attributes:
             if item not in attr_list: attr_list.append(item)
+        self.project.update_pbx_object(self.uuid)
 
 class PBXGroup(PBXObject):
+    __slots__ = ('__children', '__groups', '__uuids', 'path', 'name', 'sourceTree')
+
     def __init__(self, project:XcodeProject):
         super(PBXGroup, self).__init__(project)
-        self.children = [] # type:list[PBXObject]
+        self.__children = [] # type:list[PBXObject]
+        self.__groups = {} # type:dict[str, PBXGroup]
+        self.__uuids = set() # type:set[str]
         self.path = None # type:str
         self.name = None # type:str
         self.sourceTree = None  # type:str
@@ -473,53 +1305,83 @@ class PBXGroup(PBXObject):
         # virtual folder name in Xcode project
         self.name = self.data.get('name') # type:str
         self.sourceTree = self.data.get('sourceTree')  # type:str
-        self.children = []
-        for item_uuid in self.data.get('children'):
-            data = self.project.get_pbx_object(item_uuid) # type:dict
-            item = globals().get(data.get('isa'))(self.project) # type: PBXObject
-            item.load(item_uuid)
-            self.children.append(item)
+        self.__children = None # resolved on first access
+
+    @property
+    def children(self)->List[PBXObject]:
+        if self.__children is None:
+            library = self.project.get_pbx_library()
+            self.__children, self.__groups, self.__uuids = [], {}, set()
+            for item_uuid in self.data.get('children'):
+                self.__index(library.load(item_uuid))
+        return self.__children
+
+    def __index(self, item:PBXObject):
+        self.__children.append(item)
+        self.__uuids.add(item.uuid)
+        if isinstance(item, PBXGroup) and item.name not in self.__groups: self.__groups[item.name] = item
+
+    def __contains__(self, item:PBXObject)->bool:
+        self.children # build the index
+        return item.uuid in self.__uuids
 
     def note(self)->str:
         name = self.path if self.path else self.name
         return '/* {} */'.format(self.trim(name)) if name else ''
 
     def sync(self, file): # type: (PBXFileReference)->()
-        components = self.trim(file.path).split('/')
+        file_path = self.trim(file.path)
+        position = file_path.rfind('/')
         parent = self
-        while len(components) > 1:
-            node = parent.fdir(components[0])
-            del components[0]
-            parent = node
-        if file not in self.children:
+        if position > 0:
+            groups = self.project.get_group_library()
+            group_key = '{}:{}'.format(self.uuid, file_path[:position])
+            parent = groups.get(group_key)
+            if parent is None:
+                parent = self
+                for name in file_path[:position].split('/'): parent = parent.fdir(name)
+                groups[group_key] = parent
+        if file not in parent:
             parent.append(file)
 
     def fdir(self, name:str):
-        for item in self.children:
-            if isinstance(item, PBXGroup):
-                if item.name == name: return item
-        item = PBXGroup.create(self.project, name)
+        self.children # build the index
+        item = self.__groups.get(name)
+        if item: return item
+        item = PBXGroup.create(self.project, name, parent=self.uuid)
         self.append(item)
         return item
 
     def append(self, item:PBXObject):
-        children = self.data.get('children') # type:list[str]
-        if item.uuid not in children:
-            self.children.append(item)
-            children.append(item.uuid)
+        if item not in self:
+            self.__index(item)
+            self.data.get('children').append(item.uuid)
+            self.project.update_pbx_object(self.uuid)
+
+    def unlink(self, uuid:str):
+        super(PBXGroup, self).unlink(uuid)
+        if self.__children:
+            self.__children = [x for x in self.__children if x.uuid != uuid]
+            self.__uuids.discard(uuid)
+            self.__groups = {}
+            for item in reversed(self.__children):
+                if isinstance(item, PBXGroup): self.__groups[item.name] = item
 
     @staticmethod
-    def create(project:XcodeProject, path:str, source_tree:str = '\"<group>\"'):
-        group = PBXGroup(project).attach()
+    def create(project:XcodeProject, path:str, source_tree:str = '\"<group>\"', parent:str = None):
+        group = PBXGroup(project).attach(seed='{}/{}'.format(parent if parent else project.get_pbx_root(), path))
         group.data.update({'name':path, 'sourceTree':source_tree, 'children':[]})
         group.fill()
         return group
 
 class PBXVariantGroup(PBXObject):
+    __slots__ = ('__children', 'name', 'path', 'sourceTree')
+
     def __init__(self, project:XcodeProject):
         super(PBXVariantGroup, self).__init__(project)
-        self.children = [] # type:list[PBXObject]
+        self.__children = [] # type:list[PBXObject]
         self.name = None # type:str
+        self.path = None # type:str
         self.sourceTree = None # type:str
 
     def note(self)->str:
@@ -528,16 +1390,24 @@ class PBXVariantGroup(PBXObject):
     def load(self, uuid:str):
         super(PBXVariantGroup, self).load(uuid)
         self.name = self.data.get('name') # type:str
+        self.path = self.data.get('path') # type:str
         self.sourceTree = self.data.get('sourceTree') # type:str
-        self.children = []
-        for item_uuid in self.data.get('children'):
-            data = self.project.get_pbx_object(item_uuid) # type:dict
-            item = globals().get(data.get('isa'))(self.project) # type: PBXObject
-            # print(item, item_uuid)
-            item.load(item_uuid)
-            self.children.append(item)
+        self.__children = None # resolved on first access
+
+    @property
+    def children(self)->List[PBXObject]:
+        if self.__children is None:
+            library = self.project.get_pbx_library()
+            self.__children = [library.load(item_uuid) for item_uuid in self.data.get('children')]
+        return self.__children
+
+    def unlink(self, uuid:str):
+        super(PBXVariantGroup, self).unlink(uuid)
+        if self.__children: self.__children = [x for x in self.__children if x.uuid != uuid]
 
 class PBXFileReference(PBXObject):
+    __slots__ = ('lastKnownFileType', 'name', 'path', 'sourceTree')
+
     def __init__(self, project:XcodeProject):
         super(PBXFileReference, self).__init__(project)
         self.lastKnownFileType = None # type:str
@@ -556,57 +1426,73 @@ class PBXFileReference(PBXObject):
     def note(self)->str:
         return '/* {} */'.format(self.trim(self.name if self.name else self.path))
 
+    known_types = {
+        'h'  : ('sourcecode.c.h', 'SOURCE_ROOT'),
+        'm'  : ('sourcecode.c.objc', 'SOURCE_ROOT'),
+        'a'  : ('archive.ar', 'SOURCE_ROOT'),
+        'mm' : ('sourcecode.cpp.objcpp', 'SOURCE_ROOT'),
+        'cpp': ('sourcecode.cpp.cpp', 'SOURCE_ROOT'),
+        'xib': ('file.xib', 'SOURCE_ROOT'),
+        'entitlements': ('text.plist.entitlements', 'SOURCE_ROOT'),
+        'tbd': ('sourcecode.text-based-dylib-definition', 'SDKROOT', 'usr/lib/'),
+        'framework': ('wrapper.framework', 'SDKROOT', 'System/Library/Frameworks'),
+        'dylib': ('compiled.mach-o.dylib', 'SDKROOT', 'usr/lib'),
+        'bundle': ('wrapper.plug-in', 'SOURCE_ROOT'),
+        'png': ('image.png', 'SOURCE_ROOT'),
+        'xcassets': ('folder.assetcatalog', 'SOURCE_ROOT'),
+        'xcconfig': ('text.xcconfig', 'SOURCE_ROOT')
+    }
+
+    @staticmethod
+    def classify(file_path:str)->Optional[str]:
+        meta = PBXFileReference.known_types.get(os.path.basename(file_path).split('.')[-1])
+        if meta: return meta[0]
+        return 'folder' if os.path.isdir(file_path) else None
+
+    @staticmethod
+    def locate(file_path:str)->str:
+        # path field of the reference create() makes for file_path, system libraries live in SDKROOT
+        file_name = os.path.basename(file_path)
+        extension = file_name.split('.')[-1]
+        meta = PBXFileReference.known_types.get(extension)
+        if not meta: return file_path # folder
+        if '+' in file_name: file_name, file_path = '"{}"'.format(file_name), '"{}"'.format(file_path)
+        if extension in ('framework', 'tbd', 'dylib') and not os.path.dirname(file_path): return '{}/{}'.format(meta[2], file_name)
+        return file_path
+
     @staticmethod
-    def create(project, file_path): # type: (XcodeProject, str)->PBXFileReference
+    def create(project, file_path, file_type:str = None): # type: (XcodeProject, str, str)->PBXFileReference
         file_name = os.path.basename(file_path)
         base_path = os.path.dirname(file_path)
-        known_types = {
-            'h'  : ('sourcecode.c.h', 'SOURCE_ROOT'),
-            'm'  : ('sourcecode.c.objc', 'SOURCE_ROOT'),
-            'a'  : ('archive.ar', 'SOURCE_ROOT'),
-            'mm' : ('sourcecode.cpp.objcpp', 'SOURCE_ROOT'),
-            'cpp': ('sourcecode.cpp.cpp', 'SOURCE_ROOT'),
-            'xib': ('file.xib', 'SOURCE_ROOT'),
-            'entitlements': ('text.plist.entitlements', 'SOURCE_ROOT'),
-            'tbd': ('sourcecode.text-based-dylib-definition', 'SDKROOT', 'usr/lib/'),
-            'framework': ('wrapper.framework', 'SDKROOT', 'System/Library/Frameworks'),
-            'dylib': ('compiled.mach-o.dylib', 'SDKROOT', 'usr/lib'),
-            'bundle': ('wrapper.plug-in', 'SOURCE_ROOT'),
-            'png': ('image.png', 'SOURCE_ROOT'),
-            'xcassets': ('folder.assetcatalog', 'SOURCE_ROOT')
-        }
+        known_types = PBXFileReference.known_types
         extension = file_name.split('.')[-1] # type:str
         if extension not in known_types:
-            if os.path.isdir(file_path):
-                folder = PBXFileReference(project).attach()
+            if file_type == 'folder' or (not file_type and os.path.isdir(file_path)):
+                if project.has_ref_file(file_path): return project.get_ref_file(file_path)
+                folder = PBXFileReference(project).attach(seed=file_path)
                 folder.data.update({'lastKnownFileType':'folder', 'sourceTree':'SOURCE_ROOT', 'path':file_path})
-                project.add_ref_file(folder)
                 folder.fill()
+                project.add_ref_file(folder)
                 return folder
             raise NotImplementedError('not supported file {!r}'.format(file_path))
         ref = PBXFileReference(project)
         data = ref.data = {}
-        if '+' in file_name:
-            file_name = '"{}"'.format(file_name)
-            file_path = '"{}"'.format(file_path)
-        data.update({'name': file_name, 'path': file_path})
+        data.update({'name': '"{}"'.format(file_name) if '+' in file_name else file_name, 'path': PBXFileReference.locate(file_path)})
         meta = known_types.get(extension)
         data['lastKnownFileType'] = meta[0]
         data['sourceTree'] = meta[1]
-        if extension in ('framework', 'tbd', 'dylib'):
-            if not base_path: # system libraries
-                data['path'] = '{}/{}'.format(meta[2], file_name)
-            else:
-                data['sourceTree'] = 'SOURCE_ROOT'
+        if extension in ('framework', 'tbd', 'dylib') and base_path: data['sourceTree'] = 'SOURCE_ROOT'
         ref.fill()
         if project.has_ref_file(ref.path):
             return project.get_ref_file(ref.path)
         else:
-            ref.attach()
+            ref.attach(seed=ref.path)
             project.add_ref_file(ref)
         return ref
 
 class PBXBuildPhase(PBXObject):
+    __slots__ = ('name', 'runOnlyForDeploymentPostprocessing')
+
     def __init__(self, project:XcodeProject):
         super(PBXBuildPhase, self).__init__(project)
         self.name = None # type: str
@@ -625,30 +1511,55 @@ class PBXBuildPhase(PBXObject):
         self.runOnlyForDeploymentPostprocessing = self.data.get('runOnlyForDeploymentPostprocessing') # type: str
 
 class PBXSourcesBuildPhase(PBXBuildPhase):
+    __slots__ = ('__files', '__refs')
+
     def __init__(self, project:XcodeProject):
         super(PBXSourcesBuildPhase, self).__init__(project)
-        self.files: list[PBXBuildFile] = []
+        self.__files: list[PBXBuildFile] = []
+        self.__refs: set[str] = set() # fileRef uuids
 
     def load(self, uuid:str):
         super(PBXSourcesBuildPhase, self).load(uuid)
-        self.files = []
-        for file_uuid in self.data.get('files'):
-            file_item = PBXBuildFile(self.project)
-            file_item.load(file_uuid)
-            file_item.phase = self
-            self.files.append(file_item)
+        self.__files = None # resolved on first access
+
+    @property
+    def files(self)->List[PBXBuildFile]:
+        if self.__files is None:
+            self.__files, self.__refs = [], set()
+            library = self.project.get_pbx_library()
+            for file_uuid in self.data.get('files'):
+                file_item = library.load(file_uuid)
+                if isinstance(file_item, PBXBuildFile):
+                    file_item.phase = self
+                    self.__refs.add(file_item.data.get('fileRef'))
+                self.__files.append(file_item)
+        return self.__files
+
+    def contains(self, file_uuid:str)->bool:
+        self.files # build the fileRef index
+        return file_uuid in self.__refs
 
     def append(self, item:PBXBuildFile):
-        for f in self.files:
-            if f.fileRef.uuid == item.fileRef.uuid:
-                item.detach()
-                return
+        self.files # build the fileRef index
+        if item.fileRef.uuid in self.__refs:
+            item.detach()
+            return
         files = self.data.get('files') # type:list[str]
-        self.files.append(item)
+        self.__files.append(item)
+        self.__refs.add(item.fileRef.uuid)
         files.append(item.uuid)
         item.phase = self
+        self.project.update_pbx_object(self.uuid)
+
+    def unlink(self, uuid:str):
+        super(PBXSourcesBuildPhase, self).unlink(uuid)
+        if self.__files:
+            self.__files = [x for x in self.__files if x.uuid != uuid]
+            self.__refs = {x.data.get('fileRef') for x in self.__files if isinstance(x, PBXBuildFile)}
 
 class PBXResourcesBuildPhase(PBXSourcesBuildPhase):
+    __slots__ = ()
+
     def __init__(self, project:XcodeProject):
         super(PBXResourcesBuildPhase, self).__init__(project)
 
@@ -656,6 +1567,8 @@ class PBXResourcesBuildPhase(PBXSourcesBuildPhase):
         super(PBXResourcesBuildPhase, self).load(uuid)
 
 class PBXShellScriptBuildPhase(PBXBuildPhase):
+    __slots__ = ('shellPath', 'shellScript')
+
     def __init__(self, project:XcodeProject):
         super(PBXShellScriptBuildPhase, self).__init__(project)
         self.shellPath = '/usr/bin/sh'
@@ -669,6 +1582,8 @@ class PBXShellScriptBuildPhase(PBXBuildPhase):
 
 
 class PBXCopyFilesBuildPhase(PBXSourcesBuildPhase):
+    __slots__ = ('dstPath', 'dstSubfolderSpec')
+
     def __init__(self, project:XcodeProject):
         super(PBXCopyFilesBuildPhase, self).__init__(project)
         self.dstPath = '\"\"'
@@ -681,13 +1596,15 @@ class PBXCopyFilesBuildPhase(PBXSourcesBuildPhase):
 
     @staticmethod
     def create(project:XcodeProject, name:str = None):
-        phase = PBXCopyFilesBuildPhase(project).attach()
+        phase = PBXCopyFilesBuildPhase(project).attach(seed=name)
         phase.data.update({'buildActionMask':'2147483647', 'dstPath':'\"\"', 'dstSubfolderSpec':'10', 'files':[], 'runOnlyForDeploymentPostprocessing':'0'})
         if name: phase.data['name'] = name
         phase.load(phase.uuid)
         return phase
 
 class PBXFrameworksBuildPhase(PBXSourcesBuildPhase):
+    __slots__ = ()
+
     def __init__(self, project:XcodeProject):
         super(PBXFrameworksBuildPhase, self).__init__(project)
 
@@ -695,12 +1612,15 @@ class PBXFrameworksBuildPhase(PBXSourcesBuildPhase):
         super(PBXFrameworksBuildPhase, self).load(uuid)
 
 class PBXNativeTarget(PBXObject):
+    __slots__ = ('buildConfigurationList', 'buildPhases', 'productName', 'name', '__phases')
+
     def __init__(self, project:XcodeProject):
         super(PBXNativeTarget, self).__init__(project)
         self.buildConfigurationList = XCConfigurationList(self.project)
         self.buildPhases: list[PBXBuildPhase] = []
         self.productName: str = None
         self.name:str = None
+        self.__phases: dict[str, PBXBuildPhase] = None # isa => first phase of that kind
 
     def note(self)->str:
         return '/* {} */'.format(self.trim(self.name))
@@ -709,22 +1629,69 @@ class PBXNativeTarget(PBXObject):
         super(PBXNativeTarget, self).load(uuid)
         self.buildConfigurationList.load(self.data.get('buildConfigurationList'))
         self.buildConfigurationList.target = self
-        self.buildPhases = []
-        for phase_uuid in self.data.get('buildPhases'):
-            phase_name = self.project.get_pbx_object(phase_uuid).get('isa')
-            phase_item = globals().get(phase_name)(self.project) # type: PBXObject
-            phase_item.load(phase_uuid)
-            self.buildPhases.append(phase_item)
+        library = self.project.get_pbx_library()
+        self.buildPhases = [library.load(phase_uuid) for phase_uuid in self.data.get('buildPhases')]
         self.name = self.data.get('name') # type: str
         self.productName = self.data.get('productName') # type: str
+        self.__phases = None
+
+    def get_phase(self, isa:str, dst:str = None)->Optional[PBXBuildPhase]:
+        # dst picks copy phases by dstSubfolderSpec, e.g. 10 for Frameworks and 13 for PlugIns
+        if self.__phases is None:
+            self.__phases = {}
+            for phase in self.buildPhases: self.__index_phase(phase)
+        return self.__phases.get((isa, str(dst)) if dst is not None else isa)
+
+    def __index_phase(self, phase:PBXBuildPhase):
+        self.__phases.setdefault(phase.isa, phase)
+        spec = phase.data.get('dstSubfolderSpec')
+        if spec is not None: self.__phases.setdefault((phase.isa, str(spec)), phase)
+
+    def __ensure_phase(self, phase_type:type)->PBXSourcesBuildPhase:
+        phase = self.get_phase(phase_type.__name__)
+        if not phase: # e.g. test targets without resources
+            phase = phase_type(self.project).attach(seed='{}/{}'.format(self.uuid, phase_type.__name__))
+            phase.data.update({'buildActionMask':'2147483647', 'files':[], 'runOnlyForDeploymentPostprocessing':'0'})
+            phase.load(phase.uuid)
+            self.append_build_phase(phase)
+        return phase
+
+    @property
+    def sources_phase(self)->PBXSourcesBuildPhase:
+        return self.__ensure_phase(PBXSourcesBuildPhase)
+
+    @property
+    def resources_phase(self)->PBXResourcesBuildPhase:
+        return self.__ensure_phase(PBXResourcesBuildPhase)
+
+    @property
+    def frameworks_phase_build(self)->PBXFrameworksBuildPhase:
+        return self.__ensure_phase(PBXFrameworksBuildPhase)
+
+    @property
+    def frameworks_phase_embed(self)->PBXCopyFilesBuildPhase:
+        phase = self.get_phase(PBXCopyFilesBuildPhase.__name__, dst=10) # type: PBXCopyFilesBuildPhase
+        if not phase: # other copy phases embed elsewhere, e.g. app extensions into PlugIns
+            phase = PBXCopyFilesBuildPhase.create(self.project, '"Embeded Frameworks"')
+            self.append_build_phase(phase)
+        return phase
 
     def append_build_phase(self, phase:PBXBuildPhase):
         phase_list = self.data.get('buildPhases') # type:list[str]
         if phase.uuid not in phase_list:
             phase_list.append(phase.uuid)
             self.buildPhases.append(phase)
+            if self.__phases is not None: self.__index_phase(phase)
+            self.project.update_pbx_object(self.uuid)
+
+    def unlink(self, uuid:str):
+        super(PBXNativeTarget, self).unlink(uuid)
+        self.buildPhases = [x for x in self.buildPhases if x.uuid != uuid]
+        self.__phases = None
 
 class XCConfigurationList(PBXObject):
+    __slots__ = ('buildConfigurations', 'target')
+
     def __init__(self, project:XcodeProject):
         super(XCConfigurationList, self).__init__(project)
         self.buildConfigurations: list[XCBuildConfiguration] = []
@@ -748,6 +1715,8 @@ class XCConfigurationList(PBXObject):
             self.buildConfigurations.append(config_item)
 
 class XCBuildConfiguration(PBXObject):
+    __slots__ = ()
+
     def __init__(self, project:XcodeProject):
         super(XCBuildConfiguration, self).__init__(project)
 
@@ -764,124 +1733,395 @@ class XCBuildConfiguration(PBXObject):
     def load(self, uuid:str):
         super(XCBuildConfiguration, self).load(uuid)
 
+class PBXSettingsView(object):
+    def __init__(self, project): # type: (PBXProject)->None
+        self.project = project
+        self.__table: dict[tuple[str, str], XCBuildConfiguration] = {} # (target, config) => configuration
+        self.__keys: dict[str, set[tuple[str, str]]] = {} # setting name => (target, config) that define it
+        self.__uuids: set[str] = {project.uuid} # objects the view is built from
+        self.__updating = False
+        for target in project.targets:
+            self.__uuids.update((target.uuid, target.buildConfigurationList.uuid))
+            for config in target.buildConfigurationList.buildConfigurations:
+                row = (project.trim(target.name), project.trim(config.name))
+                self.__table[row] = config
+                self.__uuids.add(config.uuid)
+                for name in config.buildSettings: self.__keys.setdefault(name, set()).add(row)
+
+    def covers(self, uuid:str)->bool:
+        # changed outside of update(), the view has to be built again
+        return not self.__updating and uuid in self.__uuids
+
+    def __select(self, target:any, config:str, where = None)->List[Tuple[Tuple[str, str], XCBuildConfiguration]]:
+        target_names = {self.project.trim(x.name) for x in self.project.select_targets(target)}
+        result = []
+        for row, item in self.__table.items():
+            if row[0] not in target_names: continue
+            if config != '*' and not fnmatch.fnmatchcase(row[1], config): continue
+            if where and not where(row[0], row[1], item.buildSettings): continue
+            result.append((row, item))
+        return result
+
+    def query(self, key:str = '*', target:any = '*', config:str = '*', where = None)->Dict[Tuple[str, str, str], any]:
+        rows = self.__select(target, config, where)
+        result: dict[tuple[str, str, str], any] = {}
+        if '*' in key or '?' in key:
+            names = [x for x in self.__keys if fnmatch.fnmatchcase(x, key)]
+        else:
+            names = [key] if key in self.__keys else []
+        for name in sorted(names):
+            defined = self.__keys[name]
+            for row, item in rows:
+                if row in defined: result[(row[0], row[1], name)] = item.buildSettings.get(name)
+        return result
+
+    def update(self, mapping:Dict[str, any], target:any = '*', config:str = '*', where = None, merge:bool = False, promote:bool = False)->int:
+        # None deletes the setting, merge appends to list values instead of replacing them, promote turns scalars into lists first
+        count = 0
+        self.__updating = True
+        try:
+            count = self.__update(mapping, target, config, where, merge, promote)
+        finally:
+            self.__updating = False
+        return count
+
+    def __update(self, mapping:Dict[str, any], target:any, config:str, where, merge:bool, promote:bool)->int:
+        count = 0
+        for row, item in self.__select(target, config, where):
+            settings = item.buildSettings
+            changed = False # untouched rows keep the pbxproj and its mtime as they are
+            for name, value in mapping.items():
+                if value is None:
+                    if settings.pop(name, None) is not None:
+                        self.__keys.get(name, set()).discard(row)
+                        changed = True
+                    continue
+                current = settings.get(name)
+                if merge and promote and current and isinstance(current, str):
+                    current = settings[name] = PBXSettingArray([current])
+                    changed = True
+                if merge and isinstance(current, list):
+                    if not isinstance(current, PBXSettingArray):
+                        current = settings[name] = PBXSettingArray(current)
+                    size = len(current)
+                    if isinstance(value, list):
+                        current.extend(value)
+                    else:
+                        current.append(value)
+                    changed = changed or len(current) != size
+                elif current != value:
+                    settings[name] = PBXSettingArray(value) if isinstance(value, list) else value
+                    changed = True
+                self.__keys.setdefault(name, set()).add(row)
+            if changed: self.project.project.update_pbx_object(item.uuid)
+            count += 1
+        return count
+
+    def diff(self, left:str, right:str, target:any = '*', key:str = '*')->Dict[str, Dict[str, Tuple[any, any]]]:
+        result: dict[str, dict[str, tuple[any, any]]] = {}
+        for target_item in self.project.select_targets(target):
+            target_name = self.project.trim(target_item.name)
+            a, b = self.__table.get((target_name, left)), self.__table.get((target_name, right))
+            if not a or not b: continue
+            a, b = a.buildSettings, b.buildSettings
+            changes: dict[str, tuple[any, any]] = {}
+            for name in a.keys() | b.keys():
+                if key != '*' and not fnmatch.fnmatchcase(name, key): continue
+                if a.get(name) != b.get(name): changes[name] = (a.get(name), b.get(name))
+            if changes: result[target_name] = dict(sorted(changes.items()))
+        return result
+
+class PBXPathEntry(object):
+    __slots__ = ('uuid', 'path', 'groups', 'build_files', 'phases')
+
+    def __init__(self, uuid:str, path:str, groups:List[str]):
+        self.uuid = uuid
+        self.path = path # normalised, relative to xcode project dir unless outside source tree
+        self.groups = groups # group uuids from mainGroup down to direct parent
+        self.build_files: list[str] = []
+        self.phases: list[tuple[str, str, str]] = [] # (target name, phase name, phase uuid)
+
+    def in_phase(self, phase:str, target:str = None)->bool:
+        for target_name, phase_name, _ in self.phases:
+            if target and not fnmatch.fnmatchcase(target_name, target): continue
+            if fnmatch.fnmatchcase(phase_name, phase): return True
+        return False
+
+    def to_dict(self)->Dict[str, any]:
+        return {'uuid': self.uuid, 'path': self.path, 'groups': self.groups, 'build_files': self.build_files,
+                'phases': [{'target': x[0], 'phase': x[1], 'uuid': x[2]} for x in self.phases]}
+
+class PBXPathIndex(object):
+    def __init__(self, project:XcodeProject):
+        self.project = project
+        self.__entries: dict[str, PBXPathEntry] = {} # normalised path => entry
+        self.__paths: list[str] = [] # sorted keys for prefix lookup
+        self.__build()
+
+    @staticmethod
+    def trim(value:str)->str:
+        return re.sub(r'[\'"]', '', value) if value else ''
+
+    @staticmethod
+    def normalize(path:str)->str:
+        path = os.path.normpath(path).replace(os.sep, '/')
+        return '' if path == '.' else path
+
+    def __locate(self, parent:Optional[str], data:Dict[str, any])->Optional[str]:
+        path, source_tree = self.trim(data.get('path')), self.trim(data.get('sourceTree'))
+        if source_tree == '<group>':
+            if parent is None: return None
+            return self.normalize(os.path.join(parent, path)) if path else parent
+        if source_tree in ('SOURCE_ROOT', '<absolute>'): return self.normalize(path)
+        return '$({})/{}'.format(source_tree, path) if path else None # SDKROOT, BUILT_PRODUCTS_DIR, ...
+
+    def __build(self):
+        get = self.project.get_pbx_object
+        root = get(self.project.get_pbx_root())
+        if not root: return
+        containers: dict[str, list[str]] = {} # file ref or variant group => ref uuids indexed under it
+        stack: list[tuple[str, str, list[str]]] = [(root.get('mainGroup'), '', [])]
+        while stack:
+            uuid, parent, chain = stack.pop()
+            data = get(uuid)
+            if not data: continue
+            isa = data.get('isa')
+            location = self.__locate(parent, data)
+            if isa in (PBXGroup.__name__, PBXVariantGroup.__name__):
+                groups = chain + [uuid]
+                for child in reversed(data.get('children', [])): stack.append((child, location, groups))
+                if isa == PBXVariantGroup.__name__: containers[uuid] = []
+            elif isa == PBXFileReference.__name__:
+                path = location if location is not None else self.trim(data.get('path'))
+                self.__entries.setdefault(path, PBXPathEntry(uuid, path, chain))
+                containers.setdefault(uuid, []).append(path)
+                if chain and chain[-1] in containers: containers[chain[-1]].append(path) # localized files build via their variant group
+        for target_uuid in root.get('targets', []):
+            target = get(target_uuid)
+            if not target: continue
+            target_name = self.trim(target.get('name'))
+            for phase_uuid in target.get('buildPhases', []):
+                phase = get(phase_uuid)
+                if not phase: continue
+                phase_name = self.trim(phase.get('name')) if phase.get('name') else phase.get('isa')[3:-len('BuildPhase')]
+                for file_uuid in phase.get('files', []):
+                    file_data = get(file_uuid)
+                    if not file_data: continue
+                    for path in containers.get(file_data.get('fileRef'), ()):
+                        entry = self.__entries[path]
+                        if file_uuid not in entry.build_files: entry.build_files.append(file_uuid)
+                        entry.phases.append((target_name, phase_name, phase_uuid))
+        self.__paths = sorted(self.__entries)
+
+    def __len__(self): return len(self.__entries)
+
+    def find(self, path:str)->Optional[PBXPathEntry]:
+        return self.__entries.get(self.normalize(path))
+
+    def prefix(self, prefix:str)->List[PBXPathEntry]:
+        start = bisect.bisect_left(self.__paths, prefix)
+        end = bisect.bisect_left(self.__paths, prefix + '\U0010ffff')
+        return [self.__entries[x] for x in self.__paths[start:end]]
+
+    def glob(self, pattern:str)->List[PBXPathEntry]:
+        if pattern.startswith('./'): pattern = pattern[2:]
+        match = re.search(r'[*?\[]', pattern)
+        if not match: # plain path: the reference itself and everything below it
+            path = self.normalize(pattern)
+            if not path: return [self.__entries[x] for x in self.__paths]
+            result = self.prefix(path + '/')
+            if path in self.__entries: result.insert(0, self.__entries[path])
+            return result
+        matcher = re.compile(fnmatch.translate(pattern))
+        return [x for x in self.prefix(pattern[:match.start()]) if matcher.match(x.path)]
+
+    def query(self, pattern:str = '*', phase:str = None, missing_phase:str = None, target:str = None)->List[PBXPathEntry]:
+        result: list[PBXPathEntry] = []
+        for entry in self.glob(pattern):
+            if phase and not entry.in_phase(phase, target): continue
+            if missing_phase and entry.in_phase(missing_phase, target): continue
+            result.append(entry)
+        return result
+
 class FlagsType(enum.Enum):
     compiler, link, cplus = range(3)
 
 class PBXProject(PBXObject):
+    __slots__ = ('targets', 'buildConfigurationList', 'mainGroup', '__target_library', '__settings', '__build_files_loaded')
+
     def __init__(self, project:XcodeProject):
         super(PBXProject, self).__init__(project)
         self.targets: list[PBXNativeTarget] = []
         self.buildConfigurationList = XCConfigurationList(self.project)
         self.mainGroup = PBXGroup(self.project)
-
-        self.frameworks_phase_build: PBXFrameworksBuildPhase = None
-        self.frameworks_phase_embed: PBXCopyFilesBuildPhase = None
-        self.resources_phase: PBXResourcesBuildPhase = None
-        self.sources_phase: PBXSourcesBuildPhase = None
+        self.__target_library: dict[str, PBXNativeTarget] = {} # name => target
+        self.__settings: PBXSettingsView = None
+        self.__build_files_loaded = False
 
     def load(self, uuid:str):
         super(PBXProject, self).load(uuid)
         self.targets = []
+        self.__target_library = {}
+        self.__settings = None
+        self.__build_files_loaded = False
         self.buildConfigurationList.load(self.data.get('buildConfigurationList'))
         for target_uuid in self.data.get('targets'): # type: str
             target_item = PBXNativeTarget(self.project)
             target_item.load(target_uuid)
             self.targets.append(target_item)
-        self.mainGroup.load(self.data.get('mainGroup'))
-        target = self.targets[0]
-        for phase in target.buildPhases:
-            if phase.isa == PBXFrameworksBuildPhase.__name__:
-                if not self.frameworks_phase_build: self.frameworks_phase_build = phase
-            elif phase.isa == PBXCopyFilesBuildPhase.__name__:
-                if not self.frameworks_phase_embed: self.frameworks_phase_embed = phase
-                phase.dstSubfolderSpec = 10 # force to Frameworks
-            elif phase.isa == PBXResourcesBuildPhase.__name__:
-                if not self.resources_phase: self.resources_phase = phase
-            elif phase.isa == PBXSourcesBuildPhase.__name__:
-                if not self.sources_phase: self.sources_phase = phase
-        if not self.frameworks_phase_embed:
-            self.frameworks_phase_embed = PBXCopyFilesBuildPhase.create(self.project, '"Embeded Frameworks"')
-            self.targets[0].append_build_phase(self.frameworks_phase_embed)
-        assert self.frameworks_phase_embed
-        assert self.frameworks_phase_build
-        assert self.resources_phase
-        assert self.sources_phase
-
-    def add_build_setting(self, field_name:str, field_value:any, config_name:str = None):
-        target = self.targets[0]
-        for config in target.buildConfigurationList.buildConfigurations:
-            if not config_name or config.name == config_name:
-                if field_name not in config.buildSettings: config.buildSettings[field_name] = {}
-                value = config.buildSettings[field_name]
-                if isinstance(value, list):
-                    value.append(field_value)
-                    self.__unique_array(value)
-                else:
-                    config.buildSettings[field_name] = field_value
+            self.__target_library.setdefault(self.trim(target_item.name), target_item)
+        self.mainGroup.load(self.data.get('mainGroup')) # children are resolved on demand
 
-    def embed_framework(self, framework_path:str):
-        file = PBXBuildFile.create(self.project, framework_path)
-        file.add_attributes()
-        self.frameworks_phase_embed.append(file)
+    # phases of the main target, missing ones are created when first used
+    @property
+    def frameworks_phase_build(self)->PBXFrameworksBuildPhase: return self.targets[0].frameworks_phase_build
 
-    def add_framework(self, framework_path:str, need_sync = True):
-        file = PBXBuildFile.create(self.project, framework_path)
-        self.frameworks_phase_build.append(file)
-        if need_sync:
-            self.mainGroup.sync(file.fileRef)
+    @property
+    def frameworks_phase_embed(self)->PBXCopyFilesBuildPhase: return self.targets[0].frameworks_phase_embed
+
+    @property
+    def resources_phase(self)->PBXResourcesBuildPhase: return self.targets[0].resources_phase
 
-    def add_library(self, library_path:str):
-        self.add_framework(library_path)
+    @property
+    def sources_phase(self)->PBXSourcesBuildPhase: return self.targets[0].sources_phase
+
+    def load_build_files(self):
+        if self.__build_files_loaded: return # build files left without phase stay so
+        self.__build_files_loaded = True
+        for target in self.targets:
+            for phase in target.buildPhases:
+                if isinstance(phase, PBXSourcesBuildPhase): phase.files
+
+    def get_target(self, name:str)->Optional[PBXNativeTarget]:
+        return self.__target_library.get(self.trim(name))
+
+    def select_targets(self, target:any = None)->List[PBXNativeTarget]:
+        # None => main target, '*' or 'Unity*' => name pattern, list => union of selectors
+        if not target: return self.targets[:1]
+        if isinstance(target, (list, tuple)):
+            result: list[PBXNativeTarget] = []
+            for selector in target:
+                for item in self.select_targets(selector):
+                    if item not in result: result.append(item)
+            return result
+        item = self.get_target(target)
+        if item: return [item]
+        if '*' in target or '?' in target:
+            return [x for x in self.targets if fnmatch.fnmatchcase(self.trim(x.name), target)]
+        raise KeyError('target[={}] not found in project'.format(target))
 
-    def add_entitlements(self, file_path, need_sync = True):
-        self.add_build_setting('CODE_SIGN_ENTITLEMENTS', '$PROJECT_DIR/{}'.format(file_path))
+    @property
+    def settings(self)->PBXSettingsView:
+        if self.__settings is None: self.__settings = PBXSettingsView(self)
+        return self.__settings
+
+    def add_build_settings(self, settings:Dict[str, any], config_name:str = None, target:any = None):
+        if settings: self.settings.update(settings, target=target, config=config_name if config_name else '*', merge=True)
+
+    def invalidate(self, uuid:str):
+        if self.__settings is not None and self.__settings.covers(uuid): self.__settings = None
+
+    def add_build_setting(self, field_name:str, field_value:any, config_name:str = None, target:any = None):
+        self.add_build_settings({field_name: field_value}, config_name, target)
+
+    def embed_framework(self, framework_path:str, target:any = None, created:List[str] = None):
+        ref = PBXFileReference.create(self.project, framework_path)
+        for target_item in self.select_targets(target):
+            if target_item.frameworks_phase_embed.contains(ref.uuid): continue
+            file = PBXBuildFile.create(self.project, framework_path, ref)
+            file.add_attributes()
+            target_item.frameworks_phase_embed.append(file)
+            if created is not None: created.append(file.uuid)
+
+    def add_framework(self, framework_path:str, need_sync = True, target:any = None):
+        ref = PBXFileReference.create(self.project, framework_path)
+        for target_item in self.select_targets(target):
+            if target_item.frameworks_phase_build.contains(ref.uuid): continue
+            target_item.frameworks_phase_build.append(PBXBuildFile.create(self.project, framework_path, ref))
+        if need_sync: self.mainGroup.sync(ref)
+
+    def add_library(self, library_path:str, target:any = None):
+        self.add_framework(library_path, target=target)
+
+    def add_entitlements(self, file_path, need_sync = True, target:any = None):
+        self.add_build_setting('CODE_SIGN_ENTITLEMENTS', '$PROJECT_DIR/{}'.format(file_path), target=target)
         if need_sync:
             file = PBXFileReference.create(self.project, file_path)
             self.mainGroup.sync(file)
 
-    def add_asset(self, file_path:str):
-        file_name = os.path.basename(file_path)
-        extension = file_name.split('.')[-1]
-        file = PBXBuildFile.create(self.project, file_path)
-        file_type = file.fileRef.lastKnownFileType
-        if extension in ('a', 'tbd', 'framework', 'dylib'):
-            file.detach()
-            self.add_framework(file_path, need_sync=True)
-        elif extension in ('m', 'mm', 'cpp'):
-            self.sources_phase.append(file)
-            self.mainGroup.sync(file.fileRef)
-        elif extension in ('bundle', 'xib', 'png') or file_type.startswith('folder'):
-            self.resources_phase.append(file)
-            self.mainGroup.sync(file.fileRef)
-        elif extension == 'entitlements':
-            file.detach()
-            self.add_entitlements(file_path, need_sync=False)
-            self.mainGroup.sync(file.fileRef)
-        else:
-            file.detach()
-            self.mainGroup.sync(file.fileRef)
-
-    def __unique_array(self, array:List[any]):
-        unique_list = []  # type: list[any]
-        for item in array:
-            if item not in unique_list: unique_list.append(item)
-        array.clear()
-        array.extend(unique_list)
-
-    def __ensure_array_field(self, field_name:str):
-        target = self.targets[0]
-        for config in target.buildConfigurationList.buildConfigurations:
-            field_value = config.buildSettings.get(field_name)
-            if not field_value:
-                config.buildSettings[field_name] = []
-            elif isinstance(field_value, str):
-                config.buildSettings[field_name] = [field_value]
-            elif isinstance(field_value, list):
-                self.__unique_array(array=field_value)
-            else:
-                raise AttributeError('not expect {}={!r} here'.format(field_name, type(field_value)))
+    def add_asset(self, file_path:str, target:any = None):
+        self.add_assets([file_path], target)
 
-    def add_flags(self, flags:List[str], flags_type:FlagsType = FlagsType.compiler, config_name:str = None):
+    @staticmethod
+    def get_asset_phase(file_path:str, file_type:str)->Optional[str]:
+        extension = os.path.basename(file_path).split('.')[-1]
+        if extension in ('a', 'tbd', 'framework', 'dylib'): return 'frameworks_phase_build'
+        if extension in ('m', 'mm', 'cpp'): return 'sources_phase'
+        if extension in ('bundle', 'xib', 'png') or (file_type and file_type.startswith('folder')): return 'resources_phase'
+        return None
+
+    def add_assets(self, file_paths:List[str], target:any = None, file_types:Dict[str, str] = None, created:Dict[str, List[str]] = None)->Dict[str, int]:
+        # created: file path => uuids of references and build files made here, references already in project are left out
+        targets = self.select_targets(target)
+        counts: dict[str, int] = {}
+        files: dict[str, PBXFileReference] = {}
+        entitlements: str = None
+        locations = [PBXFileReference.locate(x) for x in file_paths]
+        self.project.reserve_uuids(PBXFileReference.__name__, locations)
+        existing = {x for x in locations if self.project.has_ref_file(x)} if created is not None else ()
+        refs = [(x, PBXFileReference.create(self.project, x, file_types.get(x) if file_types else None)) for x in file_paths]
+        self.project.reserve_uuids(PBXBuildFile.__name__, [x.uuid for _, x in refs])
+        for (file_path, file), location in zip(refs, locations):
+            if created is not None and location not in existing: created.setdefault(file_path, []).append(file.uuid)
+            files[self.trim(file.path)] = file
+            phase_name = self.get_asset_phase(file_path, file.lastKnownFileType)
+            if file_path.endswith('.entitlements'):
+                if entitlements:
+                    print('>>> skip {}, CODE_SIGN_ENTITLEMENTS is taken by {}'.format(file_path, entitlements), file=sys.stderr)
+                else:
+                    entitlements = file_path
+            if not phase_name: continue
+            for target_item in targets:
+                phase = getattr(target_item, phase_name) # type: PBXSourcesBuildPhase
+                if phase.contains(file.uuid): continue
+                item = PBXBuildFile.create(self.project, file_path, file)
+                phase.append(item)
+                counts[phase_name] = counts.get(phase_name, 0) + 1
+                if created is not None: created.setdefault(file_path, []).append(item.uuid)
+        if entitlements: self.add_entitlements(entitlements, need_sync=False, target=target)
+        for file_path in sorted(files.keys()): # siblings are synced together
+            self.mainGroup.sync(files[file_path])
+        return counts
+
+    def remove_file(self, file_path:str)->List[str]:
+        # same path resolution as create(), e.g. system frameworks live in SDKROOT
+        file = self.project.get_ref_file(PBXFileReference.locate(file_path))
+        if not file: file = self.project.get_ref_file(file_path)
+        return self.project.remove_pbx_object(file.uuid) if file else []
+
+    def remove_tree(self, prefix:str, owned:set = None)->List[str]:
+        # synced groups mirror the path components, only that subtree is visited; owned limits removal to those file uuids
+        prefix = self.trim(prefix).rstrip('/')
+        removed = self.remove_file(prefix) if owned is None else [] # e.g. folder or bundle reference
+        group = self.mainGroup
+        for name in prefix.split('/'):
+            group = next((x for x in group.children if isinstance(x, PBXGroup) and self.trim(x.name if x.name else x.path) == name), None)
+            if not group: return removed
+        files: list[PBXObject] = []
+        stack, foreign = [group], False
+        while stack:
+            for item in stack.pop().children:
+                if isinstance(item, PBXGroup):
+                    stack.append(item)
+                elif isinstance(item, PBXFileReference) and self.trim(item.path).startswith(prefix + '/') and (owned is None or item.uuid in owned):
+                    files.append(item)
+                else:
+                    foreign = True
+        for item in files: removed.extend(self.project.remove_pbx_object(item.uuid))
+        if not foreign: removed.extend(self.project.remove_pbx_object(group.uuid))
+        return removed
+
+    def add_flags(self, flags:List[str], flags_type:FlagsType = FlagsType.compiler, config_name:str = None, target:any = None):
         if not flags: return
         if flags_type == FlagsType.compiler:
             field_name = 'OTHER_CFLAGS'
@@ -890,50 +2130,136 @@ class PBXProject(PBXObject):
         elif flags_type == FlagsType.cplus:
             field_name = 'OTHER_CPLUSPLUSFLAGS'
         else:raise AttributeError('not expect flags with type')
-        self.__ensure_array_field(field_name)
-        target = self.targets[0]
-        for config in target.buildConfigurationList.buildConfigurations:
-            if not config_name or config.name == config_name:
-                if field_name not in config.buildSettings: config.buildSettings[field_name] = {}
-                field_value = config.buildSettings[field_name] # type: list[str]
-                field_value.extend(flags)
-                self.__unique_array(field_value)
-
-    def add_shell(self, script_path:str, shell:str = '/bin/sh'):
-        phase = PBXShellScriptBuildPhase(self.project)
-        phase.attach()
-        phase.data.update({'buildActionMask':'2147483647','files':[],'inputPaths':[], 'outputPaths':[], 'runOnlyForDeploymentPostprocessing':'0'})
-        phase.data.update({'shellPath':shell, 'shellScript':'''
+        self.settings.update({field_name: list(flags)}, target=target, config=config_name if config_name else '*', merge=True, promote=True)
+
+    def add_shell(self, script_path:str, shell:str = '/bin/sh', target:any = None):
+        for target_item in self.select_targets(target):
+            phase = PBXShellScriptBuildPhase(self.project)
+            phase.attach(seed='{}/{}'.format(target_item.uuid, script_path))
+            phase.data.update({'buildActionMask':'2147483647','files':[],'inputPaths':[], 'outputPaths':[], 'runOnlyForDeploymentPostprocessing':'0'})
+            phase.data.update({'shellPath':shell, 'shellScript':'''
         /bin/chmod +x $PROJECT_DIR/{}
         $PROJECT_DIR/{}\n
         '''.format(script_path, script_path)})
-        self.targets[0].append_build_phase(phase)
+            target_item.append_build_phase(phase)
 
-    def set_manual_codesign(self, development_team:str, provisioning_uuid:str, provisioning_name:str, sign_identity:str = 'iPhone Developer', config_name:str = None):
-        self.add_build_setting('DEVELOPMENT_TEAM', development_team, config_name)
-        self.add_build_setting('CODE_SIGN_IDENTITY', sign_identity, config_name)
-        self.add_build_setting('PROVISIONING_PROFILE', provisioning_uuid, config_name)
-        self.add_build_setting('PROVISIONING_PROFILE_SPECIFIER', provisioning_name, config_name)
-        self.add_build_setting('CODE_SIGN_STYLE', 'Manual', config_name)
+    def set_manual_codesign(self, development_team:str, provisioning_uuid:str, provisioning_name:str, sign_identity:str = 'iPhone Developer', config_name:str = None, target:any = None):
+        self.add_build_setting('DEVELOPMENT_TEAM', development_team, config_name, target)
+        self.add_build_setting('CODE_SIGN_IDENTITY', sign_identity, config_name, target)
+        self.add_build_setting('PROVISIONING_PROFILE', provisioning_uuid, config_name, target)
+        self.add_build_setting('PROVISIONING_PROFILE_SPECIFIER', provisioning_name, config_name, target)
+        self.add_build_setting('CODE_SIGN_STYLE', 'Manual', config_name, target)
 
-    def set_automatic_codesign(self, development_team:str, sign_identity:str = 'iPhone Developer', config_name:str = None):
-        self.add_build_setting('CODE_SIGN_STYLE', 'Automatic', config_name)
-        self.add_build_setting('DEVELOPMENT_TEAM', development_team, config_name)
-        self.add_build_setting('CODE_SIGN_IDENTITY', sign_identity, config_name)
+    def set_automatic_codesign(self, development_team:str, sign_identity:str = 'iPhone Developer', config_name:str = None, target:any = None):
+        self.add_build_setting('CODE_SIGN_STYLE', 'Automatic', config_name, target)
+        self.add_build_setting('DEVELOPMENT_TEAM', development_team, config_name, target)
+        self.add_build_setting('CODE_SIGN_IDENTITY', sign_identity, config_name, target)
 
-    def set_package_name(self, name:str):
-        self.add_build_setting('PRODUCT_NAME', name)
+    def set_package_name(self, name:str, target:any = None):
+        self.add_build_setting('PRODUCT_NAME', name, target=target)
 
-    def get_info_plist(self)->str:
-        config = self.targets[0].buildConfigurationList.buildConfigurations[0]
+    def get_info_plist(self, target:any = None)->str:
+        config = self.select_targets(target)[0].buildConfigurationList.buildConfigurations[0]
         return config.buildSettings.get('INFOPLIST_FILE')
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'diff':
+        arguments = argparse.ArgumentParser(prog='xcmod.py diff', description='compare objects of two pbxproj files by uuid')
+        arguments.add_argument('old_path')
+        arguments.add_argument('new_path')
+        arguments.add_argument('--indent', type=int)
+        options = arguments.parse_args(sys.argv[2:])
+        from pbxproj import diff_pbxproj
+        print(json.dumps(diff_pbxproj(options.old_path, options.new_path), indent=options.indent, ensure_ascii=False))
+        sys.exit()
+    if len(sys.argv) > 1 and sys.argv[1] in ('merge', 'merge-driver'):
+        arguments = argparse.ArgumentParser(prog='xcmod.py {}'.format(sys.argv[1]), description='three-way merge of pbxproj objects by uuid, as git merge driver: xcmod.py merge-driver %O %A %B %P')
+        arguments.add_argument('base_path')
+        arguments.add_argument('ours_path')
+        arguments.add_argument('theirs_path')
+        arguments.add_argument('file_path', nargs='?', help='path in work tree, only for messages')
+        arguments.add_argument('--output', '-o', help='write result here instead of OURS')
+        options = arguments.parse_args(sys.argv[2:])
+        xcode_project = XcodeProject()
+        from contextlib import redirect_stdout
+        with redirect_stdout(sys.stderr): # git may read stdout of merge drivers
+            xcode_project.load_pbxproj(file_path=options.ours_path, parser='lazy', generate_project=False)
+            conflicts = xcode_project.merge_pbxproj(base_path=options.base_path, theirs_path=options.theirs_path)
+        xcode_project.save_pbxproj(file_path=options.output if options.output else options.ours_path, backup=False)
+        for conflict in conflicts:
+            print('CONFLICT {} {}'.format(options.file_path if options.file_path else options.ours_path, json.dumps(conflict, ensure_ascii=False)), file=sys.stderr)
+        sys.exit(1 if conflicts else 0)
+    if len(sys.argv) > 1 and sys.argv[1] == 'compile':
+        arguments = argparse.ArgumentParser(prog='xcmod.py compile', description='resolve xcmod into a cached plan of files, types, phases and settings')
+        arguments.add_argument('xcmod_path')
+        arguments.add_argument('--pbxproj-path', '-f', help='plan is kept next to the import manifest of this project, where apply runs pick it up')
+        arguments.add_argument('--plan-path', '-o', help='write plan here instead')
+        arguments.add_argument('--force', action='store_true', help='compile even if cached plan is still valid')
+        options = arguments.parse_args(sys.argv[2:])
+        if not options.pbxproj_path and not options.plan_path: arguments.error('one of --pbxproj-path or --plan-path is required')
+        xcode_project = XcodeProject()
+        plan_path = options.plan_path if options.plan_path else xcode_project.get_plan_path(options.xcmod_path, options.pbxproj_path)
+        plan = None if options.force else xcode_project.load_plan(options.xcmod_path, plan_path)
+        if not plan:
+            plan = xcode_project.compile_xcmod(options.xcmod_path)
+            xcode_project.save_plan(plan, plan_path)
+        phases: dict[str, int] = {}
+        for item in plan.get('assets'): phases[str(item[3])] = phases.get(str(item[3]), 0) + 1
+        xcmod = plan.get('xcmod')
+        print(json.dumps({'base_path': plan.get('base_path'), 'assets': len(plan.get('assets')), 'dirs': len(plan.get('dirs')), 'phases': phases,
+                          'unsupported': [x[0] for x in plan.get('assets') if not x[2]], 'settings': len(xcmod.get('settings') or {}),
+                          'plist': len(xcmod.get('plist') or {}), 'class': len(xcmod.get('class') or [])}, indent=2))
+        sys.exit()
+    if len(sys.argv) > 1 and sys.argv[1] == 'query':
+        arguments = argparse.ArgumentParser(prog='xcmod.py query', description='list file references by normalised path, e.g. query PBXPROJ \'Classes/*.mm\' --missing-phase Sources')
+        arguments.add_argument('pbxproj_path')
+        arguments.add_argument('pattern', nargs='?', default='*', help='glob or directory relative to xcode project dir')
+        arguments.add_argument('--phase', help='only references built in matching phase: Sources, Resources, Frameworks, ...')
+        arguments.add_argument('--missing-phase', help='only references not built in matching phase')
+        arguments.add_argument('--target', help='restrict phase checks to matching targets')
+        arguments.add_argument('--json', action='store_true', help='print groups, build files and phases of each reference')
+        options = arguments.parse_args(sys.argv[2:])
+        xcode_project = XcodeProject()
+        from contextlib import redirect_stdout
+        with redirect_stdout(sys.stderr):
+            xcode_project.load_pbxproj(file_path=options.pbxproj_path, parser='lazy', generate_project=False)
+        entries = xcode_project.query_files(options.pattern, phase=options.phase, missing_phase=options.missing_phase, target=options.target)
+        if options.json:
+            print(json.dumps([x.to_dict() for x in entries], indent=2, ensure_ascii=False))
+        else:
+            for entry in entries: print(entry.path)
+        sys.exit()
     arguments = argparse.ArgumentParser()
     arguments.add_argument('--pbxproj-path', '-f', required=True)
-    arguments.add_argument('--xcmod-path', '-x', required=True)
+    arguments.add_argument('--xcmod-path', '-x', required=True, nargs='+', help='several xcmod files are layered in order, later ones win')
+    arguments.add_argument('--parser', choices=('legacy', 'fast', 'lazy'), default='fast')
+    arguments.add_argument('--cache-path', default=os.environ.get('XCMOD_CACHE_PATH'))
+    arguments.add_argument('--no-cache', action='store_true')
+    arguments.add_argument('--uuid', choices=('hash', 'random'), default='hash', help='hash: derive uuids from isa and path for reproducible output')
+    arguments.add_argument('--settings-only', action='store_true', help='only apply the settings block, pbxproj is left untouched once *.xcconfig files are linked')
+    arguments.add_argument('--no-manifest', action='store_true', help='ignore the import manifest and apply everything again')
+    arguments.add_argument('--strict', action='store_true', help='abort when layered xcmod files conflict')
+    arguments.add_argument('--dump', action='store_true', help='print the loaded pbxproj to stdout before importing')
     options = arguments.parse_args(sys.argv[1:])
     xcode_project = XcodeProject()
-    xcode_project.load_pbxproj(file_path=options.pbxproj_path)
-    print(xcode_project.dump_pbxproj(True))
-    xcode_project.import_xcmod(file_path=options.xcmod_path)
\ No newline at end of file
+    xcmod_paths: list[str] = options.xcmod_path
+    from contextlib import redirect_stdout
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr): # progress goes to stderr, stdout only carries --dump
+        if options.settings_only and len(xcmod_paths) == 1 and xcode_project.update_xcconfig(file_path=xcmod_paths[0], pbxproj_path=options.pbxproj_path):
+            sys.exit()
+        plans = None
+        if not options.settings_only:
+            plans = [xcode_project.get_plan(x, pbxproj_path=options.pbxproj_path) for x in xcmod_paths]
+            conflicts = xcode_project.find_conflicts(xcmod_paths, plans) if options.strict else None
+            if conflicts: # otherwise reported by import_xcmods
+                for conflict in conflicts: print('CONFLICT {}'.format(json.dumps(conflict, ensure_ascii=False)), file=sys.stderr)
+                sys.exit(1)
+            if not options.no_manifest and all(xcode_project.is_xcmod_applied(file_path=x, pbxproj_path=options.pbxproj_path) for x in xcmod_paths):
+                print('>>> {} is up to date'.format(' '.join(xcmod_paths)))
+                sys.exit()
+        if options.uuid == 'random': xcode_project.set_uuid_allocator(PBXAllocator(xcode_project))
+        cache_path = options.cache_path if not options.no_cache else None
+        xcode_project.load_pbxproj(file_path=options.pbxproj_path, parser=options.parser, cache_path=cache_path)
+        if options.dump: print(xcode_project.dump_pbxproj(True), file=stdout)
+        xcode_project.import_xcmods(file_paths=xcmod_paths, settings_only=options.settings_only, incremental=not options.no_manifest, plans=plans)